@@ -1,13 +1,23 @@
 import os
 import re
+import base64
+import functools
 from pathlib import Path
 import json
 import logging
 import threading
 import time
-import queue
+import collections
+import itertools
+import gzip
+import socket
+import zlib
+import tempfile
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from urllib.parse import urlparse
+try:
+    import orjson  # optional: faster JSON encoding for the API responses
+except ImportError:
+    orjson = None
 import urllib.request
 import urllib.error
 
@@ -62,6 +72,8 @@ _ASSET_MAP = {
     "logo_ekonex": "logo_ekonex.png",
     "e-safe_scr": "e-safe_scr.png",
 }
+# name -> (png bytes, Content-Length); filled by _preload_assets() at server start.
+_ASSET_CACHE = {}
 _UI_TAGS_PATH = "/addon_configs/ksenia_lares_addon/ui_tags.json"
 _UI_TAGS_FALLBACK_PATHS = (
     "/addon_configs/ksenia_lares_addon/ui_tags.json",
@@ -76,8 +88,42 @@ _UI_THERM_NAMES_PATHS = (
 _UI_THERM_NAMES_CACHE = {"ts": 0.0, "data": {}}
 _UI_FAVORITES_PATH = "/data/ui_favorites.json"
 _UI_FAVORITES_LOCK = threading.Lock()
+# Favorites live in memory once loaded; POSTs only mark them dirty and the
+# "ui_favorites" thread writes the file (debounced, atomic replace).
+_UI_FAVORITES_MEM = None
+_UI_FAVORITES_JSON = b""
+_UI_FAVORITES_DIRTY = threading.Event()
+_UI_FAVORITES_FLUSH_DEBOUNCE_SEC = 0.1
+_UI_FAVORITES_FLUSHER_STARTED = False
 _ZONES_LAST_SEEN_PATH = "/data/last_seen_zones.json"
 _ZONES_LAST_SEEN_FLUSH_SEC = 5.0
+# snapshot() also applies UI overrides read from files (thermostat names, DOMUS map):
+# keep the cached JSON body at most this long even when no state change happened.
+_SNAPSHOT_JSON_TTL_SEC = 3.0
+# Rendered HTML pages keyed on (path, state revision, ui_tags.json stamp); see _Handler._render_page.
+_RENDER_CACHE_MAX = 64
+_RENDER_CACHE = {}
+_RENDER_CACHE_LOCK = threading.Lock()
+# SSE wire pieces and the shared compact encoder used to build event frames.
+_SSE_DATA = b"data: "
+_SSE_END = b"\n\n"
+_SSE_PING = b": ping\n\n"
+# Keep-alive only for streams that stayed quiet this long.
+_SSE_PING_IDLE_SEC = 30.0
+# Pumped streams are non-blocking: unsent bytes wait in a per-client buffer, retried at this pace,
+# and a client whose backlog grows past the cap is dropped.
+_SSE_RETRY_SEC = 0.2
+_SSE_MAX_BACKLOG = 512 * 1024
+_SSE_RING_SIZE = 1000
+_TCP_CORK = getattr(socket, "TCP_CORK", None)
+_MAX_POST_BYTES = 1024 * 1024
+_JSON_ENCODE = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+_INGRESS_RE = re.compile(r"^(/local_[^/]+/ingress)(/.*)?$")
+# gzip bodies for clients sending Accept-Encoding: gzip (small cache keyed on the raw body).
+_GZIP_MIN_BYTES = 1024
+_GZIP_CACHE_MAX = 16
+_GZIP_CACHE = {}
+_GZIP_LOCK = threading.Lock()
 
 def _read_ui_tags_raw():
     try:
@@ -180,7 +226,17 @@ class LaresState:
         self._entities = {}  # key: (entity_type, id) -> entity dict
         self._meta = {"started_at": time.time(), "last_update": None, "ws1_connected": False}
         self._subs_lock = threading.Lock()
-        self._subs = set()
+        self._subs_cond = threading.Condition(self._subs_lock)
+        self._subs = {}  # id(sub) -> sub dict {"delta": bool, "seq": last frame seq sent}
+        # Recent encoded SSE frames shared by all subscribers: (seq, frame, delta frame or None).
+        self._frames = collections.deque(maxlen=_SSE_RING_SIZE)
+        self._frame_seq = 0
+        # Last merged (static+realtime) view sent per entity key, used to build delta frames.
+        self._delta_prev = {}
+        # Bumped on every state change, always under _subs_lock (see _bump_rev); used to reuse
+        # the encoded snapshot and rendered pages across clients.
+        self._rev = 0
+        self._snap_json_cache = {"rev": None, "ts": 0.0, "body": b""}
         self._zones_last_seen = self._load_zones_last_seen()
         self._zones_last_seen_dirty = False
         self._zones_last_seen_last_flush = 0.0
@@ -202,9 +258,14 @@ class LaresState:
                 return
             with self._lock:
                 self._meta[str(key)] = value
+            self._bump_rev()
         except Exception:
             pass
 
+    def _bump_rev(self):
+        with self._subs_lock:
+            self._rev += 1
+
     def _load_zones_last_seen(self):
         try:
             with open(_ZONES_LAST_SEEN_PATH, "r", encoding="utf-8") as f:
@@ -292,6 +353,14 @@ class LaresState:
                 return dict(rt)
         return None
 
+    def get_entity(self, entity_type, entity_id):
+        """Stored entity for one (type, id) by key, without building a full snapshot()."""
+        norm_id = self._norm_entity_id(entity_id)
+        if norm_id is None:
+            return None
+        with self._lock:
+            return self._entities.get(f"{entity_type}:{norm_id}")
+
     def get_merged(self, entity_type, entity_id):
         if entity_id is None:
             return None
@@ -446,6 +515,23 @@ class LaresState:
             pass
         return {"meta": meta, "entities": entities, "sia": sia}
 
+    def snapshot_json(self) -> bytes:
+        """snapshot() + ui_rev encoded as UTF-8 JSON, shared by /api/entities and /api/stream."""
+        now = time.time()
+        rev = self._rev
+        cache = self._snap_json_cache
+        if cache.get("rev") == rev and (now - float(cache.get("ts") or 0.0)) < _SNAPSHOT_JSON_TTL_SEC:
+            return cache["body"]
+        snap = self.snapshot()
+        snap["ui_rev"] = UI_REV
+        body = _json_bytes(snap)
+        self._snap_json_cache = {"rev": rev, "ts": now, "body": body}
+        return body
+
+    def revision(self) -> int:
+        """Counter bumped on every state change (entities, meta, SIA/WS status)."""
+        return self._rev
+
     def set_sia_status(self, enabled=False, host="", port=0, listening=False):
         with self._lock:
             self._sia["enabled"] = bool(enabled)
@@ -533,26 +619,87 @@ class LaresState:
         if prev != bool(connected):
             self._publish_event({"type": "update", "meta": {"ws1_connected": bool(connected)}, "entities": []})
 
-    def subscribe(self):
-        q = queue.Queue(maxsize=1000)
+    def subscribe(self, delta: bool = False):
+        with self._subs_lock:
+            sub = {"delta": bool(delta), "seq": self._frame_seq}
+            self._subs[id(sub)] = sub
+        return sub
+
+    def unsubscribe(self, sub):
         with self._subs_lock:
-            self._subs.add(q)
-        return q
+            self._subs.pop(id(sub), None)
+
+    def wait_frames(self, seq: int, timeout: float = 15.0) -> int:
+        """Block until a frame newer than seq is published (or timeout); returns the current frame seq."""
+        with self._subs_cond:
+            self._subs_cond.wait_for(lambda: self._frame_seq > seq, timeout)
+            return self._frame_seq
 
-    def unsubscribe(self, q):
+    def frames_since(self, sub):
+        """Frames newer than sub["seq"] joined into one chunk (None when up to date).
+
+        A subscriber that fell behind the ring gets a full snapshot frame instead.
+        """
         with self._subs_lock:
-            self._subs.discard(q)
+            last = sub["seq"]
+            pending = self._frame_seq - last
+            if pending <= 0:
+                return None
+            sub["seq"] = self._frame_seq
+            frames = self._frames
+            if pending > len(frames):
+                frames = None
+            else:
+                delta = sub["delta"]
+                tail = list(itertools.islice(reversed(frames), pending))
+                frames = [d if (delta and d is not None) else f for _, f, d in reversed(tail)]
+        if frames is None:
+            return b"".join((_SSE_DATA, self.snapshot_json(), _SSE_END))
+        return b"".join(frames)
+
+    def _delta_event_locked(self, event: dict) -> dict:
+        # Caller holds _subs_lock. Turns an "update" event (full entities) into
+        # {op:"upsert", type, id, patch} items carrying only the fields that changed.
+        ops = []
+        for ent in (event.get("entities") or []):
+            if not isinstance(ent, dict):
+                continue
+            key = ent.get("key") or f"{ent.get('type')}:{ent.get('id')}"
+            st = ent.get("static") if isinstance(ent.get("static"), dict) else {}
+            rt = ent.get("realtime") if isinstance(ent.get("realtime"), dict) else {}
+            merged = {**st, **rt}
+            if "ID" not in merged:
+                merged["ID"] = ent.get("id")
+            prev = self._delta_prev.get(key) or {}
+            patch = {k: v for k, v in merged.items() if k not in prev or prev[k] != v}
+            self._delta_prev[key] = merged
+            if patch:
+                ops.append({"op": "upsert", "type": ent.get("type"), "id": ent.get("id"), "patch": patch})
+        return {"type": "delta", "meta": event.get("meta") or {}, "ops": ops}
 
     def _publish_event(self, event: dict):
         if not event:
             return
-        with self._subs_lock:
-            subs = list(self._subs)
-        for q in subs:
+        delta_event = None
+        with self._subs_cond:
+            # Same lock as _bump_rev(), so concurrent bumps are never lost.
+            self._rev += 1
+            # Always track the last merged view, so late delta subscribers get correct patches.
+            if event.get("type") == "update":
+                delta_event = self._delta_event_locked(event)
+            if not self._subs:
+                return
+            # Serialize once into the shared ring (in publish order) and wake every stream.
             try:
-                q.put_nowait(event)
+                frame = _sse_frame(event)
+                delta_frame = None
+                if delta_event is not None and any(s["delta"] for s in self._subs.values()):
+                    delta_frame = _sse_frame(delta_event)
             except Exception:
-                pass
+                return
+            self._frame_seq += 1
+            self._frames.append((self._frame_seq, frame, delta_frame))
+            self._subs_cond.notify_all()
 
     def set_initial_data(self, read_data, realtime_initial):
         now = time.time()
@@ -697,6 +844,7 @@ class LaresState:
             if nid is not None:
                 keep.add(nid)
         removed = []
+        removed_keys = []
         with self._lock:
             keys = list(self._entities.keys())
             for key in keys:
@@ -710,11 +858,18 @@ class LaresState:
                     continue
                 try:
                     del self._entities[key]
+                    removed_keys.append(key)
                     if eid is not None:
                         removed.append(eid)
                 except Exception:
                     pass
+            if removed_keys:
+                # A pruned entity that comes back must be diffed from scratch, not against stale fields.
+                with self._subs_lock:
+                    for key in removed_keys:
+                        self._delta_prev.pop(key, None)
             self._meta["last_update"] = time.time()
+        self._bump_rev()
         # Keep sorting stable even when IDs mix numeric and non-numeric strings.
         return sorted(
             set(removed),
@@ -936,9 +1091,48 @@ def _resolve_ui_tags_read_path(path=_UI_TAGS_PATH):
     return ordered[0] if ordered else _UI_TAGS_PATH
 
 
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except Exception:
+        return None
+
+
+# (kind, path) -> (file stamp, parsed data, compact JSON bytes); reloaded when mtime/size change.
+_UI_JSON_CACHE = {}
+_UI_JSON_CACHE_LOCK = threading.Lock()
+
+
+def _ui_tags_stamp():
+    return _file_stamp(_resolve_ui_tags_read_path())
+
+
+def _cached_ui_json(kind: str, path: str, reader):
+    stamp = _file_stamp(path)
+    key = (kind, path)
+    with _UI_JSON_CACHE_LOCK:
+        hit = _UI_JSON_CACHE.get(key)
+    if hit is not None and hit[0] == stamp:
+        return hit
+    data = reader(path)
+    entry = (stamp, data, _json_bytes(data))
+    with _UI_JSON_CACHE_LOCK:
+        _UI_JSON_CACHE[key] = entry
+    return entry
+
+
 def _load_ui_tags(path=_UI_TAGS_PATH):
+    # Shared cached dict: callers read it, they must copy before mutating.
+    return _cached_ui_json("tags", _resolve_ui_tags_read_path(path), _read_ui_tags_file)[1]
+
+
+def _load_ui_tags_json(path=_UI_TAGS_PATH) -> bytes:
+    return _cached_ui_json("tags", _resolve_ui_tags_read_path(path), _read_ui_tags_file)[2]
+
+
+def _read_ui_tags_file(read_path):
     data = {}
-    read_path = _resolve_ui_tags_read_path(path)
     try:
         if os.path.exists(read_path):
             with open(read_path, "r", encoding="utf-8") as handle:
@@ -998,7 +1192,66 @@ def _load_ui_tags(path=_UI_TAGS_PATH):
     return data
 
 
-def _load_ui_favorites(path=_UI_FAVORITES_PATH):
+def _ui_favorites_mem():
+    # Caller holds _UI_FAVORITES_LOCK.
+    global _UI_FAVORITES_MEM, _UI_FAVORITES_JSON
+    if _UI_FAVORITES_MEM is None:
+        _UI_FAVORITES_MEM = _read_ui_favorites_file(_UI_FAVORITES_PATH)
+        _UI_FAVORITES_JSON = _json_bytes(_UI_FAVORITES_MEM)
+    return _UI_FAVORITES_MEM
+
+
+def _load_ui_favorites():
+    # Fresh copy (buckets included) of the in-memory favorites.
+    with _UI_FAVORITES_LOCK:
+        data = _ui_favorites_mem()
+        return {k: dict(v) if isinstance(v, dict) else v for k, v in data.items()}
+
+
+def _load_ui_favorites_json() -> bytes:
+    with _UI_FAVORITES_LOCK:
+        _ui_favorites_mem()
+        return _UI_FAVORITES_JSON
+
+
+def _set_ui_favorite(etype: str, eid: str, fav: bool):
+    global _UI_FAVORITES_JSON
+    with _UI_FAVORITES_LOCK:
+        bucket = _ui_favorites_mem()[etype]
+        if fav:
+            if bucket.get(eid) is True:
+                return
+            bucket[eid] = True
+        else:
+            if eid not in bucket:
+                return
+            del bucket[eid]
+        _UI_FAVORITES_JSON = _json_bytes(_UI_FAVORITES_MEM)
+    _UI_FAVORITES_DIRTY.set()
+
+
+def _ui_favorites_flusher():
+    while True:
+        _UI_FAVORITES_DIRTY.wait()
+        # Coalesce bursts of toggles into a single write.
+        time.sleep(_UI_FAVORITES_FLUSH_DEBOUNCE_SEC)
+        with _UI_FAVORITES_LOCK:
+            _UI_FAVORITES_DIRTY.clear()
+            text = json.dumps(_UI_FAVORITES_MEM, ensure_ascii=False, indent=2)
+        _save_ui_favorites(text)
+
+
+def _start_ui_favorites_flusher():
+    global _UI_FAVORITES_FLUSHER_STARTED
+    with _UI_FAVORITES_LOCK:
+        _ui_favorites_mem()
+        if _UI_FAVORITES_FLUSHER_STARTED:
+            return
+        _UI_FAVORITES_FLUSHER_STARTED = True
+    threading.Thread(target=_ui_favorites_flusher, name="ui_favorites", daemon=True).start()
+
+
+def _read_ui_favorites_file(path):
     data = {}
     try:
         with open(path, "r", encoding="utf-8") as handle:
@@ -1013,13 +1266,29 @@ def _load_ui_favorites(path=_UI_FAVORITES_PATH):
     return data
 
 
-def _save_ui_favorites(data, path=_UI_FAVORITES_PATH):
+def _save_ui_favorites(text: str, path=_UI_FAVORITES_PATH):
+    # Unique temp file per write, so concurrent writers never truncate each other's file before os.replace.
+    tmp = None
     try:
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w", encoding="utf-8") as handle:
-            json.dump(data, handle, ensure_ascii=False, indent=2)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp", delete=False
+        ) as handle:
+            tmp = handle.name
+            handle.write(text)
+        # NamedTemporaryFile creates 0600; keep the permissions the plain open() used to give.
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+        tmp = None
     except Exception:
         pass
+    finally:
+        if tmp:
+            try:
+                os.unlink(tmp)
+            except Exception:
+                pass
 
 
 def _load_ui_thermostat_names(path=None):
@@ -1147,15 +1416,129 @@ def _fmt_ts(ts):
         return str(ts)
 
 
+_HTML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"})
+
+
 def _html_escape(s):
-    return (
-        str(s)
-        .replace("&", "&amp;")
-        .replace("<", "&lt;")
-        .replace(">", "&gt;")
-        .replace('"', "&quot;")
-        .replace("'", "&#39;")
-    )
+    s = s if isinstance(s, str) else str(s)
+    # Most labels/ids have nothing to escape: skip the translate pass entirely.
+    if "&" in s or "<" in s or ">" in s or '"' in s or "'" in s:
+        return s.translate(_HTML_ESCAPE_TABLE)
+    return s
+
+
+# Version badge text shared by every page, escaped once at import.
+_ADDON_VERSION_ESC = _html_escape(ADDON_VERSION)
+
+
+def _gzip_cached(body: bytes) -> bytes:
+    key = bytes(body)
+    with _GZIP_LOCK:
+        gz = _GZIP_CACHE.get(key)
+    if gz is not None:
+        return gz
+    gz = gzip.compress(key, compresslevel=6, mtime=0)
+    with _GZIP_LOCK:
+        if len(_GZIP_CACHE) >= _GZIP_CACHE_MAX:
+            _GZIP_CACHE.pop(next(iter(_GZIP_CACHE)))
+        _GZIP_CACHE[key] = gz
+    return gz
+
+
+def _raw_path(p: str) -> str:
+    # Request targets are origin-form ("/path?query"): no need for a full urlparse.
+    return p.partition("?")[0]
+
+
+@functools.lru_cache(maxsize=256)
+def _split_ingress(p: str):
+    # (ingress_prefix, path) for HA Ingress URLs; ("", p) on the common direct path.
+    p = str(p or "")
+    if p.startswith("/api/hassio_ingress/"):
+        parts = p.split("/")
+        # ['', 'api', 'hassio_ingress', '<token>', ...]
+        if len(parts) >= 4 and parts[3]:
+            prefix = "/".join(parts[:4])
+            rest = "/" + "/".join(parts[4:]) if len(parts) > 4 else "/"
+            return prefix, rest
+    elif p.startswith("/local_"):
+        m = _INGRESS_RE.match(p)
+        if m:
+            return m.group(1), m.group(2) or "/"
+    return "", p or "/"
+
+
+def _load_asset(name: str):
+    filename = _ASSET_MAP.get(name)
+    if not filename:
+        return None
+    try:
+        body = Path(_ASSETS_DIR, filename).read_bytes()
+    except Exception:
+        return None
+    entry = (body, str(len(body)))
+    _ASSET_CACHE[name] = entry
+    return entry
+
+
+def _preload_assets():
+    for name in _ASSET_MAP:
+        _load_asset(name)
+
+
+def _json_bytes(data) -> bytes:
+    # Compact UTF-8 JSON for API bodies and SSE frames (orjson when installed).
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        except Exception:
+            pass
+    return _JSON_ENCODE(data).encode("utf-8")
+
+
+def _sse_frame(event) -> bytes:
+    return b"".join((_SSE_DATA, _json_bytes(event), _SSE_END))
+
+
+_TEMPLATE_SLOT_RE = re.compile(r"__([A-Z_]+)__")
+
+
+def _compile_template(tpl: str, slots, fixed=None) -> tuple:
+    """Pre-encode tpl as (bytes, slot, bytes, ...) around the given __SLOT__ placeholders.
+
+    Placeholders named in fixed are filled with their (already escaped) value in the same pass.
+    """
+    fixed = fixed or {}
+    parts = []
+    chunk = []
+    pos = 0
+    for m in _TEMPLATE_SLOT_RE.finditer(tpl):
+        name = m.group(1)
+        if name in fixed:
+            chunk.append(tpl[pos : m.start()])
+            chunk.append(fixed[name])
+        elif name in slots:
+            chunk.append(tpl[pos : m.start()])
+            parts.append("".join(chunk).encode("utf-8"))
+            parts.append(name)
+            chunk = []
+        else:
+            continue
+        pos = m.end()
+    chunk.append(tpl[pos:])
+    parts.append("".join(chunk).encode("utf-8"))
+    return tuple(parts)
+
+
+def _fill_template(parts: tuple, values: dict) -> bytes:
+    return b"".join(p if isinstance(p, bytes) else values[p] for p in parts)
+
+
+def _b64_json(data) -> str:
+    # Page bootstrap payloads: compact UTF-8 JSON as base64, embedded in <script type="text/plain">
+    # (no HTML entity escaping, decoded once by decodeInit() in the page).
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.b64encode(raw).decode("ascii")
 
 
 def _static_field_info(entity_type: str, key: str, value):
@@ -2627,7 +3010,7 @@ def render_index(snapshot):
     </style>
   </head>
   <body>
-    <h2>Ksenia Lares - index_debug {f'<span class="badge">v{_html_escape(ADDON_VERSION)}</span>' if ADDON_VERSION else ''}</h2>
+    <h2>Ksenia Lares - index_debug {f'<span class="badge">v{_ADDON_VERSION_ESC}</span>' if ADDON_VERSION else ''}</h2>
     <div class="meta">
       Entità: <span class="badge">{len(entities)}</span>
       &nbsp;|&nbsp; Last update: <span id="lastUpdate" class="badge">{_html_escape(_fmt_ts(meta.get("last_update")))}</span>
@@ -2689,6 +3072,7 @@ def render_index(snapshot):
       </table>
     </div>
     <script>
+      const ESC_MAP = {{'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#39;'}};
       let pollingOn = false;
       let timer = null;
       let lastSeenUpdate = "{_html_escape(_fmt_ts(meta.get("last_update")))}";
@@ -3179,12 +3563,7 @@ def render_index(snapshot):
           const st = (e.static || {{}}); // may be empty
 
           function escHtml(s) {{
-            return String(s)
-              .replaceAll('&', '&amp;')
-              .replaceAll('<', '&lt;')
-              .replaceAll('>', '&gt;')
-              .replaceAll('\"', '&quot;')
-              .replaceAll(\"'\", '&#39;');
+            return String(s).replace(/[&<>"']/g, c => ESC_MAP[c]);
           }}
 
           function renderKvValue(v) {{
@@ -3857,7 +4236,7 @@ def render_thermostats(snapshot):
           <div class="title">{_html_escape(title)}</div>
           <div class="meta">
             ID <span class="badge">{_html_escape(str(thermostat_id))}</span>
-            · v <span class="badge">{_html_escape(ADDON_VERSION)}</span>
+            · v <span class="badge">{_ADDON_VERSION_ESC}</span>
             · UI <span class="badge">{_html_escape(UI_REV)}</span>
             · Aggiornato: <span class="badge" id="lastUpdate">-</span>
           </div>
@@ -4550,7 +4929,7 @@ def render_security_ui(snapshot):
           <div class="statusline" id="statusLine"></div>
           <div class="ring" id="ring" title="Inserisci/Disinserisci/Parziale">
             <div class="lock" id="lockIcon"></div>
-            <div class="addonVer" id="addonVer">v{_html_escape(ADDON_VERSION)}</div>
+            <div class="addonVer" id="addonVer">v{_ADDON_VERSION_ESC}</div>
           </div>
           <button class="alarmMem" id="alarmMem" type="button" title="Memoria allarme (dettagli)" aria-label="Memoria allarme">
             <img src="/assets/alarm" alt=""/>
@@ -9405,9 +9784,7 @@ def render_security_timers(snapshot):
             return 0
 
     timers.sort(key=_id_key)
-    init_payload = _html_escape(
-        json.dumps({"timers": timers, "scenarios": scenarios, "meta": meta}, ensure_ascii=False)
-    )
+    init_payload = _b64_json({"timers": timers, "scenarios": scenarios, "meta": meta})
 
     html = f"""<!doctype html>
 <html lang="it">
@@ -9722,7 +10099,7 @@ def render_security_timers(snapshot):
     </div>
 
     <div class="toast" id="toast"></div>
-    <script id="init" type="application/json">{init_payload}</script>
+    <script id="init" type="text/plain">{init_payload}</script>
     <script>
       function apiRoot() {{
         const p = String(window.location && window.location.pathname ? window.location.pathname : '');
@@ -9787,10 +10164,18 @@ def render_security_timers(snapshot):
         return sid ? ('ID ' + sid) : '';
       }}
 
+      function decodeInit(el) {{
+        const bin = atob(String((el && el.textContent) || '').trim());
+        if (typeof TextDecoder === 'function') {{
+          return JSON.parse(new TextDecoder().decode(Uint8Array.from(bin, c => c.charCodeAt(0))));
+        }}
+        return JSON.parse(decodeURIComponent(escape(bin)));
+      }}
+
       function parseInit() {{
         let payload = null;
         try {{
-          payload = JSON.parse(document.getElementById('init').textContent || '{{}}');
+          payload = decodeInit(document.getElementById('init'));
         }} catch (_e) {{
           payload = null;
         }}
@@ -11331,7 +11716,7 @@ def render_menu(snapshot):
         <img src="assets/e-safe_scr.png" alt="e-safe" style="height:30px;opacity:0.92;"/>
         <div>
           <h1>Ksenia Lares</h1>
-          <div class="badge">v{_html_escape(ADDON_VERSION)}</div>
+          <div class="badge">v{_ADDON_VERSION_ESC}</div>
         </div>
       </div>
 
@@ -11942,7 +12327,7 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
         <div>
           <div style="font-size:22px; font-weight:600; letter-spacing:0.2px">{_html_escape(title)}</div>
           <div class="muted" style="margin-top:4px">
-            ID {_html_escape(str(thermostat_id))} &bull; v{_html_escape(ADDON_VERSION)} &bull; Aggiornato: <span id="lastUpdate">-</span>
+            ID {_html_escape(str(thermostat_id))} &bull; v{_ADDON_VERSION_ESC} &bull; Aggiornato: <span id="lastUpdate">-</span>
           </div>
         </div>
         <div class="chips">
@@ -12031,7 +12416,7 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
       </div>
 
       <div class="top">
-        <h2 style="margin:0">{_html_escape(title)} <span class="badge">ID {_html_escape(str(thermostat_id))}</span> <span class="badge">v{_html_escape(ADDON_VERSION)}</span></h2>
+        <h2 style="margin:0">{_html_escape(title)} <span class="badge">ID {_html_escape(str(thermostat_id))}</span> <span class="badge">v{_ADDON_VERSION_ESC}</span></h2>
         <div class="muted"><a href="../thermostats">← Lista termostati</a> · <a href="../index_debug">index_debug</a></div>
       </div>
       <div id="status" class="muted" style="margin-top:8px">-</div>
@@ -12723,7 +13108,7 @@ def render_logs(snapshot):
     logs.sort(key=_id_desc)
     logs = logs[:500]
 
-    init_payload = _html_escape(json.dumps({"logs": logs}, ensure_ascii=False))
+    init_payload = _b64_json({"logs": logs})
 
     html = f"""<!doctype html>
 <html lang="it">
@@ -12842,6 +13227,9 @@ def render_logs(snapshot):
       tr:hover {{ background: var(--hover); }}
       .small {{ font-size: 12px; color: var(--muted); }}
       .pager {{ display: flex; align-items: center; gap: 10px; }}
+      #wrap.virtual {{ max-height: 70vh; }}
+      #wrap.virtual tbody tr {{ height: 40px; }}
+      #wrap.virtual td {{ padding-top: 0; padding-bottom: 0; vertical-align: middle; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; max-width: 420px; }}
       select {{
         background: var(--input-bg);
         color: var(--input-fg);
@@ -12864,7 +13252,7 @@ def render_logs(snapshot):
       <div style="display:flex; align-items:center; justify-content:space-between; gap:12px; flex-wrap:wrap;">
         <div style="display:flex; align-items:center; gap:10px;">
           <img src="/assets/e-safe_scr.png" alt="e-safe" style="height:34px;opacity:0.92;pointer-events:none;"/>
-          <div class="title">Registro eventi {f'<span class="badge">v{_html_escape(ADDON_VERSION)}</span>' if ADDON_VERSION else ''}</div>
+          <div class="title">Registro eventi {f'<span class="badge">v{_ADDON_VERSION_ESC}</span>' if ADDON_VERSION else ''}</div>
         </div>
         <div class="meta">
           Log: <span id="count" class="badge">{len(logs)}</span>
@@ -12883,6 +13271,7 @@ def render_logs(snapshot):
           <option value="30">30</option>
           <option value="50">50</option>
           <option value="100">100</option>
+          <option value="all">Tutti</option>
         </select>
         <button onclick="prevPage()" aria-label="Pagina precedente">‹</button>
         <span class="small">Pagina <span id="pageNo">1</span>/<span id="pageMax">1</span></span>
@@ -12904,14 +13293,25 @@ def render_logs(snapshot):
       </table>
     </div>
     </div>
-    <script id="init" type="application/json">{init_payload}</script>
+    <template id="rowTpl"><tr><td class="mono"></td><td class="mono"></td><td></td><td></td><td class="mono"></td></tr></template>
+    <script id="init" type="text/plain">{init_payload}</script>
     <script>
       let pollingOn = true;
+      let streamDirty = false;  // stream data applied while auto-refresh was OFF, not yet rendered
       let sse = null;
       let page = 1;
-      let pageSize = 15;
+      let pageSize = 15;  // 0 = "Tutti" (virtualized list, only visible rows are rendered)
       let filterQ = '';
+      let renderQueued = false;
+      const ROW_H = 40;
+      const OVERSCAN = 8;
+      const rowTpl = document.getElementById('rowTpl');
+      let renderedRowById = new Map();  // id -> mounted <tr> (recycled across renders)
       let logById = new Map();
+      let hayById = new Map();
+      let tokenIndex = new Map();  // token -> Set(id)
+      let tokensById = new Map();  // id -> tokens currently indexed for that row
+      let sortedTokens = null;     // sorted tokenIndex keys (prefix lookup), rebuilt lazily
       let ids = [];
 
       function apiRoot() {{
@@ -12929,88 +13329,271 @@ def render_logs(snapshot):
         return root + '/' + p;
       }}
 
-      function esc(s) {{
-        return String(s).replaceAll('&','&amp;').replaceAll('<','&lt;').replaceAll('>','&gt;').replaceAll('\"','&quot;').replaceAll(\"'\",'&#39;');
+      function decodeInit(el) {{
+        const bin = atob(String((el && el.textContent) || '').trim());
+        if (typeof TextDecoder === 'function') {{
+          return JSON.parse(new TextDecoder().decode(Uint8Array.from(bin, c => c.charCodeAt(0))));
+        }}
+        return JSON.parse(decodeURIComponent(escape(bin)));
       }}
 
       function parseInit() {{
         const el = document.getElementById('init');
         if (!el) return;
         let payload = null;
-        try {{ payload = JSON.parse(el.textContent || '{{}}'); }} catch (_e) {{ payload = null; }}
+        try {{ payload = decodeInit(el); }} catch (_e) {{ payload = null; }}
         const list = (payload && payload.logs) ? payload.logs : [];
         logById = new Map();
+        resetIndex();
         ids = [];
         for (const it of list) {{
           if (!it || it.ID === undefined || it.ID === null) continue;
           const id = String(it.ID);
           logById.set(id, it);
+          indexRow(id);
           ids.push(id);
         }}
         ids.sort((a,b) => (parseInt(b,10)||0) - (parseInt(a,10)||0));
         document.getElementById('count').innerText = String(ids.length);
       }}
 
-      function rowHtml(it) {{
-        const typ = String(it.TYPE ?? '');
+      // Cell texts in column order (Tipo, Data, Evento, Info, Immagine).
+      function rowValues(it) {{
         const date = String(it.DATA ?? '');
         const time = String(it.TIME ?? '');
-        const ev = String(it.EV ?? '');
         const i1 = String(it.I1 ?? '');
         const i2 = String(it.I2 ?? '');
         const iml = String(it.IML ?? '');
-        const when = (date && time) ? (date + ' ' + time) : (date || time);
-        const info = [i1, i2].filter(Boolean).join(' | ');
-        const img = (iml === 'T') ? 'Si' : (iml === 'F' ? 'No' : iml);
-        return '<tr>' +
-          '<td class="mono">' + esc(typ) + '</td>' +
-          '<td class="mono">' + esc(when) + '</td>' +
-          '<td>' + esc(ev) + '</td>' +
-          '<td>' + esc(info) + '</td>' +
-          '<td class="mono">' + esc(img) + '</td>' +
-        '</tr>';
+        return [
+          String(it.TYPE ?? ''),
+          (date && time) ? (date + ' ' + time) : (date || time),
+          String(it.EV ?? ''),
+          [i1, i2].filter(Boolean).join(' | '),
+          (iml === 'T') ? 'Si' : (iml === 'F' ? 'No' : iml),
+        ];
+      }}
+
+      // Rows are cloned from <template id="rowTpl"> and filled via textContent (no HTML parsing, no escaping).
+      // Mounted rows are recycled by id: only cells whose text changed since the last render are written.
+      function rowNode(id, it) {{
+        let n = renderedRowById.get(id);
+        if (!n) {{
+          n = rowTpl.content.firstElementChild.cloneNode(true);
+          n._vals = [];
+        }}
+        const vals = rowValues(it);
+        const cells = n.children;
+        for (let i = 0; i < vals.length; i++) {{
+          if (n._vals[i] !== vals[i]) cells[i].textContent = vals[i];
+        }}
+        n._vals = vals;
+        return n;
+      }}
+
+      function spacerRow() {{
+        const tr = document.createElement('tr');
+        const td = document.createElement('td');
+        td.colSpan = 5;
+        td.style.padding = '0';
+        td.style.border = '0';
+        tr.appendChild(td);
+        return tr;
+      }}
+      const topSpacer = spacerRow();
+      const bottomSpacer = spacerRow();
+
+      // Reconcile #tb children with the wanted node list, touching only rows that moved/appeared/left.
+      function mountRows(nodes) {{
+        const tb = document.getElementById('tb');
+        const keep = new Set(nodes);
+        let cur = tb.firstChild;
+        for (const node of nodes) {{
+          while (cur && !keep.has(cur)) {{
+            const nx = cur.nextSibling;
+            tb.removeChild(cur);
+            cur = nx;
+          }}
+          if (node === cur) {{
+            cur = cur.nextSibling;
+            continue;
+          }}
+          tb.insertBefore(node, cur);
+        }}
+        while (cur) {{
+          const nx = cur.nextSibling;
+          tb.removeChild(cur);
+          cur = nx;
+        }}
+      }}
+
+      function mountSlice(slice, topPad, bottomPad) {{
+        const nodes = [];
+        const next = new Map();
+        if (topPad > 0) {{
+          topSpacer.style.height = topPad + 'px';
+          nodes.push(topSpacer);
+        }}
+        for (const id of slice) {{
+          const it = logById.get(id);
+          if (!it) continue;
+          const n = rowNode(id, it);
+          nodes.push(n);
+          next.set(id, n);
+        }}
+        if (bottomPad > 0) {{
+          bottomSpacer.style.height = bottomPad + 'px';
+          nodes.push(bottomSpacer);
+        }}
+        mountRows(nodes);
+        renderedRowById = next;
+      }}
+
+      function buildHay(it) {{
+        // One template literal (single allocation) + one toLowerCase per row.
+        return `${{it.TYPE ?? ''}} ${{it.DATA ?? ''}} ${{it.TIME ?? ''}} ${{it.EV ?? ''}} ${{it.I1 ?? ''}} ${{it.I2 ?? ''}}`.toLowerCase();
+      }}
+
+      function resetIndex() {{
+        hayById = new Map();
+        tokenIndex = new Map();
+        tokensById = new Map();
+        sortedTokens = null;
+      }}
+
+      function indexRow(id) {{
+        const old = tokensById.get(id);
+        if (old) {{
+          for (const tok of old) {{
+            const set = tokenIndex.get(tok);
+            if (!set) continue;
+            set.delete(id);
+            if (!set.size) {{
+              tokenIndex.delete(tok);
+              sortedTokens = null;
+            }}
+          }}
+        }}
+        const it = logById.get(id);
+        if (!it) {{
+          tokensById.delete(id);
+          hayById.delete(id);
+          return;
+        }}
+        const hay = buildHay(it);
+        hayById.set(id, hay);
+        const toks = Array.from(new Set(hay.split(/\\s+/).filter(Boolean)));
+        tokensById.set(id, toks);
+        for (const tok of toks) {{
+          let set = tokenIndex.get(tok);
+          if (!set) {{
+            set = new Set();
+            tokenIndex.set(tok, set);
+            sortedTokens = null;
+          }}
+          set.add(id);
+        }}
+      }}
+
+      function idsForPrefix(prefix) {{
+        if (!sortedTokens) sortedTokens = Array.from(tokenIndex.keys()).sort();
+        let lo = 0, hi = sortedTokens.length;
+        while (lo < hi) {{
+          const mid = (lo + hi) >> 1;
+          if (sortedTokens[mid] < prefix) lo = mid + 1; else hi = mid;
+        }}
+        const out = new Set();
+        for (let i = lo; i < sortedTokens.length && sortedTokens[i].startsWith(prefix); i++) {{
+          for (const id of tokenIndex.get(sortedTokens[i])) out.add(id);
+        }}
+        return out;
       }}
 
       function filteredIds() {{
         if (!filterQ) return ids.slice();
-        const q = filterQ.toLowerCase();
+        const q = filterQ;
+        // Word queries: every term must prefix-match a token of the row (inverted index).
+        // Terms with punctuation (dates, times, "a|b") fall back to the substring scan.
+        const terms = q.split(/\\s+/).filter(Boolean);
+        if (terms.length && !terms.some(t => /[^\\p{{L}}\\p{{N}}]/u.test(t))) {{
+          let hit = null;
+          for (const t of terms) {{
+            const set = idsForPrefix(t);
+            if (hit === null) {{
+              hit = set;
+            }} else {{
+              const next = new Set();
+              for (const id of hit) if (set.has(id)) next.add(id);
+              hit = next;
+            }}
+            if (!hit.size) break;
+          }}
+          return ids.filter(id => hit.has(id));
+        }}
         const out = [];
         for (const id of ids) {{
-          const it = logById.get(id);
-          if (!it) continue;
-          const hay = (String(it.TYPE||'') + ' ' + String(it.DATA||'') + ' ' + String(it.TIME||'') + ' ' + String(it.EV||'') + ' ' + String(it.I1||'') + ' ' + String(it.I2||'')).toLowerCase();
+          let hay = hayById.get(id);
+          if (hay === undefined) {{
+            const it = logById.get(id);
+            if (!it) continue;
+            hay = buildHay(it);
+            hayById.set(id, hay);
+          }}
           if (hay.includes(q)) out.push(id);
         }}
         return out;
       }}
 
+      function scheduleRender() {{
+        if (renderQueued) return;
+        renderQueued = true;
+        requestAnimationFrame(() => {{
+          renderQueued = false;
+          render();
+        }});
+      }}
+
+      function renderVirtual(list) {{
+        const wrap = document.getElementById('wrap');
+        const viewH = (wrap && wrap.clientHeight) ? wrap.clientHeight : 600;
+        const top = wrap ? wrap.scrollTop : 0;
+        const first = Math.max(0, Math.floor(top / ROW_H) - OVERSCAN);
+        const last = Math.min(list.length, first + Math.ceil(viewH / ROW_H) + 2 * OVERSCAN);
+        document.getElementById('pageNo').innerText = '1';
+        document.getElementById('pageMax').innerText = '1';
+        mountSlice(list.slice(first, last), first * ROW_H, (list.length - last) * ROW_H);
+      }}
+
       function render() {{
         const list = filteredIds();
+        if (pageSize <= 0) {{
+          renderVirtual(list);
+          return;
+        }}
         const maxPage = Math.max(1, Math.ceil(list.length / pageSize));
         if (page > maxPage) page = maxPage;
         if (page < 1) page = 1;
         document.getElementById('pageNo').innerText = String(page);
         document.getElementById('pageMax').innerText = String(maxPage);
         const start = (page - 1) * pageSize;
-        const slice = list.slice(start, start + pageSize);
-        const rows = [];
-        for (const id of slice) {{
-          const it = logById.get(id);
-          if (it) rows.push(rowHtml(it));
-        }}
-        document.getElementById('tb').innerHTML = rows.join('');
+        mountSlice(list.slice(start, start + pageSize), 0, 0);
       }}
 
       function applyFilter() {{
-        filterQ = String(document.getElementById('q').value || '').trim();
+        filterQ = String(document.getElementById('q').value || '').trim().toLowerCase();
         page = 1;
         render();
       }}
 
       function setPageSize() {{
-        const v = parseInt(document.getElementById('pageSize').value || '15', 10);
-        pageSize = isFinite(v) && v > 0 ? v : 15;
+        const raw = String(document.getElementById('pageSize').value || '15');
+        const v = parseInt(raw, 10);
+        pageSize = raw === 'all' ? 0 : (isFinite(v) && v > 0 ? v : 15);
         page = 1;
+        const wrap = document.getElementById('wrap');
+        if (wrap) {{
+          wrap.classList.toggle('virtual', pageSize <= 0);
+          wrap.scrollTop = 0;
+        }}
         render();
       }}
 
@@ -13041,6 +13624,7 @@ def render_logs(snapshot):
 
           const ents = data.entities || [];
           logById = new Map();
+          resetIndex();
           ids = [];
           for (const e of ents) {{
             if (!e || String(e.type || '').toLowerCase() !== 'logs') continue;
@@ -13049,6 +13633,7 @@ def render_logs(snapshot):
             const merged = Object.assign({{}}, e.static || {{}}, e.realtime || {{}});
             merged.ID = merged.ID ?? e.id;
             logById.set(id, merged);
+            indexRow(id);
             ids.push(id);
           }}
           ids.sort((a,b) => (parseInt(b,10)||0) - (parseInt(a,10)||0));
@@ -13060,17 +13645,35 @@ def render_logs(snapshot):
 
       function connectSSE() {{
         if (sse) try {{ sse.close(); }} catch (_e) {{}}
-        sse = new EventSource(apiUrl('/api/stream'));
+        sse = new EventSource(apiUrl('/api/stream?delta=1'));
         sse.onmessage = (ev) => {{
-          if (!pollingOn) return;
+          // Delta frames only carry changed fields: keep applying them while paused, skip only the DOM work.
           let data = null;
           try {{ data = JSON.parse(ev.data); }} catch (_e) {{ return; }}
           const meta = data.meta || {{}};
-          const lastUpdateStr = meta.last_update ? new Date(meta.last_update * 1000).toISOString().replace('T', ' ').slice(0, 19) : '-';
-          const el = document.getElementById('lastUpdate');
-          if (el) el.innerText = lastUpdateStr;
-          const ents = data.entities || [];
+          if (meta.last_update && pollingOn) {{
+            const el = document.getElementById('lastUpdate');
+            if (el) el.innerText = new Date(meta.last_update * 1000).toISOString().replace('T', ' ').slice(0, 19);
+          }}
           let changed = false;
+          if (data.type === 'delta') {{
+            // Server sends only the changed fields per entity: patch the row in place.
+            for (const op of (data.ops || [])) {{
+              if (!op || op.op !== 'upsert' || String(op.type || '').toLowerCase() !== 'logs') continue;
+              const id = String(op.id ?? '');
+              if (!id) continue;
+              let cur = logById.get(id);
+              if (!cur) {{
+                cur = {{ ID: op.id }};
+                logById.set(id, cur);
+                ids.unshift(id);
+              }}
+              Object.assign(cur, op.patch || {{}});
+              indexRow(id);
+              changed = true;
+            }}
+          }}
+          const ents = data.entities || [];
           for (const e of ents) {{
             if (!e || String(e.type || '').toLowerCase() !== 'logs') continue;
             const id = String(e.id ?? '');
@@ -13084,12 +13687,17 @@ def render_logs(snapshot):
               changed = true;
             }}
             logById.set(id, merged);
+            indexRow(id);
           }}
           if (changed) {{
             ids = Array.from(new Set(ids));
             ids.sort((a,b) => (parseInt(b,10)||0) - (parseInt(a,10)||0));
-            document.getElementById('count').innerText = String(ids.length);
-            render();
+            if (pollingOn) {{
+              document.getElementById('count').innerText = String(ids.length);
+              render();
+            }} else {{
+              streamDirty = true;
+            }}
           }}
         }};
         sse.onerror = () => {{
@@ -13104,7 +13712,15 @@ def render_logs(snapshot):
       document.getElementById('toggle').onclick = () => {{
         pollingOn = !pollingOn;
         document.getElementById('toggle').innerText = 'Auto-refresh: ' + (pollingOn ? 'ON' : 'OFF');
+        if (pollingOn && streamDirty) {{
+          streamDirty = false;
+          document.getElementById('count').innerText = String(ids.length);
+          render();
+        }}
       }};
+      document.getElementById('wrap').addEventListener('scroll', () => {{
+        if (pageSize <= 0) scheduleRender();
+      }}, {{ passive: true }});
 
       parseInit();
       render();
@@ -13120,49 +13736,44 @@ def render_timers(snapshot):
     entities = snapshot.get("entities") or []
     meta = snapshot.get("meta") or {}
 
+    # Single pass: scenario names (keyed by normalized str id) and scheduler rows with a sort key.
     scenarios = {}
+    keyed = []
     for e in entities:
-        if str(e.get("type") or "").lower() != "scenarios":
-            continue
-        try:
-            sid = int(e.get("id"))
-        except Exception:
-            continue
-        st = e.get("static") if isinstance(e.get("static"), dict) else {}
-        name = st.get("DES") or st.get("NM") or e.get("name")
-        if isinstance(name, str) and name.strip():
-            scenarios[sid] = name.strip()
+        t = str(e.get("type") or "").lower()
+        if t == "scenarios":
+            try:
+                sid = str(int(e.get("id")))
+            except Exception:
+                continue
+            st = e.get("static") if isinstance(e.get("static"), dict) else {}
+            name = st.get("DES") or st.get("NM") or e.get("name")
+            if isinstance(name, str) and name.strip():
+                scenarios[sid] = name.strip()
+        elif t == "schedulers":
+            st = e.get("static") if isinstance(e.get("static"), dict) else {}
+            rt = e.get("realtime") if isinstance(e.get("realtime"), dict) else {}
+            item = {**st, **rt}
+            if "ID" not in item:
+                item["ID"] = e.get("id")
+            try:
+                k = int(str(item.get("ID") or 0))
+            except Exception:
+                k = 0
+            keyed.append((k, len(keyed), item))
 
+    keyed.sort(key=lambda x: (x[0], x[1]))
     timers = []
-    for e in entities:
-        if str(e.get("type") or "").lower() != "schedulers":
-            continue
-        st = e.get("static") if isinstance(e.get("static"), dict) else {}
-        rt = e.get("realtime") if isinstance(e.get("realtime"), dict) else {}
-        item = {**st, **rt}
-        if "ID" not in item:
-            item["ID"] = e.get("id")
+    for _k, _i, item in keyed:
         sce = item.get("SCE")
         try:
             if sce is not None:
-                item["SCE_NAME"] = scenarios.get(int(str(sce))) or item.get("SCE_NAME")
+                item["SCE_NAME"] = scenarios.get(str(int(str(sce)))) or item.get("SCE_NAME")
         except Exception:
             pass
         timers.append(item)
 
-    def _id_key(x):
-        try:
-            return int(str(x.get("ID") or 0))
-        except Exception:
-            return 0
-
-    timers.sort(key=_id_key)
-    init_payload = _html_escape(
-        json.dumps(
-            {"timers": timers, "scenarios": {str(k): v for k, v in scenarios.items()}},
-            ensure_ascii=False,
-        )
-    )
+    init_payload = _b64_json({"timers": timers, "scenarios": scenarios})
 
     html = f"""<!doctype html>
 <html lang="it">
@@ -13311,7 +13922,7 @@ def render_timers(snapshot):
     <div style="display:flex;align-items:center;justify-content:flex-start;margin:10px 0 0 0;">
       <img src="/assets/e-safe_scr.png" alt="e-safe" style="height:34px;opacity:0.92;pointer-events:none;"/>
     </div>
-    <h2>Ksenia Lares - Programmatori Orari {f'<span class="badge">v{_html_escape(ADDON_VERSION)}</span>' if ADDON_VERSION else ''}</h2>
+    <h2>Ksenia Lares - Programmatori Orari {f'<span class="badge">v{_ADDON_VERSION_ESC}</span>' if ADDON_VERSION else ''}</h2>
     <div class="meta">
       Programmatori: <span id="count" class="badge">{len(timers)}</span>
       &nbsp;|&nbsp; Last update: <span id="lastUpdate" class="badge">{_html_escape(_fmt_ts(meta.get("last_update")))}</span>
@@ -13332,26 +13943,52 @@ def render_timers(snapshot):
         <div id="status" class="small" style="margin-top:10px;"></div>
       </div>
     </div>
-    <script id="init" type="application/json">{init_payload}</script>
+    <script id="init" type="text/plain">{init_payload}</script>
     <script>
       let pollingOn = true;
+      let streamDirty = false;  // stream data applied while auto-refresh was OFF, not yet rendered
       let sse = null;
       let filterQ = '';
       let byId = new Map();
       let ids = [];
       let selectedId = null;
+      let detailMountedId = null;  // scheduler currently mounted in #detail (patched in place on SSE)
+      let detailSceRev = -1;  // scenariosRev the mounted card's SCE <option>s were built from
+      let listDirty = true;  // scheduler data changed since #list was built
+      let listKey = null;    // ids shown in #list at last build
+      let listSelected = null;
       let scenarios = {{}};
+      let scenariosRev = 0;  // bump on every scenarios mutation (invalidates the <option> cache)
+      let sceOptsCache = {{ rev: -1, base: '' }};
+      const DAYS_SHORT = [
+        ['MON','Lun'], ['TUE','Mar'], ['WED','Mer'], ['THU','Gio'], ['FRI','Ven'], ['SAT','Sab'], ['SUN','Dom']
+      ];
+      const DAYS_FULL = [
+        ['MON','Lunedì'], ['TUE','Martedì'], ['WED','Mercoledì'], ['THU','Giovedì'],
+        ['FRI','Venerdì'], ['SAT','Sabato'], ['SUN','Domenica']
+      ];
 
+      // Single regex pass + lookup table; strings without unsafe chars are returned as-is.
+      const ESC_MAP = {{'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#39;'}};
       function esc(s) {{
-        return String(s).replaceAll('&','&amp;').replaceAll('<','&lt;').replaceAll('>','&gt;').replaceAll('\"','&quot;').replaceAll(\"'\",'&#39;');
+        return String(s).replace(/[&<>"']/g, c => ESC_MAP[c]);
+      }}
+
+      function decodeInit(el) {{
+        const bin = atob(String((el && el.textContent) || '').trim());
+        if (typeof TextDecoder === 'function') {{
+          return JSON.parse(new TextDecoder().decode(Uint8Array.from(bin, c => c.charCodeAt(0))));
+        }}
+        return JSON.parse(decodeURIComponent(escape(bin)));
       }}
 
       function parseInit() {{
         const el = document.getElementById('init');
         let payload = null;
-        try {{ payload = JSON.parse(el.textContent || '{{}}'); }} catch (_e) {{ payload = null; }}
+        try {{ payload = decodeInit(el); }} catch (_e) {{ payload = null; }}
         const list = (payload && payload.timers) ? payload.timers : [];
         scenarios = (payload && payload.scenarios) ? payload.scenarios : {{}};
+        scenariosRev++;
         byId = new Map();
         ids = [];
         for (const it of list) {{
@@ -13365,11 +14002,8 @@ def render_timers(snapshot):
       }}
 
       function daysStr(it) {{
-        const map = [
-          ['MON','Lun'], ['TUE','Mar'], ['WED','Mer'], ['THU','Gio'], ['FRI','Ven'], ['SAT','Sab'], ['SUN','Dom']
-        ];
         const out = [];
-        for (const pair of map) {{
+        for (const pair of DAYS_SHORT) {{
           const k = pair[0], lab = pair[1];
           if (String(it[k] ?? '').toUpperCase() === 'T') out.push(lab);
         }}
@@ -13421,15 +14055,16 @@ def render_timers(snapshot):
       }}
 
       function scenarioOptions(current) {{
-        const opts = [];
-        opts.push('<option value=\"0\">Nessuno</option>');
-        const keys = Object.keys(scenarios || {{}}).sort((a,b) => (parseInt(a,10)||0) - (parseInt(b,10)||0));
-        for (const sid of keys) {{
-          const name = scenarios[sid];
-          const sel = String(current) === String(sid) ? ' selected' : '';
-          opts.push('<option value=\"' + esc(sid) + '\"' + sel + '>' + esc(name) + '</option>');
+        if (sceOptsCache.rev !== scenariosRev) {{
+          const opts = ['<option value=\"0\">Nessuno</option>'];
+          const keys = Object.keys(scenarios || {{}}).sort((a,b) => (parseInt(a,10)||0) - (parseInt(b,10)||0));
+          for (const sid of keys) {{
+            opts.push('<option value=\"' + esc(sid) + '\">' + esc(scenarios[sid]) + '</option>');
+          }}
+          sceOptsCache = {{ rev: scenariosRev, base: opts.join('') }};
         }}
-        return opts.join('');
+        const needle = '<option value=\"' + esc(String(current)) + '\">';
+        return sceOptsCache.base.replace(needle, needle.slice(0, -1) + ' selected>');
       }}
 
       function detailHtml(it) {{
@@ -13441,39 +14076,34 @@ def render_timers(snapshot):
         const sceId = String(it.SCE ?? '0');
         const excl = String(it.EXCL_HOLIDAYS ?? '').toUpperCase() === 'T';
 
-        const daysMap = [
-          ['MON','Lunedì'], ['TUE','Martedì'], ['WED','Mercoledì'], ['THU','Giovedì'],
-          ['FRI','Venerdì'], ['SAT','Sabato'], ['SUN','Domenica']
-        ];
-
         const gen = '<div class=\"card\">' +
           '<h3>Generali</h3>' +
           '<div class=\"row\">' +
             '<div><div class=\"label\">Abilitato</div></div>' +
-            '<div><input class=\"switch\" type=\"checkbox\" ' + (en ? 'checked' : '') + ' data-id=\"' + esc(id) + '\" data-kind=\"en\"/></div>' +
+            '<div><input class=\"switch\" type=\"checkbox\" ' + (en ? 'checked' : '') + ' data-id=\"' + esc(id) + '\" data-kind=\"en\" data-field=\"EN\"/></div>' +
           '</div>' +
           '<div class=\"row\">' +
             '<div style=\"flex:1; padding-right:10px;\"><div class=\"label\">Descrizione</div></div>' +
             '<div style=\"flex:2;\">' +
-              '<input data-id=\"' + esc(id) + '\" data-kind=\"des\" value=\"' + esc(desc) + '\" style=\"width:100%; background: var(--input-bg); color: var(--input-fg); border:1px solid var(--border); border-radius:8px; padding:6px 8px;\"/>' +
+              '<input data-id=\"' + esc(id) + '\" data-kind=\"des\" data-field=\"DES\" value=\"' + esc(desc) + '\" style=\"width:100%; background: var(--input-bg); color: var(--input-fg); border:1px solid var(--border); border-radius:8px; padding:6px 8px;\"/>' +
             '</div>' +
           '</div>' +
           '<div class=\"row\">' +
             '<div style=\"flex:1; padding-right:10px;\"><div class=\"label\">Scenario</div></div>' +
             '<div style=\"flex:2;\">' +
-              '<select data-id=\"' + esc(id) + '\" data-kind=\"sce\">' + scenarioOptions(sceId) + '</select>' +
+              '<select data-id=\"' + esc(id) + '\" data-kind=\"sce\" data-field=\"SCE\">' + scenarioOptions(sceId) + '</select>' +
             '</div>' +
           '</div>' +
         '</div>';
 
         const rep = '<div class=\"card\">' +
           '<h3>Ripetizioni</h3>' +
-          daysMap.map(pair => {{
+          DAYS_FULL.map(pair => {{
             const k = pair[0], label = pair[1];
             const on = String(it[k] ?? '').toUpperCase() === 'T';
             return '<div class=\"day\">' +
               '<div class=\"value\">' + esc(label) + '</div>' +
-              '<div><input class=\"switch\" type=\"checkbox\" ' + (on ? 'checked' : '') + ' data-id=\"' + esc(id) + '\" data-kind=\"day\" data-day=\"' + esc(k) + '\"/></div>' +
+              '<div><input class=\"switch\" type=\"checkbox\" ' + (on ? 'checked' : '') + ' data-id=\"' + esc(id) + '\" data-kind=\"day\" data-day=\"' + esc(k) + '\" data-field=\"' + esc(k) + '\"/></div>' +
             '</div>';
           }}).join('') +
         '</div>';
@@ -13481,11 +14111,11 @@ def render_timers(snapshot):
         const orario = '<div class=\"card\">' +
           '<h3>Orario</h3>' +
           '<div class=\"row\">' +
-            '<div><div class=\"label\">Tipo</div><div class=\"value\">' + esc(typ) + '</div></div>' +
+            '<div><div class=\"label\">Tipo</div><div class=\"value\" data-field=\"TYPE\">' + esc(typ) + '</div></div>' +
           '</div>' +
           '<div class=\"row\">' +
             '<div><div class=\"label\">Orario</div></div>' +
-            '<div><input class=\"mono\" type=\"time\" value=\"' + esc(when) + '\" data-id=\"' + esc(id) + '\" data-kind=\"time\"/></div>' +
+            '<div><input class=\"mono\" type=\"time\" value=\"' + esc(when) + '\" data-id=\"' + esc(id) + '\" data-kind=\"time\" data-field=\"TIME\"/></div>' +
           '</div>' +
         '</div>';
 
@@ -13493,7 +14123,7 @@ def render_timers(snapshot):
           '<h3>Festivi</h3>' +
           '<div class=\"row\">' +
             '<div><div class=\"label\">Escludi festivi</div></div>' +
-            '<div><input class=\"switch\" type=\"checkbox\" ' + (excl ? 'checked' : '') + ' data-id=\"' + esc(id) + '\" data-kind=\"hol\"/></div>' +
+            '<div><input class=\"switch\" type=\"checkbox\" ' + (excl ? 'checked' : '') + ' data-id=\"' + esc(id) + '\" data-kind=\"hol\" data-field=\"EXCL_HOLIDAYS\"/></div>' +
           '</div>' +
           '<div class=\"small\" style=\"margin-top:6px;\">Calendario festivi: vedi CFG_HOLIDAYS</div>' +
         '</div>';
@@ -13503,7 +14133,7 @@ def render_timers(snapshot):
 
       function filteredIds() {{
         if (!filterQ) return ids.slice();
-        const q = filterQ.toLowerCase();
+        const q = filterQ;
         const out = [];
         for (const id of ids) {{
           const it = byId.get(id);
@@ -13517,116 +14147,167 @@ def render_timers(snapshot):
       function render() {{
         const list = filteredIds();
         if (selectedId === null && list.length) selectedId = list[0];
-        const listRows = [];
-        for (const id of list) {{
-          const it = byId.get(id);
-          if (it) listRows.push(listHtml(it));
-        }}
         const listEl = document.getElementById('list');
-        if (listEl) listEl.innerHTML = listRows.join('') || '<span class=\"small\">Nessun elemento</span>';
+        const key = list.join(',');
+        if (listDirty || key !== listKey) {{
+          const listRows = [];
+          for (const id of list) {{
+            const it = byId.get(id);
+            if (it) listRows.push(listHtml(it));
+          }}
+          if (listEl) listEl.innerHTML = listRows.join('') || '<span class=\"small\">Nessun elemento</span>';
+          listDirty = false;
+          listKey = key;
+          listSelected = selectedId;
+        }} else if (listEl && listSelected !== selectedId) {{
+          // Selection only: move the "active" class instead of rebuilding the list.
+          if (listSelected !== null) {{
+            const prev = listEl.querySelector('.list-item[data-id=\"' + String(listSelected) + '\"]');
+            if (prev) prev.classList.remove('active');
+          }}
+          const cur = listEl.querySelector('.list-item[data-id=\"' + String(selectedId) + '\"]');
+          if (cur) cur.classList.add('active');
+          listSelected = selectedId;
+        }}
 
         const sel = selectedId !== null ? byId.get(String(selectedId)) : null;
         const detEl = document.getElementById('detail');
-        if (detEl) detEl.innerHTML = sel ? detailHtml(sel) : '<span class=\"small\">Seleziona un programmatore</span>';
-
-        const items = document.querySelectorAll('.list-item[data-id]');
-        for (const el of items) {{
-          el.onclick = () => {{
-            selectedId = el.dataset.id;
-            render();
-          }};
+        if (!detEl) return;
+        if (!sel) {{
+          detEl.innerHTML = '<span class=\"small\">Seleziona un programmatore</span>';
+          detailMountedId = null;
+        }} else if (detailMountedId !== String(selectedId)) {{
+          detEl.innerHTML = detailHtml(sel);
+          detailMountedId = String(selectedId);
+          detailSceRev = scenariosRev;
+        }} else {{
+          patchDetail(detEl, sel);
         }}
-
-        wireControls();
       }}
 
-      function wireControls() {{
-        const toggles = document.querySelectorAll('input[type=\"checkbox\"][data-kind=\"en\"][data-id]');
-        for (const t of toggles) {{
-          t.onchange = async () => {{
-            const id = Number(t.dataset.id);
-            const val = t.checked ? 'ON' : 'OFF';
-            try {{
-              await sendCmd('schedulers', id, 'set_enabled', val);
-            }} catch (_e) {{}}
-          }};
-        }}
-        const times = document.querySelectorAll('input[type=\"time\"][data-kind=\"time\"][data-id]');
-        for (const ti of times) {{
-          ti.onchange = async () => {{
-            const id = Number(ti.dataset.id);
-            const v = String(ti.value || '').trim();
-            if (!v) return;
-            try {{
-              await sendCmd('schedulers', id, 'set_time', v);
-            }} catch (_e) {{}}
-          }};
-        }}
-        const sceSel = document.querySelectorAll('select[data-kind=\"sce\"][data-id]');
-        for (const s of sceSel) {{
-          s.onchange = async () => {{
-            const id = Number(s.dataset.id);
-            const v = Number(s.value || '0');
-            try {{
-              await sendCmd('schedulers', id, 'set_scenario', v);
-            }} catch (_e) {{}}
-          }};
-        }}
-        const descInputs = document.querySelectorAll('input[data-kind=\"des\"][data-id]');
-        for (const inp of descInputs) {{
-          inp.onchange = async () => {{
-            const id = Number(inp.dataset.id);
-            const v = String(inp.value || '').trim();
-            if (!v) return;
-            try {{
-              await sendCmd('schedulers', id, 'set_description', v);
-            }} catch (_e) {{}}
-          }};
-        }}
-        const hol = document.querySelectorAll('input[type=\"checkbox\"][data-kind=\"hol\"][data-id]');
-        for (const h of hol) {{
-          h.onchange = async () => {{
-            const id = Number(h.dataset.id);
-            const val = h.checked ? 'ON' : 'OFF';
-            try {{
-              await sendCmd('schedulers', id, 'set_excl_holidays', val);
-            }} catch (_e) {{}}
-          }};
+      // Update only the fields that differ, keeping focus/selection of the mounted card.
+      function patchDetail(detEl, it) {{
+        const field = (f) => detEl.querySelector('[data-field=\"' + f + '\"]');
+        const setChecked = (f, on) => {{
+          const el = field(f);
+          if (el && el.checked !== on) el.checked = on;
+        }};
+        const setValue = (f, v) => {{
+          const el = field(f);
+          if (el && el !== document.activeElement && el.value !== v) el.value = v;
+        }};
+        setChecked('EN', String(it.EN ?? '').toUpperCase() === 'T');
+        setChecked('EXCL_HOLIDAYS', String(it.EXCL_HOLIDAYS ?? '').toUpperCase() === 'T');
+        for (const pair of DAYS_FULL) {{
+          setChecked(pair[0], String(it[pair[0]] ?? '').toUpperCase() === 'T');
         }}
-        const days = document.querySelectorAll('input[type=\"checkbox\"][data-kind=\"day\"][data-id][data-day]');
-        for (const d of days) {{
-          d.onchange = async () => {{
-            const id = Number(d.dataset.id);
-            const patch = {{}};
-            const group = document.querySelectorAll('input[type=\"checkbox\"][data-kind=\"day\"][data-id=\"' + String(id) + '\"][data-day]');
-            for (const x of group) {{
-              patch[String(x.dataset.day)] = !!x.checked;
-            }}
-            try {{
-              await sendCmd('schedulers', id, 'set_days', patch);
-            }} catch (_e) {{}}
-          }};
+        setValue('DES', String(it.DES ?? ''));
+        if (detailSceRev !== scenariosRev) {{
+          // Scenario names changed: rebuild only the options, keeping the card (and DES focus) mounted.
+          const sceEl = field('SCE');
+          if (sceEl) {{
+            const cur = sceEl === document.activeElement ? sceEl.value : String(it.SCE ?? '0');
+            sceEl.innerHTML = scenarioOptions(cur);
+            sceEl.value = cur;
+          }}
+          detailSceRev = scenariosRev;
         }}
+        setValue('SCE', String(it.SCE ?? '0'));
+        setValue('TIME', timeStr(it));
+        const typ = field('TYPE');
+        const typVal = String(it.TYPE ?? 'TIME');
+        if (typ && typ.textContent !== typVal) typ.textContent = typVal;
       }}
 
-      function applyFilter() {{
-        filterQ = String(document.getElementById('q').value || '').trim();
+      // One delegated listener per container (bound once), instead of re-wiring every control after each render().
+      function onListClick(ev) {{
+        const el = ev.target && ev.target.closest ? ev.target.closest('.list-item[data-id]') : null;
+        if (!el) return;
+        selectedId = el.dataset.id;
         render();
       }}
 
-      function connectSSE() {{
-        if (sse) try {{ sse.close(); }} catch (_e) {{}}
-        sse = new EventSource('/api/stream');
-        sse.onmessage = (ev) => {{
-          if (!pollingOn) return;
+      async function onDetailChange(ev) {{
+        const t = ev.target;
+        if (!t || !t.dataset || !t.dataset.kind || !t.dataset.id) return;
+        const id = Number(t.dataset.id);
+        try {{
+          switch (t.dataset.kind) {{
+            case 'en':
+              await sendCmd('schedulers', id, 'set_enabled', t.checked ? 'ON' : 'OFF');
+              break;
+            case 'time': {{
+              const v = String(t.value || '').trim();
+              if (v) await sendCmd('schedulers', id, 'set_time', v);
+              break;
+            }}
+            case 'sce':
+              await sendCmd('schedulers', id, 'set_scenario', Number(t.value || '0'));
+              break;
+            case 'des': {{
+              const v = String(t.value || '').trim();
+              if (v) await sendCmd('schedulers', id, 'set_description', v);
+              break;
+            }}
+            case 'hol':
+              await sendCmd('schedulers', id, 'set_excl_holidays', t.checked ? 'ON' : 'OFF');
+              break;
+            case 'day': {{
+              const patch = {{}};
+              const group = document.querySelectorAll('input[type=\"checkbox\"][data-kind=\"day\"][data-id=\"' + String(id) + '\"][data-day]');
+              for (const x of group) {{
+                patch[String(x.dataset.day)] = !!x.checked;
+              }}
+              await sendCmd('schedulers', id, 'set_days', patch);
+              break;
+            }}
+          }}
+        }} catch (_e) {{}}
+      }}
+
+      function applyFilter() {{
+        filterQ = String(document.getElementById('q').value || '').trim().toLowerCase();
+        render();
+      }}
+
+      function onStreamData(text) {{
+          // Delta frames only carry changed fields: keep applying them while paused, skip only the DOM work.
           let data = null;
-          try {{ data = JSON.parse(ev.data); }} catch (_e) {{ return; }}
+          try {{ data = JSON.parse(text); }} catch (_e) {{ return; }}
           const meta = data.meta || {{}};
-          const lastUpdateStr = meta.last_update ? new Date(meta.last_update * 1000).toISOString().replace('T', ' ').slice(0, 19) : '-';
-          const el = document.getElementById('lastUpdate');
-          if (el) el.innerText = lastUpdateStr;
-          const ents = data.entities || [];
+          if (meta.last_update && pollingOn) {{
+            const el = document.getElementById('lastUpdate');
+            if (el) el.innerText = new Date(meta.last_update * 1000).toISOString().replace('T', ' ').slice(0, 19);
+          }}
           let changed = false;
+          let sceChanged = false;  // scenario names only: refresh the SCE options, not the card
+          if (data.type === 'delta') {{
+            for (const op of (data.ops || [])) {{
+              if (!op || op.op !== 'upsert') continue;
+              const t = String(op.type || '').toLowerCase();
+              const id = String(op.id ?? '');
+              if (!id) continue;
+              const patch = op.patch || {{}};
+              if (t === 'schedulers') {{
+                let cur = byId.get(id);
+                if (!cur) {{
+                  cur = {{ ID: op.id }};
+                  byId.set(id, cur);
+                  ids.push(id);
+                }}
+                Object.assign(cur, patch);
+                changed = true;
+              }} else if (t === 'scenarios') {{
+                const nm = patch.DES || patch.NM;
+                if (nm && scenarios[id] !== String(nm)) {{
+                  scenarios[id] = String(nm);
+                  scenariosRev++;
+                  sceChanged = true;
+                }}
+              }}
+            }}
+          }}
+          const ents = data.entities || [];
           for (const e of ents) {{
             if (!e || String(e.type || '').toLowerCase() !== 'schedulers') continue;
             const id = String(e.id ?? '');
@@ -13643,19 +14324,98 @@ def render_timers(snapshot):
             const sid = String(e.id ?? '');
             const st = (e.static && typeof e.static === 'object') ? e.static : {{}};
             const nm = st.DES || st.NM || e.name || sid;
-            if (sid) scenarios[sid] = String(nm || sid);
+            if (sid && scenarios[sid] !== String(nm || sid)) {{
+              scenarios[sid] = String(nm || sid);
+              scenariosRev++;
+              sceChanged = true;
+            }}
+          }}
+          if (!changed && sceChanged) {{
+            if (pollingOn) render();
+            else streamDirty = true;
           }}
           if (changed) {{
+            listDirty = true;
             ids.sort((a,b) => (parseInt(a,10)||0) - (parseInt(b,10)||0));
-            document.getElementById('count').innerText = String(ids.length);
-            render();
+            if (pollingOn) {{
+              document.getElementById('count').innerText = String(ids.length);
+              render();
+            }} else {{
+              streamDirty = true;
+            }}
           }}
-        }};
-        sse.onerror = () => {{
-          try {{ sse.close(); }} catch (_e) {{}}
+      }}
+
+      function sseData(block) {{
+        if (block.startsWith('data: ') && block.indexOf('\\n') < 0) return block.slice(6);
+        let out = null;
+        for (const line of block.split('\\n')) {{
+          if (!line.startsWith('data:')) continue;
+          const v = line.charCodeAt(5) === 32 ? line.slice(6) : line.slice(5);
+          out = out === null ? v : out + '\\n' + v;
+        }}
+        return out;
+      }}
+
+      // SSE over fetch: events are split on raw "\\n\\n" bytes and only complete events get decoded.
+      async function readStream(signal) {{
+        const res = await fetch('/api/stream?delta=1', {{ headers: {{ Accept: 'text/event-stream' }}, cache: 'no-store', signal }});
+        if (!res.ok || !res.body) throw new Error('stream');
+        const reader = res.body.getReader();
+        const dec = new TextDecoder();
+        let buf = null;
+        let scan = 0;
+        for (;;) {{
+          const r = await reader.read();
+          if (r.done) return;
+          let chunk = r.value;
+          if (buf) {{
+            const m = new Uint8Array(buf.length + chunk.length);
+            m.set(buf);
+            m.set(chunk, buf.length);
+            chunk = m;
+          }}
+          let start = 0;
+          let i = chunk.indexOf(10, scan);
+          while (i >= 0 && i + 1 < chunk.length) {{
+            if (chunk[i + 1] !== 10) {{
+              i = chunk.indexOf(10, i + 1);
+              continue;
+            }}
+            // Comment frames (": ping") are skipped without decoding.
+            if (i > start && chunk[start] !== 58) {{
+              const text = sseData(dec.decode(chunk.subarray(start, i)));
+              if (text !== null) onStreamData(text);
+            }}
+            start = i + 2;
+            i = chunk.indexOf(10, start);
+          }}
+          buf = start < chunk.length ? chunk.subarray(start) : null;
+          scan = buf ? Math.max(0, buf.length - 1) : 0;
+        }}
+      }}
+
+      function connectSSE() {{
+        if (sse) try {{ sse.close(); }} catch (_e) {{}}
+        sse = null;
+        if (!(window.ReadableStream && window.TextDecoder && window.AbortController)) {{
+          sse = new EventSource('/api/stream?delta=1');
+          sse.onmessage = (ev) => onStreamData(ev.data);
+          sse.onerror = () => {{
+            try {{ sse.close(); }} catch (_e) {{}}
+            sse = null;
+            setTimeout(() => connectSSE(), 1500);
+          }};
+          return;
+        }}
+        const ctl = new AbortController();
+        const conn = {{ close: () => ctl.abort() }};
+        sse = conn;
+        readStream(ctl.signal).catch(() => {{}}).then(() => {{
+          if (ctl.signal.aborted || sse !== conn) return;
           sse = null;
           setTimeout(() => connectSSE(), 1500);
-        }};
+        }});
       }}
 
       async function refreshScenarios() {{
@@ -13672,8 +14432,11 @@ def render_timers(snapshot):
             const nm = st.DES || st.NM || e.name || sid;
             if (sid) next[sid] = String(nm || sid);
           }}
-          if (Object.keys(next).length) {{
+          const keys = Object.keys(next);
+          const same = keys.length === Object.keys(scenarios).length && keys.every((k) => scenarios[k] === next[k]);
+          if (keys.length && !same) {{
             scenarios = next;
+            scenariosRev++;
             render();
           }}
         }} catch (_e) {{}}
@@ -13682,8 +14445,16 @@ def render_timers(snapshot):
       document.getElementById('toggle').onclick = () => {{
         pollingOn = !pollingOn;
         document.getElementById('toggle').innerText = 'Auto-refresh: ' + (pollingOn ? 'ON' : 'OFF');
+        if (pollingOn && streamDirty) {{
+          streamDirty = false;
+          document.getElementById('count').innerText = String(ids.length);
+          render();
+        }}
       }};
 
+      document.getElementById('list').addEventListener('click', onListClick);
+      document.getElementById('detail').addEventListener('change', onDetailChange);
+
       parseInit();
       render();
       refreshScenarios();
@@ -13695,16 +14466,8 @@ def render_timers(snapshot):
     return html.encode("utf-8")
 
 
-class _Handler(BaseHTTPRequestHandler):
-    state = None  # type: LaresState
-    command_fn = None
-
-    def _inject_ingress_shim(self, body: bytes) -> bytes:
-        try:
-            html = body.decode("utf-8", errors="ignore")
-            if "</head>" not in html and "</body>" not in html:
-                return body
-            shim = r"""
+_INGRESS_SHIM_MARKER = "<!--_ingress_shim-->"
+_INGRESS_SHIM = _INGRESS_SHIM_MARKER + r"""
 <script>
   (function () {
     function ingressRoot() {
@@ -13820,70 +14583,352 @@ class _Handler(BaseHTTPRequestHandler):
   })();
 </script>
 """
-            # Insert early so page scripts that call fetch/EventSource immediately
-            # are already patched when they run (Ingress paths).
-            if "</head>" in html:
-                html = html.replace("</head>", shim + "\n</head>")
-            else:
-                html = html.replace("</body>", shim + "\n</body>")
-            return html.encode("utf-8")
-        except Exception:
+# Pre-encoded once; injected before </head> (or </body>) of every HTML response.
+_INGRESS_SHIM_BYTES = (_INGRESS_SHIM + "\n").encode("utf-8")
+_INGRESS_SHIM_MARKER_BYTES = _INGRESS_SHIM_MARKER.encode("utf-8")
+# Page bytes -> page with the shim. Cached pages are the same bytes object on every hit
+# (hash cached by CPython), so the splice runs once per rendered page.
+_SHIM_CACHE_MAX = 32
+_SHIM_CACHE = {}
+_SHIM_CACHE_LOCK = threading.Lock()
+
+
+def _with_ingress_shim(body) -> bytes:
+    # Insert early so page scripts that call fetch/EventSource immediately
+    # are already patched when they run (Ingress paths).
+    key = body if isinstance(body, bytes) else None
+    if key is not None:
+        with _SHIM_CACHE_LOCK:
+            hit = _SHIM_CACHE.get(key)
+        if hit is not None:
+            return hit
+    try:
+        i = body.find(b"</head>")
+        if i < 0:
+            i = body.find(b"</body>")
+        # Already injected (e.g. a page proxied back through us): never inject twice.
+        if i < 0 or _INGRESS_SHIM_MARKER_BYTES in body[:i]:
             return body
+        out = b"".join((body[:i], _INGRESS_SHIM_BYTES, body[i:]))
+    except Exception:
+        return body
+    if key is not None:
+        with _SHIM_CACHE_LOCK:
+            if len(_SHIM_CACHE) >= _SHIM_CACHE_MAX:
+                _SHIM_CACHE.pop(next(iter(_SHIM_CACHE)))
+            _SHIM_CACHE[key] = out
+    return out
+
+
+def _sse_pack(z, chunk: bytes) -> bytes:
+    if z is not None:
+        chunk = z.compress(chunk) + z.flush(zlib.Z_SYNC_FLUSH)
+    return chunk
+
+
+class _SSEPump:
+    """Single thread writing SSE frames to every open /api/stream socket.
+
+    Handler threads send the headers and the initial snapshot, then hand the socket over
+    and return, so idle dashboards don't each park a server thread.
+    """
+
+    def __init__(self, state: LaresState):
+        self.state = state
+        self._lock = threading.Lock()
+        self._clients = []  # [{"sock", "sub", "z", "last"}]
+        self._thread = None
+
+    def add(self, sock, sub, z):
+        try:
+            # A stuck client must not stall the others: never block the pump thread on a send.
+            sock.setblocking(False)
+        except Exception:
+            pass
+        with self._lock:
+            self._clients.append({"sock": sock, "sub": sub, "z": z, "buf": b"", "last": time.monotonic()})
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="debug_sse", daemon=True)
+                self._thread.start()
+
+    def _drop(self, client):
+        with self._lock:
+            try:
+                self._clients.remove(client)
+            except ValueError:
+                pass
+        self.state.unsubscribe(client["sub"])
+        try:
+            client["sock"].close()
+        except Exception:
+            pass
+
+    def _run(self):
+        seq = 0
+        wait = _SSE_PING_IDLE_SEC
+        while True:
+            seq = self.state.wait_frames(seq, timeout=wait)
+            with self._lock:
+                clients = list(self._clients)
+            now = time.monotonic()
+            wait = _SSE_PING_IDLE_SEC
+            for c in clients:
+                # All frames published since the last write, already encoded (see LaresState._publish_event).
+                chunk = self.state.frames_since(c["sub"])
+                if chunk is None and not c["buf"]:
+                    idle = now - c["last"]
+                    if idle < _SSE_PING_IDLE_SEC:
+                        wait = min(wait, _SSE_PING_IDLE_SEC - idle)
+                        continue
+                    # keep-alive, only on a quiet stream
+                    chunk = _SSE_PING
+                data = c["buf"]
+                if chunk is not None:
+                    # Compressed bytes are kept in order, so a partial write never breaks the gzip stream.
+                    data += _sse_pack(c["z"], chunk)
+                try:
+                    sent = c["sock"].send(data)
+                except (BlockingIOError, InterruptedError):
+                    sent = 0
+                except Exception:
+                    self._drop(c)
+                    continue
+                rest = data[sent:]
+                if len(rest) > _SSE_MAX_BACKLOG:
+                    self._drop(c)
+                    continue
+                c["buf"] = rest
+                if sent:
+                    c["last"] = now
+                if rest:
+                    wait = min(wait, _SSE_RETRY_SEC)
+
+
+_SSE_PUMPS = {}
+_SSE_PUMPS_LOCK = threading.Lock()
+
+
+def _sse_pump(state: LaresState) -> _SSEPump:
+    with _SSE_PUMPS_LOCK:
+        pump = _SSE_PUMPS.get(id(state))
+        if pump is None or pump.state is not state:
+            pump = _SSE_PUMPS[id(state)] = _SSEPump(state)
+        return pump
+
 
-    def _send(self, status, content_type, body: bytes):
-        if isinstance(body, (bytes, bytearray)) and str(content_type).startswith("text/html"):
+class _DebugHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer that leaves sockets handed to the SSE pump open after the handler returns."""
+
+    def __init__(self, *args, **kwargs):
+        self._detached = set()
+        self._detached_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def detach_request(self, request):
+        with self._detached_lock:
+            self._detached.add(id(request))
+
+    def _take_detached(self, request) -> bool:
+        with self._detached_lock:
+            if id(request) in self._detached:
+                self._detached.discard(id(request))
+                return True
+        return False
+
+    def shutdown_request(self, request):
+        if self._take_detached(request):
+            return
+        super().shutdown_request(request)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    state = None  # type: LaresState
+    command_fn = None
+
+    def _inject_ingress_shim(self, body: bytes) -> bytes:
+        return _with_ingress_shim(body)
+
+    def _send(self, status, content_type, body: bytes, cache_control: str | None = None, etag: str | None = None):
+        if (
+            isinstance(body, (bytes, bytearray))
+            and str(content_type).startswith("text/html")
+            and self._is_ingress_request()
+        ):
             body = self._inject_ingress_shim(body)
+        gzipped = False
+        ct = str(content_type)
+        if (
+            len(body) >= _GZIP_MIN_BYTES
+            and (ct.startswith("text/") or ct.startswith("application/json"))
+            and self._accepts_gzip()
+        ):
+            body = _gzip_cached(body)
+            gzipped = True
         self.send_response(status)
         self.send_header("Content-Type", content_type)
         self.send_header("Content-Length", str(len(body)))
-        self.send_header("Cache-Control", "no-store, max-age=0")
-        self.send_header("Pragma", "no-cache")
-        self.end_headers()
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Vary", "Accept-Encoding")
+        if etag:
+            self.send_header("ETag", etag)
+        if cache_control:
+            self.send_header("Cache-Control", str(cache_control))
+        else:
+            self.send_header("Cache-Control", "no-store, max-age=0")
+            self.send_header("Pragma", "no-cache")
+        self._cork(True)
         try:
+            self.end_headers()
             self.wfile.write(body)
         except (BrokenPipeError, ConnectionResetError):
             return
+        finally:
+            self._cork(False)
+
+    def _cork(self, on: bool):
+        # Hold the header block until the body follows, so both leave in full segments (Linux TCP_CORK).
+        if _TCP_CORK is None:
+            return
+        try:
+            self.connection.setsockopt(socket.IPPROTO_TCP, _TCP_CORK, 1 if on else 0)
+        except Exception:
+            pass
+
+    def _is_ingress_request(self) -> bool:
+        # Direct (non-Ingress) page loads don't need the URL-prefixing shim at all.
+        if getattr(self, "_ingress_prefix", ""):
+            return True
+        try:
+            return bool(self.headers.get("X-Ingress-Path"))
+        except Exception:
+            return False
+
+    def _log_ui_get(self, path: str):
+        try:
+            _UI_LOGGER.info("UI GET %s from %s", path, self.client_address[0])
+        except Exception:
+            pass
+
+    def _accepts_gzip(self) -> bool:
+        try:
+            return "gzip" in str(self.headers.get("Accept-Encoding") or "").lower()
+        except Exception:
+            return False
 
-    def _send_bytes(self, status, content_type, body: bytes, cache_control: str | None = None):
+    def _send_bytes(
+        self, status, content_type, body: bytes, cache_control: str | None = None, content_length: str | None = None
+    ):
         self.send_response(status)
         self.send_header("Content-Type", content_type)
-        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Content-Length", content_length or str(len(body)))
         if cache_control:
             self.send_header("Cache-Control", str(cache_control))
         else:
             self.send_header("Cache-Control", "no-store, max-age=0")
             self.send_header("Pragma", "no-cache")
-        self.end_headers()
+        self._cork(True)
         try:
+            self.end_headers()
             self.wfile.write(body)
         except (BrokenPipeError, ConnectionResetError):
             return
+        finally:
+            self._cork(False)
+
+    def _get_asset(self, name: str):
+        name = (name or "").strip().lower()
+        if name.endswith(".png"):
+            name = name[:-4]
+        entry = _ASSET_CACHE.get(name) or _load_asset(name)
+        if entry is None:
+            self._send(404, "text/plain; charset=utf-8", b"not found")
+            return
+        body, length = entry
+        self._send_bytes(
+            200, "image/png", body, cache_control="public, max-age=604800, immutable", content_length=length
+        )
 
-    def do_GET(self):
-        raw_path = urlparse(self.path).path
+    def _get_mdi_icon(self, raw: str):
+        if not raw.endswith(".svg"):
+            self._send(404, "text/plain; charset=utf-8", b"not found")
+            return
+        name = raw[:-4]
+        safe = _parse_mdi_icon(f"mdi:{name}")
+        if not safe:
+            self._send(404, "text/plain; charset=utf-8", b"not found")
+            return
+        try:
+            # Prefer bundled icons; fall back to /data cache (download on-demand).
+            bundled = os.path.join(_MDI_DIR, f"{safe}.svg")
+            cached = _mdi_cache_path(safe)
+            src = bundled if os.path.exists(bundled) else cached
+            if not os.path.exists(src):
+                if not _ensure_mdi_cached(safe):
+                    self._send(404, "text/plain; charset=utf-8", b"not found")
+                    return
+                src = cached
+            f = open(src, "rb")
+        except Exception:
+            self._send(404, "text/plain; charset=utf-8", b"not found")
+            return
+        with f:
+            self._send_file(200, "image/svg+xml", f, cache_control="public, max-age=86400")
+
+    def _get_thermostat_detail(self, tid: str):
+        # Static page (id read from the URL, data from /api/entities): revalidated by ETag, 304 on revisits.
+        etag = _THERMOSTAT_DETAIL_ETAG
+        inm = str(self.headers.get("If-None-Match") or "")
+        if inm and (inm.strip() == "*" or etag in (t.strip() for t in inm.split(","))):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
+        self._send(200, "text/html; charset=utf-8", _THERMOSTAT_DETAIL_BODY, cache_control="no-cache", etag=etag)
 
-        def _split_ingress(p: str):
-            try:
-                p = str(p or "")
-                if p.startswith("/api/hassio_ingress/"):
-                    parts = p.split("/")
-                    # ['', 'api', 'hassio_ingress', '<token>', ...]
-                    if len(parts) >= 4 and parts[3]:
-                        prefix = "/".join(parts[:4])
-                        rest = "/" + "/".join(parts[4:]) if len(parts) > 4 else "/"
-                        if rest == "/":
-                            return prefix, "/"
-                        return prefix, rest
-                m = re.match(r"^(/local_[^/]+/ingress)(/.*)?$", p)
-                if m:
-                    prefix = m.group(1)
-                    rest = m.group(2) or "/"
-                    return prefix, rest
-            except Exception:
-                pass
-            return "", p or "/"
+    def _render_page(self, key: str, renderer) -> bytes:
+        # Reuse the rendered page while state and ui_tags.json are unchanged; the short TTL
+        # covers the thermostat-name overrides that snapshot() reloads every few seconds.
+        ck = (key, self.state.revision(), _ui_tags_stamp())
+        now = time.time()
+        with _RENDER_CACHE_LOCK:
+            hit = _RENDER_CACHE.get(ck)
+        if hit is not None and (now - hit[0]) < _SNAPSHOT_JSON_TTL_SEC:
+            return hit[1]
+        body = renderer(self.state.snapshot())
+        with _RENDER_CACHE_LOCK:
+            _RENDER_CACHE.pop(ck, None)
+            while len(_RENDER_CACHE) >= _RENDER_CACHE_MAX:
+                _RENDER_CACHE.pop(next(iter(_RENDER_CACHE)))
+            _RENDER_CACHE[ck] = (now, body)
+        return body
+
+    def _send_file(self, status, content_type, f, cache_control: str | None = None):
+        # Body goes straight from the open file to the socket (os.sendfile where available).
+        size = os.fstat(f.fileno()).st_size
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(size))
+        if cache_control:
+            self.send_header("Cache-Control", str(cache_control))
+        else:
+            self.send_header("Cache-Control", "no-store, max-age=0")
+            self.send_header("Pragma", "no-cache")
+        self._cork(True)
+        try:
+            self.end_headers()
+            self.connection.sendfile(f, 0, size)
+        except (BrokenPipeError, ConnectionResetError):
+            return
+        finally:
+            self._cork(False)
+
+    def do_GET(self):
+        raw_path = _raw_path(self.path)
 
         ingress_prefix, path = _split_ingress(raw_path)
+        self._ingress_prefix = ingress_prefix
 
         # On the Ingress/debug port (8080), make the root path show the launcher menu by default.
         # Do not redirect /index_debug here, otherwise the menu cannot open index_debug via Ingress.
@@ -13914,48 +14959,22 @@ class _Handler(BaseHTTPRequestHandler):
         except Exception:
             pass
 
-        if path.startswith("/assets/"):
-            name = path.split("/", 2)[2]
-            name = (name or "").strip().lower()
-            if name.endswith(".png"):
-                name = name[:-4]
-            filename = _ASSET_MAP.get(name)
-            if not filename:
-                self._send(404, "text/plain; charset=utf-8", b"not found")
-                return
-            file_path = os.path.join(_ASSETS_DIR, filename)
-            try:
-                with open(file_path, "rb") as f:
-                    body = f.read()
-            except Exception:
-                self._send(404, "text/plain; charset=utf-8", b"not found")
-                return
-            self._send_bytes(200, "image/png", body, cache_control="public, max-age=604800, immutable")
+        key = path.rstrip("/") or "/"
+        if key == "/ui_tags_raw":
+            # Only reads ui_tags.json: no snapshot, not tied to the state revision cache.
+            self._send(200, "text/html; charset=utf-8", render_ui_tags_raw())
+            return
+        route = _GET_ROUTES.get(key)
+        if route is not None:
+            renderer, log_access = route
+            if log_access and _UI_LOGGER.isEnabledFor(logging.INFO):
+                self._log_ui_get(path)
+            self._send(200, "text/html; charset=utf-8", self._render_page(key, renderer))
             return
 
-        if path.startswith("/api/icons/mdi/") and path.endswith(".svg"):
-            raw = path[len("/api/icons/mdi/") :]
-            name = raw[:-4] if raw.lower().endswith(".svg") else raw
-            safe = _parse_mdi_icon(f"mdi:{name}")
-            if not safe:
-                self._send(404, "text/plain; charset=utf-8", b"not found")
-                return
-            try:
-                # Prefer bundled icons; fall back to /data cache (download on-demand).
-                bundled = os.path.join(_MDI_DIR, f"{safe}.svg")
-                cached = _mdi_cache_path(safe)
-                src = bundled if os.path.exists(bundled) else cached
-                if not os.path.exists(src):
-                    if not _ensure_mdi_cached(safe):
-                        self._send(404, "text/plain; charset=utf-8", b"not found")
-                        return
-                    src = cached
-                with open(src, "rb") as f:
-                    body = f.read()
-            except Exception:
-                self._send(404, "text/plain; charset=utf-8", b"not found")
-                return
-            self._send_bytes(200, "image/svg+xml", body, cache_control="public, max-age=86400")
+        handler, rest = _match_prefix_route(path)
+        if handler is not None:
+            handler(self, rest)
             return
 
         if path == "/api/icons/used":
@@ -13973,165 +14992,20 @@ class _Handler(BaseHTTPRequestHandler):
                                 icons.add(f"mdi:{mdi}")
             except Exception:
                 icons = set()
-            body = json.dumps({"icons": sorted(icons)}, ensure_ascii=False).encode("utf-8")
+            body = _json_bytes({"icons": sorted(icons)})
             self._send(200, "application/json; charset=utf-8", body)
             return
 
-        if path in ("/security", "/security/"):
-            try:
-                _UI_LOGGER.info("UI GET %s from %s", path, self.client_address[0])
-            except Exception:
-                pass
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_security_ui(snap))
-            return
-        if path in ("/menu", "/menu/"):
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_menu(snap))
-            return
-        if path in ("/security/partitions", "/security/partitions/"):
-            try:
-                _UI_LOGGER.info("UI GET %s from %s", path, self.client_address[0])
-            except Exception:
-                pass
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_security_partitions(snap))
-            return
-        if path in ("/security/scenarios", "/security/scenarios/"):
-            try:
-                _UI_LOGGER.info("UI GET %s from %s", path, self.client_address[0])
-            except Exception:
-                pass
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_security_scenarios(snap))
-            return
-        if path in ("/security/sensors", "/security/sensors/"):
-            try:
-                _UI_LOGGER.info("UI GET %s from %s", path, self.client_address[0])
-            except Exception:
-                pass
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_security_sensors(snap))
-            return
-        if path in ("/security/reset", "/security/reset/"):
-            try:
-                _UI_LOGGER.info("UI GET %s from %s", path, self.client_address[0])
-            except Exception:
-                pass
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_security_reset(snap))
-            return
-        if path in ("/security/info", "/security/info/"):
-            try:
-                _UI_LOGGER.info("UI GET %s from %s", path, self.client_address[0])
-            except Exception:
-                pass
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_security_info(snap))
-            return
-        if path in ("/security/users", "/security/users/"):
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_security_users(snap))
-            return
-        if path in ("/security/timers", "/security/timers/"):
-            try:
-                _UI_LOGGER.info("UI GET %s from %s", path, self.client_address[0])
-            except Exception:
-                pass
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_security_timers(snap))
-            return
-        if path in ("/security/functions", "/security/functions/"):
-            try:
-                _UI_LOGGER.info("UI GET %s from %s", path, self.client_address[0])
-            except Exception:
-                pass
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_security_functions(snap))
-            return
-        if path in ("/security/functions/all", "/security/functions/all/"):
-            try:
-                _UI_LOGGER.info("UI GET %s from %s", path, self.client_address[0])
-            except Exception:
-                pass
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_security_functions_all(snap))
-            return
-        if path in ("/security/functions/outputs", "/security/functions/outputs/"):
-            try:
-                _UI_LOGGER.info("UI GET %s from %s", path, self.client_address[0])
-            except Exception:
-                pass
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_security_functions_outputs(snap))
-            return
-        if path in ("/security/functions/sia-ip", "/security/functions/sia-ip/"):
-            try:
-                _UI_LOGGER.info("UI GET %s from %s", path, self.client_address[0])
-            except Exception:
-                pass
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_security_sia_ip(snap))
-            return
-        if path in ("/security/favorites", "/security/favorites/"):
-            try:
-                _UI_LOGGER.info("UI GET %s from %s", path, self.client_address[0])
-            except Exception:
-                pass
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_security_favorites(snap))
-            return
-        if path in ("/index_debug/tag_styles", "/index_debug/tag_styles/"):
-            try:
-                _UI_LOGGER.info("UI GET %s from %s", path, self.client_address[0])
-            except Exception:
-                pass
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_index_tag_styles(snap))
-            return
-        if path in ("/", "/index_debug", "/index_debug/"):
-            try:
-                _UI_LOGGER.info("UI GET %s from %s", path, self.client_address[0])
-            except Exception:
-                pass
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_index(snap))
-            return
-        if path in ("/thermostats", "/thermostats/"):
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_thermostats(snap))
-            return
-        if path.startswith("/thermostats/"):
-            tid = path.split("/", 2)[2] if len(path.split("/")) >= 3 else ""
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_thermostat_detail(snap, tid))
-            return
-        if path in ("/logs", "/logs/"):
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_logs(snap))
-            return
-        if path in ("/timers", "/timers/"):
-            snap = self.state.snapshot()
-            self._send(200, "text/html; charset=utf-8", render_timers(snap))
-            return
-        if path in ("/ui_tags_raw", "/ui_tags_raw/"):
-            self._send(200, "text/html; charset=utf-8", render_ui_tags_raw())
-            return
         if path == "/api/entities":
-            snap = self.state.snapshot()
-            snap["ui_rev"] = UI_REV
-            body = json.dumps(snap, ensure_ascii=False).encode("utf-8")
-            self._send(200, "application/json; charset=utf-8", body)
+            self._send(200, "application/json; charset=utf-8", self.state.snapshot_json())
             return
         if path == "/api/ui_tags":
-            body = json.dumps(_load_ui_tags(), ensure_ascii=False).encode("utf-8")
-            self._send(200, "application/json; charset=utf-8", body)
+            self._send(200, "application/json; charset=utf-8", _load_ui_tags_json())
             return
         if path == "/api/ui_favorites":
             try:
-                with _UI_FAVORITES_LOCK:
-                    favs = _load_ui_favorites()
-                self._send(200, "application/json; charset=utf-8", json.dumps(favs).encode("utf-8"))
+                body = _load_ui_favorites_json()
+                self._send(200, "application/json; charset=utf-8", body)
             except Exception:
                 self._send(500, "text/plain; charset=utf-8", b"error")
             return
@@ -14141,61 +15015,70 @@ class _Handler(BaseHTTPRequestHandler):
             self.send_header("Cache-Control", "no-store, max-age=0")
             self.send_header("Pragma", "no-cache")
             self.send_header("Connection", "keep-alive")
-            self.end_headers()
-
-            q = self.state.subscribe()
+            # Per-connection gzip stream; every frame is sync-flushed so the browser sees it immediately.
+            z = zlib.compressobj(1, zlib.DEFLATED, 31) if self._accepts_gzip() else None
+            if z is not None:
+                self.send_header("Content-Encoding", "gzip")
+                self.send_header("Vary", "Accept-Encoding")
+
+            delta = "delta=1" in self.path.partition("?")[2]
+            sub = self.state.subscribe(delta=delta)
             try:
-                snap = self.state.snapshot()
-                snap["ui_rev"] = UI_REV
-                self.wfile.write(
-                    ("data: " + json.dumps(snap, ensure_ascii=False) + "\n\n").encode("utf-8")
-                )
-                self.wfile.flush()
-
-                while True:
-                    try:
-                        ev = q.get(timeout=15)
-                    except queue.Empty:
-                        # keep-alive
-                        self.wfile.write(b": ping\n\n")
-                        self.wfile.flush()
-                        continue
-                    self.wfile.write(
-                        ("data: " + json.dumps(ev, ensure_ascii=False) + "\n\n").encode("utf-8")
-                    )
-                    self.wfile.flush()
+                try:
+                    # Frames are small and latency-sensitive; don't let Nagle hold them back.
+                    self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                except Exception:
+                    pass
+                # Status line, headers and the initial snapshot go out in a single send.
+                self._headers_buffer.append(b"\r\n")
+                out = bytearray().join(self._headers_buffer)
+                self._headers_buffer = []
+                out += _sse_pack(z, b"".join((_SSE_DATA, self.state.snapshot_json(), _SSE_END)))
+                self.connection.sendall(out)
+                # From here on the shared pump thread owns the socket; this handler thread returns.
+                self.server.detach_request(self.connection)
+                _sse_pump(self.state).add(self.connection, sub, z)
+                self.close_connection = True
+                sub = None
             except (BrokenPipeError, ConnectionResetError):
                 pass
             except Exception:
                 pass
             finally:
-                self.state.unsubscribe(q)
+                if sub is not None:
+                    self.state.unsubscribe(sub)
             return
         self._send(404, "text/plain; charset=utf-8", b"not found")
 
+    def _read_json_body(self):
+        # Body read straight into one buffer and parsed as bytes (json handles UTF-8 itself).
+        length = int(self.headers.get("Content-Length") or "0")
+        if length <= 0:
+            return {}
+        if length > _MAX_POST_BYTES:
+            raise ValueError("payload too large")
+        buf = bytearray(length)
+        view = memoryview(buf)
+        got = 0
+        while got < length:
+            n = self.rfile.readinto(view[got:])
+            if not n:
+                break
+            got += n
+        view.release()
+        return json.loads(buf if got == length else buf[:got])
+
     def do_POST(self):
-        path = urlparse(self.path).path
+        path = _raw_path(self.path)
         if path == "/api/ui_favorites":
             try:
-                length = int(self.headers.get("Content-Length") or "0")
-                raw = self.rfile.read(length) if length > 0 else b"{}"
-                payload = json.loads(raw.decode("utf-8"))
+                payload = self._read_json_body()
                 etype = str(payload.get("type") or "").strip()
                 eid = str(payload.get("id") or "").strip()
                 fav = bool(payload.get("fav", False))
                 if etype not in ("outputs", "scenarios", "zones", "partitions") or not eid:
                     raise ValueError("invalid payload")
-                with _UI_FAVORITES_LOCK:
-                    favs = _load_ui_favorites()
-                    bucket = favs.get(etype, {})
-                    if not isinstance(bucket, dict):
-                        bucket = {}
-                    if fav:
-                        bucket[eid] = True
-                    else:
-                        bucket.pop(eid, None)
-                    favs[etype] = bucket
-                    _save_ui_favorites(favs)
+                _set_ui_favorite(etype, eid, fav)
                 self._send(200, "application/json; charset=utf-8", b'{"ok":true}')
             except Exception as exc:
                 body = json.dumps({"ok": False, "error": str(exc)}, ensure_ascii=False).encode("utf-8")
@@ -14210,9 +15093,7 @@ class _Handler(BaseHTTPRequestHandler):
             self._send(503, "text/plain; charset=utf-8", b"command handler not ready")
             return
         try:
-            length = int(self.headers.get("Content-Length") or "0")
-            raw = self.rfile.read(length) if length > 0 else b"{}"
-            payload = json.loads(raw.decode("utf-8"))
+            payload = self._read_json_body()
         except Exception:
             self._send(400, "text/plain; charset=utf-8", b"invalid json")
             return
@@ -14234,13 +15115,20 @@ class _Handler(BaseHTTPRequestHandler):
         return
 
 
-def start_debug_server(state: LaresState, host="0.0.0.0", port=8080, command_fn=None):
+def start_debug_server(state: LaresState, host="0.0.0.0", port=8080, command_fn=None, extra_ports=()):
+    # Handler state, asset cache and favorites flusher are shared: set them up
+    # once and only add a listener per extra port (duplicates are skipped).
     _Handler.state = state
     _Handler.command_fn = command_fn
-    httpd = ThreadingHTTPServer((host, port), _Handler)
-    thread = threading.Thread(target=httpd.serve_forever, name="debug_server", daemon=True)
-    thread.start()
-    return httpd
+    _preload_assets()
+    _start_ui_favorites_flusher()
+    servers = []
+    for p in dict.fromkeys((port, *extra_ports)):
+        httpd = _DebugHTTPServer((host, p), _Handler)
+        name = "debug_server" if not servers else f"debug_server_{p}"
+        threading.Thread(target=httpd.serve_forever, name=name, daemon=True).start()
+        servers.append(httpd)
+    return servers[0]
 
 
 def set_command_handler(command_fn):
@@ -14251,26 +15139,7 @@ def set_command_handler(command_fn):
 # Clean Thermostats UI (replaces older experimental versions)
 # -----------------------------------------------------------------------------
 
-def render_thermostats(snapshot):
-    entities = snapshot.get("entities") or []
-    therms = [e for e in entities if str(e.get("type") or "").lower() == "thermostats"]
-
-    rows = []
-    for e in therms:
-        tid = e.get("id")
-        name = e.get("name") or (e.get("static") or {}).get("DES") or f"Termostato {tid}"
-        rows.append(
-            f'<li><a href="./thermostats/{_html_escape(str(tid))}">{_html_escape(str(name))}</a> '
-            f'<span class="muted">(# {_html_escape(str(tid))})</span></li>'
-        )
-
-    items = (
-        "<ul>" + "".join(rows) + "</ul>"
-        if rows
-        else '<div class="muted">Nessun termostato trovato.</div>'
-    )
-
-    tpl = """<!doctype html>
+_THERMOSTATS_TPL = """<!doctype html>
 <html lang="it">
   <head>
     <meta charset="utf-8"/>
@@ -14351,27 +15220,38 @@ def render_thermostats(snapshot):
     </div>
   </body>
 </html>"""
-
-    html = (
-        tpl.replace("__ADDON_VERSION__", _html_escape(ADDON_VERSION))
-        .replace("__UI_REV__", _html_escape(UI_REV))
-        .replace("__ITEMS__", items)
-    )
-    return html.encode("utf-8")
+# Version/UI badges are fixed for the process lifetime: fill them once, pre-encode the rest.
+_THERMOSTATS_PARTS = _compile_template(
+    _THERMOSTATS_TPL,
+    ("ITEMS",),
+    {"ADDON_VERSION": _ADDON_VERSION_ESC, "UI_REV": _html_escape(UI_REV)},
+)
 
 
-def render_thermostat_detail(snapshot, thermostat_id: str):
-    # Clean, stable base page (we'll iterate design step-by-step).
-    title = f"Termostato {thermostat_id}"
-    for e in (snapshot.get("entities") or []):
-        if str(e.get("type") or "").lower() == "thermostats" and str(e.get("id")) == str(thermostat_id):
-            title = e.get("name") or title
-            break
+def render_thermostats(snapshot):
+    entities = snapshot.get("entities") or []
+    therms = [e for e in entities if str(e.get("type") or "").lower() == "thermostats"]
 
-    init = json.dumps(snapshot, ensure_ascii=False)
-    tid_esc = _html_escape(str(thermostat_id))
+    if not therms:
+        return _fill_template(_THERMOSTATS_PARTS, {"ITEMS": b'<div class="muted">Nessun termostato trovato.</div>'})
 
-    tpl = """<!doctype html>
+    buf = bytearray(b"<ul>")
+    for e in therms:
+        tid = e.get("id")
+        name = e.get("name") or (e.get("static") or {}).get("DES") or f"Termostato {tid}"
+        tid_b = _html_escape(tid).encode("utf-8")
+        buf += b'<li><a href="./thermostats/'
+        buf += tid_b
+        buf += b'">'
+        buf += _html_escape(name).encode("utf-8")
+        buf += b'</a> <span class="muted">(# '
+        buf += tid_b
+        buf += b")</span></li>"
+    buf += b"</ul>"
+    return _fill_template(_THERMOSTATS_PARTS, {"ITEMS": buf})
+
+
+_THERMOSTAT_DETAIL_TPL = """<!doctype html>
 <html lang="it">
   <head>
     <meta charset="utf-8"/>
@@ -14379,7 +15259,7 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
     <meta http-equiv="Cache-Control" content="no-store, max-age=0"/>
     <meta http-equiv="Pragma" content="no-cache"/>
     <meta http-equiv="Expires" content="0"/>
-    <title>Ksenia Lares - __TITLE__</title>
+    <title>Ksenia Lares - Termostato</title>
     <style>
        :root {
          --bg0: #05070b;
@@ -14441,7 +15321,8 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
       @media (max-width: 980px) { .layout { flex-direction:column; gap: 18px; min-height: auto; padding-top: 8px; } }
       .ringWrap { position: relative; width: min(70vw, 560px); height: min(70vw, 560px); margin: 0 auto; touch-action: none; }
       .ringSvg { position:absolute; inset:0; transform: rotate(-90deg); }
-      .ringTick { position:absolute; left:50%; top: 10px; width: 4px; height: calc(var(--ring-w) * 0.9); border-radius: 999px; background: rgba(255,255,255,0.86); transform: translate(-50%,-50%); box-shadow: 0 10px 26px rgba(0,0,0,0.55); pointer-events:none; }
+      #ringFg { stroke-dasharray: var(--ring-pct, 0.001) 1; }
+      .ringTick { position:absolute; left:0; top:0; will-change: transform; width: 4px; height: calc(var(--ring-w) * 0.9); border-radius: 999px; background: rgba(255,255,255,0.86); transform: translate(-50%,-50%); box-shadow: 0 10px 26px rgba(0,0,0,0.55); pointer-events:none; }
       .ringCenter { position:absolute; inset: 15%; border-radius: 999px; background: radial-gradient(220px 220px at 40% 35%, rgba(255,255,255,0.14), rgba(0,0,0,0.42)); border: 1px solid var(--bd); box-shadow: 0 18px 60px rgba(0,0,0,0.65); display:flex; flex-direction:column; align-items:center; justify-content:center; text-align:center; gap: 10px; user-select:none; }
       .big { font-size: clamp(64px, 10vw, 112px); font-weight: 300; letter-spacing: 0.5px; line-height: 1; }
       .sub { font-size: 14px; color: rgba(255,255,255,0.72); }
@@ -14449,7 +15330,7 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
       .btnRow, .roundBtn, .side, .sideCard, .sideHead, .sideBody, .actionBtn, .aLeft, .aTxt, .aName, .aVal { display:none; }
       .ico { width: 56px; height: 56px; border-radius: 999px; display:flex; align-items:center; justify-content:center; border: 1px solid rgba(255,255,255,0.12); background: rgba(0,0,0,0.18); color: rgba(255,255,255,0.86); }
 
-      .knob { position:absolute; width: var(--ring-w); height: var(--ring-w); border-radius: 999px; border: 2px solid rgba(255,255,255,0.88); background: rgba(0,0,0,0.55); box-shadow: 0 10px 30px rgba(0,0,0,0.55); transform: translate(-50%, -50%); cursor: pointer; }
+      .knob { position:absolute; left:0; top:0; will-change: transform; width: var(--ring-w); height: var(--ring-w); border-radius: 999px; border: 2px solid rgba(255,255,255,0.88); background: rgba(0,0,0,0.55); box-shadow: 0 10px 30px rgba(0,0,0,0.55); transform: translate(-50%, -50%); cursor: pointer; }
       .knobPin {
          position:absolute;
          left:50%;
@@ -14501,7 +15382,8 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
       .btn:hover { background: rgba(255,255,255,0.10); }
 
       pre { margin:0; white-space: pre; max-height: 360px; overflow:auto; }
-      .toast { position: fixed; left: 50%; bottom: 18px; transform: translateX(-50%); background: rgba(0,0,0,0.65); border: 1px solid rgba(255,255,255,0.10); color: rgba(255,255,255,0.92); padding: 10px 14px; border-radius: 12px; display:none; z-index: 30; min-width: 180px; text-align: center; }
+      .toast { position: fixed; left: 50%; bottom: 18px; transform: translateX(-50%); background: rgba(0,0,0,0.65); border: 1px solid rgba(255,255,255,0.10); color: rgba(255,255,255,0.92); padding: 10px 14px; border-radius: 12px; z-index: 30; min-width: 180px; text-align: center; opacity: 0; pointer-events: none; transition: opacity .2s; }
+      .toast.show { opacity: 1; }
       dialog { border: 1px solid rgba(255,255,255,0.12); border-radius: 16px; background: rgba(15,18,26,0.96); color: rgba(255,255,255,0.92); padding: 0; }
       dialog::backdrop { background: rgba(0,0,0,0.55); }
       .dlgHead { padding: 12px 14px; border-bottom: 1px solid rgba(255,255,255,0.08); display:flex; align-items:center; justify-content:space-between; gap: 10px; }
@@ -14519,9 +15401,9 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
           <path d="M15 18l-6-6 6-6" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
         </svg>
       </a>
-      <div class="barTitle">__TITLE__</div>
+      <div class="barTitle" id="barTitle">Termostato</div>
       <div class="barRight">
-        <span class="badge">ID __TID__</span>
+        <span class="badge" id="barTid">ID</span>
         <span class="badge">v __ADDON_VERSION__</span>
       </div>
     </div>
@@ -14556,7 +15438,7 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
            <div class="ringWrap" id="ringWrap">
              <svg class="ringSvg" viewBox="0 0 200 200" aria-hidden="true">
                <circle id="ringTrack" cx="100" cy="100" r="84" fill="none" stroke="var(--ring-track)" stroke-width="var(--ring-w)" stroke-linecap="round"></circle>
-               <circle id="ringFg" cx="100" cy="100" r="84" fill="none" stroke="var(--ring-off)" stroke-width="var(--ring-w)" stroke-linecap="round" stroke-dasharray="1 999"></circle>
+               <circle id="ringFg" cx="100" cy="100" r="84" fill="none" stroke="var(--ring-off)" stroke-width="var(--ring-w)" stroke-linecap="round" pathLength="1"></circle>
              </svg>
              <div class="ringTick" id="ringTick" aria-hidden="true"></div>
              <div class="knob" id="knob" role="slider" tabindex="0" aria-label="Set temperatura">
@@ -14596,7 +15478,7 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
       </div>
       <div class="top">
         <div>
-          <h2 style="margin:0">__TITLE__ <span class="badge">ID __TID__</span> <span class="badge">v__ADDON_VERSION__</span></h2>
+          <h2 style="margin:0"><span id="dbgTitle">Termostato</span> <span class="badge" id="dbgTid">ID</span> <span class="badge">v__ADDON_VERSION__</span></h2>
           <div class="muted" style="margin-top:6px">
             <a href="../thermostats">&larr; Termostati</a> &bull; <a href="../index_debug">index_debug</a>
             &bull; Aggiornato: <span id="lastUpdateOld">-</span>
@@ -14693,32 +15575,71 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
 
     <div class="toast" id="toast"></div>
     <script>
-      const TH_ID = String("__TID__");
-      let snap = __INIT__;
+      // Same static page for every thermostat: the id comes from the URL (/thermostats/<id>, also under Ingress).
+      const TH_ID = (() => {
+        const p = String(window.location && window.location.pathname ? window.location.pathname : "");
+        const i = p.lastIndexOf("/thermostats/");
+        const raw = i < 0 ? "" : p.slice(i + 13).split("/")[0];
+        try { return decodeURIComponent(raw); } catch (_e) { return raw; }
+      })();
+      let snap = null;
       let sse = null;
-
-      function apiRoot() {
+      // Entities by "type:id", rebuilt on full snapshots and patched in place by updates.
+      let entById = Object.create(null);
+      function entKey(e) {
+        return String(e.type || "").toLowerCase() + ":" + String(e.id);
+      }
+      function setSnap(next) {
+        snap = next;
+        entById = Object.create(null);
+        for (const e of ((snap && snap.entities) || [])) entById[entKey(e)] = e;
+      }
+      setSnap(null);
+
+      // Nodes touched on every render, looked up once (the script runs after the markup).
+      const DOM = { schedTbody: document.querySelector("#schedTbl tbody") };
+      for (const id of [
+        "lastUpdate", "rt", "st", "centerSub", "centerTemp", "centerSet", "centerRh", "badgeOut", "valSeason",
+        "valMode", "knobVal", "ringFg", "extraNameInp", "extraSeasonBadge", "valExtra", "chipTemp", "chipRh",
+        "chipOut", "chipSeason", "chipMode", "schedSeason", "schedTable", "extraT1", "extraT1Val", "extraT2",
+        "extraT2Val", "extraT3", "extraT3Val", "extraTM", "extraTMVal", "barTitle", "barTid", "dbgTitle", "dbgTid",
+        "toast", "picker", "pickerList", "extraDlg", "panelSchedule", "reloadBtn", "extraNameSave",
+      ]) DOM[id] = document.getElementById(id);
+      setText(DOM.barTid, "ID " + TH_ID);
+      setText(DOM.dbgTid, "ID " + TH_ID);
+
+      // Ingress prefix, fixed for the page's lifetime.
+      const API_ROOT = (() => {
         const p = String(window.location && window.location.pathname ? window.location.pathname : "");
         if (p.startsWith("/api/hassio_ingress/")) {
           const parts = p.split("/").filter(Boolean);
           if (parts.length >= 3) return "/" + parts.slice(0, 3).join("/");
         }
         return "";
-      }
+      })();
       function apiUrl(path) {
-        const root = apiRoot();
         const p = String(path || "");
-        if (p.startsWith("/")) return root + p;
-        return root + "/" + p;
+        if (p.startsWith("/")) return API_ROOT + p;
+        return API_ROOT + "/" + p;
       }
 
       function toast(msg) {
-        const el = document.getElementById("toast");
+        const el = DOM.toast;
         if (!el) return;
         el.textContent = String(msg || "");
-        el.style.display = "block";
+        // opacity only (no display flips): showing/hiding never re-lays out the page.
+        el.classList.add("show");
         clearTimeout(toast._t);
-        toast._t = setTimeout(() => { el.style.display = "none"; }, 1400);
+        toast._t = setTimeout(() => { el.classList.remove("show"); }, 1400);
+      }
+      // Shared error reporter for failed commands.
+      function cmdErr(e) {
+        toast("Errore: " + String(e && e.message ? e.message : e));
+      }
+
+      const ESC_MAP = { "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" };
+      function escapeHtml(s) {
+        return String(s).replace(/[&<>"']/g, (c) => ESC_MAP[c]);
       }
 
       function _thermObj(v) {
@@ -14733,32 +15654,63 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
         }
         return merged;
       }
+      // Merged view of this thermostat, rebuilt only when its entity object is replaced.
+      let thermSrc = null;
+      let thermView = null;
+      let thermInfo = null;
       function getTherm() {
-        const ents = (snap && snap.entities) ? snap.entities : [];
-        for (const e of ents) {
-          if (String(e.type || "").toLowerCase() === "thermostats" && String(e.id) === TH_ID) {
-            const st = _thermObj(e.static);
-            const rt = _thermObj(e.realtime);
-            const merged = Object.assign({}, st, rt);
-            const stTherm = _thermObj(st.THERM);
-            const rtTherm = _thermObj(rt.THERM);
-            if (Object.keys(stTherm).length || Object.keys(rtTherm).length) {
-              merged.THERM = _mergeTherm(stTherm, rtTherm);
-            }
-            return Object.assign({}, e, { static: st, realtime: merged });
-          }
+        const e = entById["thermostats:" + TH_ID] || null;
+        if (e === thermSrc) return thermView;
+        thermSrc = e;
+        thermView = e ? thermMerge(e) : null;
+        thermInfo = null;
+        return thermView;
+      }
+      // Season/mode read by the side buttons and the Extra dialog; shares getTherm()'s invalidation.
+      function thermState() {
+        const ent = getTherm();
+        if (thermInfo) return thermInfo;
+        const rt = ent ? (ent.realtime || {}) : {};
+        const therm = (rt.THERM && typeof rt.THERM === "object") ? rt.THERM : null;
+        thermInfo = {
+          ent, rt, therm,
+          season: therm ? String(therm.ACT_SEA || "WIN").toUpperCase() : "WIN",
+          mode: therm ? String(therm.ACT_MODEL || therm.ACT_MODE || "OFF").toUpperCase() : "OFF",
+        };
+        return thermInfo;
+      }
+      function thermMerge(e) {
+        const st = _thermObj(e.static);
+        const rt = _thermObj(e.realtime);
+        const merged = Object.assign({}, st, rt);
+        const stTherm = _thermObj(st.THERM);
+        const rtTherm = _thermObj(rt.THERM);
+        if (Object.keys(stTherm).length || Object.keys(rtTherm).length) {
+          merged.THERM = _mergeTherm(stTherm, rtTherm);
         }
-        return null;
+        return Object.assign({}, e, { static: st, realtime: merged });
+      }
+
+      // Number from a value that may use a decimal comma; empty/missing reads as 0, as Number("") did.
+      function parseLoc(x) {
+        if (typeof x === "number") return x === x ? x : 0;
+        if (!x) return 0;
+        const s = typeof x === "string" ? x : String(x);
+        const i = s.indexOf(",");
+        return i < 0 ? +s : +(s.slice(0, i) + "." + s.slice(i + 1));
       }
 
       function fmtDec(s) {
-        const n = Number(String(s || "").replace(",", "."));
+        const n = parseLoc(s);
         if (!Number.isFinite(n)) return "";
         return n.toFixed(1);
       }
 
+      const DEG2RAD = Math.PI / 180;
+      const RAD2DEG = 180 / Math.PI;
+
       function ringSetColor(outOn, season) {
-        const fg = document.getElementById("ringFg");
+        const fg = DOM.ringFg;
         if (!fg) return;
         const root = document.documentElement;
         let accent = "var(--ring-off)";
@@ -14770,36 +15722,52 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
         }
       }
       function ringSetValue(val) {
-        const fg = document.getElementById("ringFg");
+        const fg = DOM.ringFg;
         if (!fg) return;
-        const r = 84;
-        const C = 2 * Math.PI * r;
-        let n = Number(String(val || "").replace(",", "."));
+        let n = parseLoc(val);
         if (!Number.isFinite(n)) n = 20;
         n = Math.max(5, Math.min(35, n));
         const pct = (n - 5) / 30;
-        const dash = Math.max(0.01, Math.min(0.999, pct)) * C;
-        fg.setAttribute("stroke-dasharray", String(dash.toFixed(2)) + " " + String((C - dash).toFixed(2)));
+        const v = Math.max(0.01, Math.min(0.999, pct)).toFixed(4);
+        if (fg._pct !== v) {
+          fg._pct = v;
+          fg.style.setProperty("--ring-pct", v);
+        }
       }
 
+      // One delegated click handler; openPicker only swaps the items (each a .dlgItem carrying its
+      // value in data-v) and the callback.
+      let pickerOnPick = null;
+      (() => {
+        const dlg = DOM.picker;
+        const list = DOM.pickerList;
+        if (!dlg || !list) return;
+        list.addEventListener("click", (ev) => {
+          const it = ev.target && ev.target.closest ? ev.target.closest(".dlgItem[data-v]") : null;
+          if (!it) return;
+          const v = it.getAttribute("data-v");
+          try { if (pickerOnPick) pickerOnPick(v); } catch (_e) {}
+          dlg.close();
+        }, { passive: true });
+      })();
+
       function openPicker(items, activeValue, onPick) {
-        const dlg = document.getElementById("picker");
-        const list = document.getElementById("pickerList");
+        const dlg = DOM.picker;
+        const list = DOM.pickerList;
         if (!dlg || !list) return;
-        list.innerHTML = (items || []).map((it) => {
-          const active = (activeValue !== null && activeValue !== undefined && String(it.value) === String(activeValue));
-          return '<div class="dlgItem" data-v="' + String(it.value) + '">' +
-            '<div>' + String(it.label) + '</div>' +
-            (active ? '<div class="badge">attivo</div>' : (it.hint ? '<div class="badge">' + String(it.hint) + '</div>' : '<div></div>')) +
+        pickerOnPick = onPick;
+        const arr = items || [];
+        const hasActive = activeValue !== null && activeValue !== undefined;
+        let html = "";
+        for (let i = 0; i < arr.length; i++) {
+          const it = arr[i];
+          const active = hasActive && String(it.value) === String(activeValue);
+          html += '<div class="dlgItem" data-v="' + escapeHtml(it.value) + '">' +
+            '<div>' + escapeHtml(it.label) + '</div>' +
+            (active ? '<div class="badge">attivo</div>' : (it.hint ? '<div class="badge">' + escapeHtml(it.hint) + '</div>' : '<div></div>')) +
           '</div>';
-        }).join("");
-        list.querySelectorAll(".dlgItem[data-v]").forEach((el) => {
-          el.onclick = () => {
-            const v = el.getAttribute("data-v");
-            try { onPick(v); } catch (_e) {}
-            dlg.close();
-          };
-        });
+        }
+        list.innerHTML = html;
         dlg.showModal();
       }
 
@@ -14812,11 +15780,11 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
 
       // Close dialogs when clicking outside
       try {
-        const dlg = document.getElementById("picker");
+        const dlg = DOM.picker;
         if (dlg) dlg.addEventListener("click", (ev) => { if (ev.target === dlg) dlg.close(); });
       } catch (_e) {}
       try {
-        const dlg2 = document.getElementById("extraDlg");
+        const dlg2 = DOM.extraDlg;
         if (dlg2) dlg2.addEventListener("click", (ev) => { if (ev.target === dlg2) dlg2.close(); });
       } catch (_e) {}
 
@@ -14824,18 +15792,19 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
         try {
           const res = await fetch(apiUrl("/api/entities"), { cache: "no-store" });
           if (!res.ok) return;
-          snap = await res.json();
-          render();
+          setSnap(await res.json());
+          snapUpdated();
         } catch (_e) {}
       }
 
-      async function sendCmd(action, value=null) {
+      async function sendCmd(action, value=null, opts=null) {
         const payload = { type: "thermostats", id: Number(TH_ID), action: String(action) };
         if (value !== null && value !== undefined) payload.value = value;
         const res = await fetch(apiUrl("/api/cmd"), {
           method: "POST",
           headers: { "Content-Type": "application/json" },
           body: JSON.stringify(payload),
+          signal: (opts && opts.signal) || undefined,
         });
         let data = null;
         try { data = await res.json(); } catch (_e) { data = null; }
@@ -14845,60 +15814,166 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
         }
         toast("OK");
         const delay = (String(action) === "set_target" || String(action) === "set_profile" || String(action) === "write_patch") ? 1500 : 350;
-        setTimeout(fetchSnap, delay);
+        scheduleSnap(delay);
+      }
+
+      // One pending refetch after commands: a later command only pushes its deadline out.
+      let snapTimer = 0;
+      let snapDue = 0;
+      function scheduleSnap(delay) {
+        const due = Date.now() + delay;
+        if (snapTimer) {
+          if (due <= snapDue) return;
+          clearTimeout(snapTimer);
+        }
+        snapDue = due;
+        snapTimer = setTimeout(() => { snapTimer = 0; fetchSnap(); }, delay);
+      }
+
+      function schedSelection() {
+        return {
+          season: String((DOM.schedSeason || {}).value || "WIN").toUpperCase(),
+          day: String((DOM.schedTable || {}).value || "MON").toUpperCase(),
+        };
       }
 
+      // One row built with DOM calls (no HTML parsing), cloned for each hour.
+      const schedRowTpl = (() => {
+        const tr = document.createElement("tr");
+        const th = document.createElement("td");
+        th.className = "h";
+        const td = document.createElement("td");
+        const sel = document.createElement("select");
+        for (const [v, l] of [["1", "T1"], ["2", "T2"], ["3", "T3"]]) {
+          const o = document.createElement("option");
+          o.value = v;
+          o.textContent = l;
+          sel.appendChild(o);
+        }
+        td.appendChild(sel);
+        tr.appendChild(th);
+        tr.appendChild(td);
+        return tr;
+      })();
+
+      // Read phase (selection, data, what the selects show now) before any write, then only the
+      // selects whose value differs are touched; the rows are built once and reused.
       function renderSchedule(ent) {
-        const tbody = document.querySelector("#schedTbl tbody");
+        const tbody = DOM.schedTbody;
         if (!tbody) return;
-        tbody.innerHTML = "";
-        if (!ent) return;
+        if (!ent) { tbody.replaceChildren(); return; }
         const st = ent.static || {};
-        const season = String((document.getElementById("schedSeason") || {}).value || "WIN").toUpperCase();
-        const dayKey = String((document.getElementById("schedTable") || {}).value || "MON").toUpperCase();
+        const { season, day: dayKey } = schedSelection();
         const sea = (season === "SUM" || season === "WIN") ? st[season] : null;
         const arr = sea && Array.isArray(sea[dayKey]) ? sea[dayKey] : null;
+        const pend = pendingSched.get(season + "|" + dayKey);
+        const vals = new Array(24);
         for (let h = 0; h < 24; h++) {
           const cur = (arr && arr[h] && typeof arr[h] === "object") ? arr[h] : null;
-          const t = cur ? String(cur.T || "") : "";
-          const tr = document.createElement("tr");
-          tr.innerHTML =
-            '<td class="h">' + String(h) + '</td>' +
-            '<td><select data-h="' + String(h) + '">' +
-              '<option value="1"' + (t === "1" ? " selected" : "") + '>T1</option>' +
-              '<option value="2"' + (t === "2" ? " selected" : "") + '>T2</option>' +
-              '<option value="3"' + (t === "3" ? " selected" : "") + '>T3</option>' +
-            '</select></td>';
-          tbody.appendChild(tr);
+          const t = (pend && pend.has(h)) ? pend.get(h) : (cur ? String(cur.T || "") : "");
+          vals[h] = (t === "2" || t === "3") ? t : "1";
         }
-        tbody.querySelectorAll("select[data-h]").forEach((sel) => {
-          sel.addEventListener("change", async () => {
-            const hour = Number(sel.dataset.h);
-            const val = String(sel.value || "");
-            try {
-              await sendCmd("set_schedule", { season: season, day: dayKey, hour: hour, t: val });
-            } catch (e) {
-              toast("Errore: " + String(e && e.message ? e.message : e));
-            }
-          });
-        });
+        const rows = tbody.rows;
+        if (rows && rows.length === 24) {
+          const sels = new Array(24);
+          const changed = [];
+          for (let h = 0; h < 24; h++) {
+            sels[h] = rows[h].cells[1].firstElementChild;
+            if (sels[h].value !== vals[h]) changed.push(h);
+          }
+          for (const h of changed) sels[h].value = vals[h];
+          return;
+        }
+        const frag = document.createDocumentFragment();
+        for (let h = 0; h < 24; h++) {
+          const tr = schedRowTpl.cloneNode(true);
+          tr.cells[0].textContent = String(h);
+          const sel = tr.cells[1].firstElementChild;
+          sel.dataset.h = String(h);
+          sel.value = vals[h];
+          frag.appendChild(tr);
+        }
+        tbody.replaceChildren(frag);
       }
 
-      function render() {
+      // Rapid edits are collected per season/day and written with one command after a short pause.
+      const pendingSched = new Map(); // "WIN|MON" -> Map(hour -> "1|2|3")
+      let schedTimer = null;
+
+      function flushSched() {
+        schedTimer = null;
         const ent = getTherm();
+        const st = (ent && ent.static) || {};
+        for (const [key, hours] of pendingSched) {
+          const [season, day] = key.split("|");
+          let p;
+          if (hours.size === 1) {
+            const [[hour, t]] = hours;
+            p = sendCmd("set_schedule", { season: season, day: day, hour: hour, t: t });
+          } else {
+            const sea = st[season];
+            const cur = (sea && Array.isArray(sea[day])) ? sea[day] : null;
+            if (!cur || cur.length < 24) {
+              p = Promise.reject(new Error("schedule " + season + "." + day + " not available"));
+            } else {
+              const newDay = cur.slice(0, 24).map((item, h) => {
+                const base = (item && typeof item === "object") ? item : { T: "1", S: "0" };
+                return hours.has(h) ? Object.assign({}, base, { T: hours.get(h) }) : Object.assign({}, base);
+              });
+              p = sendCmd("write_patch", { [season]: { [day]: newDay } });
+            }
+          }
+          p.catch(cmdErr);
+        }
+        pendingSched.clear();
+      }
+
+      // Single delegated listener for the 24 hour selects.
+      if (DOM.schedTbody) DOM.schedTbody.addEventListener("change", (ev) => {
+        const sel = ev.target;
+        if (!sel || !sel.matches || !sel.matches("select[data-h]")) return;
+        const { season, day } = schedSelection();
+        const key = season + "|" + day;
+        if (!pendingSched.has(key)) pendingSched.set(key, new Map());
+        pendingSched.get(key).set(Number(sel.dataset.h), String(sel.value || ""));
+        clearTimeout(schedTimer);
+        schedTimer = setTimeout(flushSched, 250);
+      }, { passive: true });
+
+      // textContent write skipped when the node already shows that value.
+      function setText(el, v) {
+        if (el && el._v !== v) {
+          el._v = v;
+          el.textContent = v;
+        }
+      }
+
+      function renderLastUpdate() {
         const meta = (snap && snap.meta && typeof snap.meta === "object") ? snap.meta : null;
         const last = meta && meta.last_update ? Number(meta.last_update) : 0;
         const lastStr = last ? new Date(last * 1000).toISOString().replace("T", " ").slice(0, 19) : "-";
-        const lastEl = document.getElementById("lastUpdate");
-        if (lastEl) lastEl.textContent = lastStr;
+        const lastEl = DOM.lastUpdate;
+        setText(lastEl, lastStr);
+      }
 
-        const rtPre = document.getElementById("rt");
-        const stPre = document.getElementById("st");
-        if (rtPre) rtPre.textContent = ent && ent.realtime ? JSON.stringify(ent.realtime, null, 2) : "-";
-        if (stPre) stPre.textContent = ent && ent.static ? JSON.stringify(ent.static, null, 2) : "-";
+      function render() {
+        // Layout reads first (cached between renders): the DOM writes below would otherwise force a reflow.
+        const geom = ringGeom();
+        const ent = getTherm();
+        renderLastUpdate();
+
+        const rtPre = DOM.rt;
+        const stPre = DOM.st;
+        setText(rtPre, ent && ent.realtime ? JSON.stringify(ent.realtime, null, 2) : "-");
+        setText(stPre, ent && ent.static ? JSON.stringify(ent.static, null, 2) : "-");
 
         if (!ent) return;
 
+        const title = String(ent.name || "") || ("Termostato " + TH_ID);
+        setText(DOM.barTitle, title);
+        setText(DOM.dbgTitle, title);
+        if (document.title !== "Ksenia Lares - " + title) document.title = "Ksenia Lares - " + title;
+
         const rt = ent.realtime || {};
         const therm = (rt.THERM && typeof rt.THERM === "object") ? rt.THERM : null;
         const mode = therm ? String(therm.ACT_MODEL || therm.ACT_MODE || "") : "";
@@ -14924,50 +15999,50 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
         const seaLabel = (seaKey === "SUM") ? "Freddo" : "Caldo";
         const titleLine = ((seaKey === "SUM") ? "Estate" : "Inverno") + " | " + modeDisp;
 
-        const elSub = document.getElementById("centerSub");
-        const elTemp = document.getElementById("centerTemp");
-        const elSet = document.getElementById("centerSet");
-        const elRh = document.getElementById("centerRh");
-        const elOut = document.getElementById("badgeOut");
-        const elSea = document.getElementById("valSeason");
-        const elMode = document.getElementById("valMode");
-        if (elSub) elSub.textContent = titleLine;
-        if (elTemp) elTemp.textContent = tempDisp;
-        if (elSet) elSet.innerHTML = "Set " + setDisp + "&deg;C";
-        if (elRh) elRh.textContent = "RH " + rhDisp;
-        if (elOut) elOut.textContent = "OUT: " + (out || "-");
-        if (elSea) elSea.textContent = "";
-        if (elMode) elMode.textContent = "";
-        const elKnobVal = document.getElementById("knobVal");
-        if (elKnobVal && !dialDragging) elKnobVal.textContent = setDisp;
-
-        const extraNameInp = document.getElementById("extraNameInp");
+        const elSub = DOM.centerSub;
+        const elTemp = DOM.centerTemp;
+        const elSet = DOM.centerSet;
+        const elRh = DOM.centerRh;
+        const elOut = DOM.badgeOut;
+        const elSea = DOM.valSeason;
+        const elMode = DOM.valMode;
+        setText(elSub, titleLine);
+        setText(elTemp, tempDisp);
+        setText(elSet, "Set " + setDisp + "\u00B0C");
+        setText(elRh, "RH " + rhDisp);
+        setText(elOut, "OUT: " + (out || "-"));
+        setText(elSea, "");
+        setText(elMode, "");
+        const elKnobVal = DOM.knobVal;
+        if (!dialDragging) setText(elKnobVal, setDisp);
+
+        const extraNameInp = DOM.extraNameInp;
         if (extraNameInp && !extraNameInp._dirty) extraNameInp.value = String(ent.name || "");
-        const extraSeasonBadge = document.getElementById("extraSeasonBadge");
-        if (extraSeasonBadge) extraSeasonBadge.textContent = (seaKey === "SUM") ? "Estate" : "Inverno";
+        const extraSeasonBadge = DOM.extraSeasonBadge;
+        setText(extraSeasonBadge, (seaKey === "SUM") ? "Estate" : "Inverno");
         const stcfg = ent.static || {};
         const prof = (stcfg && stcfg[seaKey] && typeof stcfg[seaKey] === "object") ? stcfg[seaKey] : null;
         const getPendingProfile = (key) => {
           const k = String(seaKey) + ":" + String(key);
-          const p = pendingProfiles[k];
+          const p = pendingProfiles.get(k);
           if (!p) return null;
-          if ((Date.now() - Number(p.ts || 0)) > 30000) { delete pendingProfiles[k]; return null; }
+          if ((Date.now() - p.ts) > 30000) { pendingProfiles.delete(k); return null; }
           return p;
         };
         const maybeClearPending = (key, liveVal) => {
           const k = String(seaKey) + ":" + String(key);
-          const p = pendingProfiles[k];
+          const p = pendingProfiles.get(k);
           if (!p) return;
-          const n = Number(String(liveVal || "").replace(",", "."));
-          if (Number.isFinite(n) && Math.abs(n - Number(p.val)) < 0.05) delete pendingProfiles[k];
+          const n = parseLoc(liveVal);
+          if (Number.isFinite(n) && Math.abs(n - p.val) < 0.05) pendingProfiles.delete(k);
         };
         const setRangeIfClean = (rngId, valId, v, key) => {
-          const rng = document.getElementById(rngId);
-          const out = document.getElementById(valId);
+          const rng = DOM[rngId];
+          const out = DOM[valId];
           const pend = key ? getPendingProfile(key) : null;
           const src = pend ? pend.val : v;
-          const n = Number(String(src || "").replace(",", "."));
-          if (out) out.textContent = Number.isFinite(n) ? (n.toFixed(1).replace(".", ",") + "\u00B0") : "--";
+          const n = parseLoc(src);
+          setText(out, Number.isFinite(n) ? (n.toFixed(1).replace(".", ",") + "\u00B0") : "--");
           if (rng && !rng._dirty && Number.isFinite(n)) rng.value = String(n);
         };
         maybeClearPending("T1", prof ? prof.T1 : null);
@@ -14978,26 +16053,26 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
         setRangeIfClean("extraT2", "extraT2Val", prof ? prof.T2 : null, "T2");
         setRangeIfClean("extraT3", "extraT3Val", prof ? prof.T3 : null, "T3");
         setRangeIfClean("extraTM", "extraTMVal", prof ? prof.TM : null, "TM");
-        const elExtra = document.getElementById("valExtra");
-        if (elExtra) elExtra.textContent = "";
+        const elExtra = DOM.valExtra;
+        setText(elExtra, "");
 
         ringSetColor(outOn, seaKey);
         ringSetValue(Number.isFinite(effTarget) ? String(effTarget.toFixed(1)) : (target ? fmtDec(target) : "20"));
-        dialSetKnob(Number.isFinite(effTarget) ? effTarget : (target ? Number(fmtDec(target)) : 20));
-        if (temp) tickSet(Number(fmtDec(temp)));
-
-        const chipTemp = document.getElementById("chipTemp");
-        const chipRh = document.getElementById("chipRh");
-        const chipOut = document.getElementById("chipOut");
-        const chipSeason = document.getElementById("chipSeason");
-        const chipMode = document.getElementById("chipMode");
-        if (chipTemp) chipTemp.textContent = temp ? (fmtDec(temp).replace(".", ",") + "\u00B0C") : "-";
-        if (chipRh) chipRh.textContent = rh ? (String(rh) + "%") : "-";
-        if (chipOut) chipOut.textContent = out || "-";
-        if (chipSeason) chipSeason.textContent = season || "-";
-        if (chipMode) chipMode.textContent = mode || "-";
-
-        const schedSeason = document.getElementById("schedSeason");
+        dialSetKnob(Number.isFinite(effTarget) ? effTarget : (target ? Number(fmtDec(target)) : 20), geom);
+        if (temp) tickSet(Number(fmtDec(temp)), geom);
+
+        const chipTemp = DOM.chipTemp;
+        const chipRh = DOM.chipRh;
+        const chipOut = DOM.chipOut;
+        const chipSeason = DOM.chipSeason;
+        const chipMode = DOM.chipMode;
+        setText(chipTemp, temp ? (fmtDec(temp).replace(".", ",") + "\u00B0C") : "-");
+        setText(chipRh, rh ? (String(rh) + "%") : "-");
+        setText(chipOut, out || "-");
+        setText(chipSeason, season || "-");
+        setText(chipMode, mode || "-");
+
+        const schedSeason = DOM.schedSeason;
         if (schedSeason && season) schedSeason.value = String(season).toUpperCase();
 
         // (legacy debug/profile controls removed)
@@ -15005,6 +16080,58 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
         renderSchedule(ent);
       }
 
+      // Coalesce bursts of SSE/poll updates into at most one render per frame.
+      // A full render also redraws the schedule, so a frame with both pending does it once.
+      let renderScheduled = false;
+      let renderFull = false;
+      let renderSched = false;
+      function renderFrame() {
+        renderScheduled = false;
+        const full = renderFull;
+        const sched = renderSched;
+        renderFull = false;
+        renderSched = false;
+        if (full) render();
+        else if (sched) renderSchedule(getTherm());
+      }
+      function queueRenderFrame() {
+        if (renderScheduled) return;
+        renderScheduled = true;
+        if (typeof requestAnimationFrame === "function") requestAnimationFrame(renderFrame);
+        else setTimeout(renderFrame, 16);
+      }
+      function scheduleRender() {
+        renderFull = true;
+        queueRenderFrame();
+      }
+      function requestSchedule() {
+        renderSched = true;
+        queueRenderFrame();
+      }
+
+      // Updates for other entities only move meta.last_update: skip the full render for those.
+      // getTherm() keeps the same view while the entity object is unchanged, so identity is the
+      // cheap test; the signature (static carries both weekly schedules) is built only on replacement.
+      let lastThermView;
+      let lastThermSig = null;
+      function snapUpdated() {
+        const ent = getTherm();
+        sweepPendingProfiles(Date.now());
+        const pending = pendingTarget || pendingProfiles.size;
+        if (ent === lastThermView && !pending) {
+          renderLastUpdate();
+          return;
+        }
+        lastThermView = ent;
+        const sig = ent ? JSON.stringify([ent.realtime, ent.static, ent.name]) : "";
+        if (sig === lastThermSig && !pending) {
+          renderLastUpdate();
+          return;
+        }
+        lastThermSig = sig;
+        scheduleRender();
+      }
+
       function startSSE() {
         try {
           if (typeof EventSource === "undefined") return false;
@@ -15013,17 +16140,15 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
           es.onmessage = (ev) => {
             try {
               const msg = JSON.parse(ev.data);
-              if (msg && msg.entities) snap = msg;
               if (msg && msg.type === "update") {
-                if (msg.meta && snap.meta) Object.assign(snap.meta, msg.meta);
+                if (msg.meta && snap && snap.meta) Object.assign(snap.meta, msg.meta);
                 if (Array.isArray(msg.entities)) {
-                  const map = new Map();
-                  for (const e of (snap.entities || [])) map.set(String(e.type) + ":" + String(e.id), e);
-                  for (const e of msg.entities) map.set(String(e.type) + ":" + String(e.id), e);
-                  snap.entities = Array.from(map.values());
+                  for (const e of msg.entities) entById[entKey(e)] = e;
                 }
+              } else if (msg && msg.entities) {
+                setSnap(msg);
               }
-              render();
+              snapUpdated();
             } catch (_e) {}
           };
           es.onerror = () => {
@@ -15039,7 +16164,7 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
       // Wiring
 
       function toggleSchedule(show) {
-        const p = document.getElementById("panelSchedule");
+        const p = DOM.panelSchedule;
         if (!p) return;
         if (show) p.classList.add("show");
         else p.classList.remove("show");
@@ -15049,19 +16174,23 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
       // Circular slider (drag on ring)
       const ringWrap = document.getElementById("ringWrap");
       const knob = document.getElementById("knob");
-      const knobVal = document.getElementById("knobVal");
+      const knobVal = DOM.knobVal;
       const ringTick = document.getElementById("ringTick");
       let dialDragging = false;
       let dialValue = null;
       let pendingTarget = null; // { val: number, ts: ms }
-      const pendingProfiles = {}; // key: "WIN:T1" -> {val:number, ts:number}
+      const pendingProfiles = new Map(); // "WIN:T1" -> {val:number, ts:number}
+      // Writes not confirmed within 30s are dropped (also for the season not currently shown).
+      function sweepPendingProfiles(now) {
+        for (const [k, p] of pendingProfiles) if ((now - p.ts) > 30000) pendingProfiles.delete(k);
+      }
 
       function clamp01(x) { return Math.max(0, Math.min(1, x)); }
       function round05(x) { return Math.round(x * 2) / 2; }
 
       function dialValueFromEvent(ev) {
         if (!ringWrap) return 20;
-        const r = ringWrap.getBoundingClientRect();
+        const r = ringGeom().rect;
         const cx = r.left + r.width / 2;
         const cy = r.top + r.height / 2;
         const x = (ev.clientX !== undefined) ? ev.clientX : (ev.touches && ev.touches[0] ? ev.touches[0].clientX : cx);
@@ -15070,84 +16199,131 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
         const dy = y - cy;
         const ang = Math.atan2(dy, dx); // -PI..PI, 0 on +x
         // Convert to 0..360 where 0 is top, clockwise
-        const degFromTop = (ang * 180 / Math.PI + 90 + 360) % 360;
+        const degFromTop = (ang * RAD2DEG + 90 + 360) % 360;
         const pct = clamp01(degFromTop / 360);
         const val = 5 + pct * 30;
         return round05(val);
       }
 
-      function dialSetKnob(val) {
+      // Ring rect and --ring-w, measured lazily and kept until a resize/scroll or a new drag.
+      let ringMetrics = null;
+      function refreshRingMetrics() {
+        if (!ringWrap) return null;
+        let ringW = 14;
+        try {
+          ringW = parseFloat(getComputedStyle(document.documentElement).getPropertyValue("--ring-w")) || ringW;
+        } catch (_e) {}
+        ringMetrics = { rect: ringWrap.getBoundingClientRect(), ringW: ringW };
+        return ringMetrics;
+      }
+      function ringGeom() {
+        return ringMetrics || refreshRingMetrics();
+      }
+      window.addEventListener("resize", () => { ringMetrics = null; });
+      window.addEventListener("scroll", () => { ringMetrics = null; }, { passive: true });
+
+      let lastKnobVal = null;
+      let lastTickVal = null;
+
+      function dialSetKnob(val, geom) {
         if (!ringWrap || !knob) return;
-        const rect = ringWrap.getBoundingClientRect();
+        lastKnobVal = val;
+        const g = geom || ringGeom();
+        const rect = g.rect;
+        const ringW = g.ringW;
         const cx = rect.width / 2;
         const cy = rect.height / 2;
         const pct = clamp01((val - 5) / 30);
         const deg = pct * 360 - 90; // align with rotated ring
-        const rad = deg * Math.PI / 180;
-        let ringW = 14;
-        try {
-          ringW = parseFloat(getComputedStyle(document.documentElement).getPropertyValue("--ring-w")) || ringW;
-        } catch (_e) {}
+        const rad = deg * DEG2RAD;
         const radius = Math.max(10, rect.width / 2 - (ringW / 2));
         const x = cx + radius * Math.cos(rad);
         const y = cy + radius * Math.sin(rad);
-        knob.style.left = String(x) + "px";
-        knob.style.top = String(y) + "px";
+        // transform only: moving the knob must not re-layout the ring.
+        knob.style.transform = "translate(" + x.toFixed(1) + "px," + y.toFixed(1) + "px) translate(-50%,-50%)";
       }
 
-      function tickSet(val) {
+      function tickSet(val, geom) {
         if (!ringWrap || !ringTick) return;
-        const rect = ringWrap.getBoundingClientRect();
+        const g = geom || ringGeom();
+        const rect = g.rect;
+        const ringW = g.ringW;
         const cx = rect.width / 2;
         const cy = rect.height / 2;
-        let ringW = 14;
-        try {
-          ringW = parseFloat(getComputedStyle(document.documentElement).getPropertyValue("--ring-w")) || ringW;
-        } catch (_e) {}
         let v = Number(val);
         if (!Number.isFinite(v)) return;
+        lastTickVal = v;
         v = Math.max(5, Math.min(35, v));
         const pct = clamp01((v - 5) / 30);
         const deg = pct * 360 - 90;
-        const rad = deg * Math.PI / 180;
+        const rad = deg * DEG2RAD;
         const radius = Math.max(10, rect.width / 2 - ringW - 14);
         const x = cx + radius * Math.cos(rad);
         const y = cy + radius * Math.sin(rad);
-        ringTick.style.left = String(x) + "px";
-        ringTick.style.top = String(y) + "px";
         // Rotate so the tick is radial (perpendicular to the circle).
-        ringTick.style.transform = "translate(-50%,-50%) rotate(" + String((deg + 90).toFixed(1)) + "deg)";
+        ringTick.style.transform = "translate(" + x.toFixed(1) + "px," + y.toFixed(1) + "px) translate(-50%,-50%) rotate(" +
+          (deg + 90).toFixed(1) + "deg)";
+      }
+
+      // Ring size changes (layout, orientation): re-measure once per frame and re-place knob and tick.
+      let ringResizeRaf = 0;
+      if (ringWrap && typeof ResizeObserver === "function") {
+        new ResizeObserver(() => {
+          if (ringResizeRaf) return;
+          ringResizeRaf = requestAnimationFrame(() => {
+            ringResizeRaf = 0;
+            const geom = refreshRingMetrics();
+            if (lastKnobVal !== null) dialSetKnob(lastKnobVal, geom);
+            if (lastTickVal !== null) tickSet(lastTickVal, geom);
+          });
+        }).observe(ringWrap);
       }
 
       function dialPreview(val) {
         const v = String(val.toFixed(1)).replace(".", ",");
-        if (knobVal) knobVal.textContent = v;
-        const elSet = document.getElementById("centerSet");
-        if (elSet) elSet.innerHTML = "Set " + v + "&deg;C";
+        setText(knobVal, v);
+        const elSet = DOM.centerSet;
+        setText(elSet, "Set " + v + "\u00B0C");
         ringSetValue(String(val));
         dialSetKnob(val);
       }
 
       function dialCommit(val) {
         pendingTarget = { val: Number(val), ts: Date.now() };
-        sendCmd("set_target", String(val.toFixed(1))).catch(e => toast("Errore: " + (e && e.message ? e.message : e)));
+        sendCmd("set_target", String(val.toFixed(1))).catch(cmdErr);
       }
 
       function dialPointerDown(ev) {
         if (!ringWrap || !knob) return;
         dialDragging = true;
         knob.classList.add("dragging");
+        refreshRingMetrics();
         dialValue = dialValueFromEvent(ev);
         dialPreview(dialValue);
         try { ringWrap.setPointerCapture(ev.pointerId); } catch (_e) {}
       }
+      // Pointer moves can arrive faster than the display refresh: preview at most once per frame.
+      let dialMoveRaf = 0;
+      let dialMoveEv = null;
+      function dialMoveFlush() {
+        dialMoveRaf = 0;
+        if (!dialDragging || !dialMoveEv) return;
+        dialValue = dialValueFromEvent(dialMoveEv);
+        dialMoveEv = null;
+        dialPreview(dialValue);
+      }
       function dialPointerMove(ev) {
         if (!dialDragging) return;
-        dialValue = dialValueFromEvent(ev);
-        dialPreview(dialValue);
+        dialMoveEv = ev;
+        if (dialMoveRaf) return;
+        dialMoveRaf = requestAnimationFrame(dialMoveFlush);
       }
       function dialPointerUp(_ev) {
         if (!dialDragging) return;
+        if (dialMoveRaf) {
+          cancelAnimationFrame(dialMoveRaf);
+          dialMoveFlush();
+        }
         dialDragging = false;
         if (knob) knob.classList.remove("dragging");
         if (dialValue !== null) dialCommit(dialValue);
@@ -15164,29 +16340,23 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
       }
 
       wireBtn("btnSchedule", () => {
-        const p = document.getElementById("panelSchedule");
+        const p = DOM.panelSchedule;
         const show = !(p && p.classList.contains("show"));
         toggleSchedule(show);
         if (show) {
-          renderSchedule(getTherm());
+          requestSchedule();
           try { p.scrollIntoView({behavior:"smooth", block:"start"}); } catch (_e) {}
         }
       });
       wireBtn("btnSeason", () => {
-        const ent = getTherm();
-        const rt = ent ? (ent.realtime || {}) : {};
-        const therm = (rt.THERM && typeof rt.THERM === "object") ? rt.THERM : null;
-        const cur = therm ? String(therm.ACT_SEA || "WIN").toUpperCase() : "WIN";
+        const cur = thermState().season;
         openPicker([
           { value: "WIN", label: "Inverno", hint: "Caldo" },
           { value: "SUM", label: "Estate", hint: "Freddo" },
-        ], cur, (v) => sendCmd("set_season", v).catch(e => toast("Errore: " + (e && e.message ? e.message : e))));
+        ], cur, (v) => sendCmd("set_season", v).catch(cmdErr));
       });
       wireBtn("btnMode", () => {
-        const ent = getTherm();
-        const rt = ent ? (ent.realtime || {}) : {};
-        const therm = (rt.THERM && typeof rt.THERM === "object") ? rt.THERM : null;
-        const cur = therm ? String(therm.ACT_MODEL || therm.ACT_MODE || "OFF").toUpperCase() : "OFF";
+        const cur = thermState().mode;
         openPicker([
           { value: "OFF", label: "Off" },
           { value: "MAN", label: "Manuale" },
@@ -15194,87 +16364,138 @@ def render_thermostat_detail(snapshot, thermostat_id: str):
           { value: "WEEKLY", label: "Auto (settimanale)" },
           { value: "SD1", label: "SD1" },
           { value: "SD2", label: "SD2" },
-        ], cur, (v) => sendCmd("set_mode", v).catch(e => toast("Errore: " + (e && e.message ? e.message : e))));
+        ], cur, (v) => sendCmd("set_mode", v).catch(cmdErr));
       });
 
       wireBtn("btnExtra", () => {
-        const dlg = document.getElementById("extraDlg");
+        const dlg = DOM.extraDlg;
         if (dlg) dlg.showModal();
       });
       wireBtn("btnScheduleClose", () => toggleSchedule(false));
-      const reloadBtn = document.getElementById("reloadBtn");
-      if (reloadBtn) reloadBtn.addEventListener("click", fetchSnap);
-      const schedSeason = document.getElementById("schedSeason");
-      if (schedSeason) schedSeason.addEventListener("change", () => renderSchedule(getTherm()));
-      const schedTable = document.getElementById("schedTable");
-      if (schedTable) schedTable.addEventListener("change", () => renderSchedule(getTherm()));
-
-      const extraNameInp = document.getElementById("extraNameInp");
-      if (extraNameInp) extraNameInp.addEventListener("input", () => { extraNameInp._dirty = true; });
-      const extraNameSave = document.getElementById("extraNameSave");
+      const reloadBtn = DOM.reloadBtn;
+      if (reloadBtn) reloadBtn.addEventListener("click", fetchSnap, { passive: true });
+      const schedSeason = DOM.schedSeason;
+      if (schedSeason) schedSeason.addEventListener("change", requestSchedule, { passive: true });
+      const schedTable = DOM.schedTable;
+      if (schedTable) schedTable.addEventListener("change", requestSchedule, { passive: true });
+
+      const extraNameInp = DOM.extraNameInp;
+      if (extraNameInp) extraNameInp.addEventListener("input", () => { extraNameInp._dirty = true; }, { passive: true });
+      const extraNameSave = DOM.extraNameSave;
       if (extraNameSave) extraNameSave.addEventListener("click", async () => {
         try {
           const v = String((extraNameInp && extraNameInp.value) ? extraNameInp.value : "").trim();
           if (!v) throw new Error("Nome vuoto");
           await sendCmd("set_description", v);
           if (extraNameInp) extraNameInp._dirty = false;
-          const dlg = document.getElementById("extraDlg");
+          const dlg = DOM.extraDlg;
           if (dlg) dlg.close();
         } catch (e) {
-          toast("Errore: " + String(e && e.message ? e.message : e));
+          cmdErr(e);
         }
-      });
+      }, { passive: true });
 
       function extraProfileSeason() {
-        const ent = getTherm();
-        const rt = ent ? (ent.realtime || {}) : {};
-        const therm = (rt.THERM && typeof rt.THERM === "object") ? rt.THERM : null;
-        const sea = therm ? String(therm.ACT_SEA || "WIN").toUpperCase() : "WIN";
-        return (sea === "SUM") ? "SUM" : "WIN";
+        return (thermState().season === "SUM") ? "SUM" : "WIN";
       }
-      function wireExtraProfile(rngId, valId, key) {
-        const rng = document.getElementById(rngId);
-        const out = document.getElementById(valId);
-        if (!rng) return;
-        const upd = () => {
-          const n = Number(String(rng.value || "").replace(",", "."));
-          if (out) out.textContent = Number.isFinite(n) ? (n.toFixed(1).replace(".", ",") + "\u00B0") : "--";
-        };
-        rng.addEventListener("input", () => { rng._dirty = true; upd(); });
-        rng.addEventListener("change", async () => {
+      // The four profile sliders share one input and one change listener on the Extra dialog.
+      const extraProfiles = {
+        extraT1: { out: "extraT1Val", key: "T1" },
+        extraT2: { out: "extraT2Val", key: "T2" },
+        extraT3: { out: "extraT3Val", key: "T3" },
+        extraTM: { out: "extraTMVal", key: "TM" },
+      };
+      function extraProfileLabel(rng) {
+        const n = parseLoc(rng.value);
+        setText(DOM[extraProfiles[rng.id].out], Number.isFinite(n) ? (n.toFixed(1).replace(".", ",") + "\u00B0") : "--");
+      }
+      // Slider drags fire input far more often than frames: refresh the labels once per frame.
+      const extraInputDirty = new Set();
+      function extraInputFlush() {
+        for (const rng of extraInputDirty) extraProfileLabel(rng);
+        extraInputDirty.clear();
+      }
+      // At most one set_profile in flight per season/key: a newer release cancels the older request,
+      // so its late reply can neither toast nor clear the slider's dirty flag.
+      const profileAborts = new Map();
+      if (DOM.extraDlg) {
+        DOM.extraDlg.addEventListener("input", (ev) => {
+          const rng = ev.target;
+          if (!rng || !extraProfiles[rng.id]) return;
+          rng._dirty = true;
+          if (!extraInputDirty.size) requestAnimationFrame(extraInputFlush);
+          extraInputDirty.add(rng);
+        }, { passive: true });
+        DOM.extraDlg.addEventListener("change", async (ev) => {
+          const rng = ev.target;
+          const prof = rng ? extraProfiles[rng.id] : null;
+          if (!prof) return;
           try {
             const sea = extraProfileSeason();
-            const n = Number(String(rng.value || "").replace(",", "."));
+            const n = parseLoc(rng.value);
             if (!Number.isFinite(n)) return;
-            pendingProfiles[String(sea) + ":" + String(key)] = { val: Number(n.toFixed(1)), ts: Date.now() };
-            await sendCmd("set_profile", { season: sea, key: String(key), value: String(n.toFixed(1)) });
+            const now = Date.now();
+            sweepPendingProfiles(now);
+            const k = String(sea) + ":" + prof.key;
+            pendingProfiles.set(k, { val: Number(n.toFixed(1)), ts: now });
+            const prev = profileAborts.get(k);
+            if (prev && typeof prev.abort === "function") prev.abort();
+            const ac = (typeof AbortController === "function") ? new AbortController() : null;
+            profileAborts.set(k, ac);
+            try {
+              await sendCmd("set_profile", { season: sea, key: prof.key, value: String(n.toFixed(1)) }, ac);
+            } finally {
+              if (profileAborts.get(k) === ac) profileAborts.delete(k);
+            }
             rng._dirty = false;
           } catch (e) {
-            toast("Errore: " + String(e && e.message ? e.message : e));
+            if (e && e.name === "AbortError") return;
+            cmdErr(e);
           }
+        }, { passive: true });
+      }
+      for (const id in extraProfiles) if (DOM[id]) extraProfileLabel(DOM[id]);
+
+      // Polling chained on completion (a slow server never gets overlapping requests), idle while hidden.
+      let pollTimer = 0;
+      let pollBusy = false;
+      function poll() {
+        clearTimeout(pollTimer);
+        pollTimer = 0;
+        if (pollBusy || document.hidden) return;
+        pollBusy = true;
+        fetchSnap().finally(() => {
+          pollBusy = false;
+          if (!document.hidden) pollTimer = setTimeout(poll, 5000);
         });
-        upd();
       }
-      wireExtraProfile("extraT1", "extraT1Val", "T1");
-      wireExtraProfile("extraT2", "extraT2Val", "T2");
-      wireExtraProfile("extraT3", "extraT3Val", "T3");
-      wireExtraProfile("extraTM", "extraTMVal", "TM");
+
+      // Hidden tab: drop the stream and the polling, catch up when shown again.
+      document.addEventListener("visibilitychange", () => {
+        if (document.hidden) {
+          clearTimeout(pollTimer);
+          pollTimer = 0;
+          if (sse) {
+            try { sse.close(); } catch (_e) {}
+            sse = null;
+          }
+        } else {
+          if (!sse) startSSE();
+          poll();
+        }
+      });
 
       // Start
       startSSE();
-      setInterval(fetchSnap, 5000);
-      render();
+      pollTimer = setTimeout(poll, 5000);
+      fetchSnap();
     </script>
   </body>
 </html>"""
-
-    html = (
-        tpl.replace("__TITLE__", _html_escape(title))
-        .replace("__TID__", tid_esc)
-        .replace("__ADDON_VERSION__", _html_escape(ADDON_VERSION))
-        .replace("__INIT__", init)
-    )
-    return html.encode("utf-8")
+_THERMOSTAT_DETAIL_BODY = _fill_template(
+    _compile_template(_THERMOSTAT_DETAIL_TPL, (), {"ADDON_VERSION": _ADDON_VERSION_ESC}), {}
+)
+_THERMOSTAT_DETAIL_ETAG = f'W/"{ADDON_VERSION}"'
 
 
 def render_ui_tags_raw():
@@ -15305,3 +16526,49 @@ def render_ui_tags_raw():
     return html.encode("utf-8")
 
 
+# Exact-path HTML pages for _Handler.do_GET: canonical path (no trailing slash) -> (renderer, log UI GET).
+# Built at the end of the module so it binds the final render_* definitions.
+_GET_ROUTES = {
+    "/": (render_index, True),
+    "/index_debug": (render_index, True),
+    "/index_debug/tag_styles": (render_index_tag_styles, True),
+    "/menu": (render_menu, False),
+    "/security": (render_security_ui, True),
+    "/security/partitions": (render_security_partitions, True),
+    "/security/scenarios": (render_security_scenarios, True),
+    "/security/sensors": (render_security_sensors, True),
+    "/security/reset": (render_security_reset, True),
+    "/security/info": (render_security_info, True),
+    "/security/users": (render_security_users, False),
+    "/security/timers": (render_security_timers, True),
+    "/security/functions": (render_security_functions, True),
+    "/security/functions/all": (render_security_functions_all, True),
+    "/security/functions/outputs": (render_security_functions_outputs, True),
+    "/security/functions/sia-ip": (render_security_sia_ip, True),
+    "/security/favorites": (render_security_favorites, True),
+    "/thermostats": (render_thermostats, False),
+    "/logs": (render_logs, False),
+    "/timers": (render_timers, False),
+}
+
+# Prefix routes for _Handler.do_GET, walked one path segment at a time; "*" captures the remainder.
+_GET_PREFIX_TRIE = {
+    "assets": {"*": _Handler._get_asset},
+    "thermostats": {"*": _Handler._get_thermostat_detail},
+    "api": {"icons": {"mdi": {"*": _Handler._get_mdi_icon}}},
+}
+
+
+def _match_prefix_route(path: str):
+    node = _GET_PREFIX_TRIE
+    segs = path.strip("/").split("/")
+    for i, seg in enumerate(segs):
+        nxt = node.get(seg)
+        if isinstance(nxt, dict):
+            node = nxt
+            continue
+        handler = node.get("*")
+        if handler is None:
+            break
+        return handler, "/".join(segs[i:])
+    return None, ""
@@ -8,12 +8,18 @@ import time
 import ssl
 import re
 import concurrent.futures
+import functools
 import threading
+from dataclasses import dataclass
 from pathlib import Path
 import urllib.request
 import urllib.error
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 import paho.mqtt.client as mqtt
+try:
+    import orjson  # optional: faster JSON for MQTT payloads
+except ImportError:
+    orjson = None
 import websockets
 from websocketmanager import WebSocketManager
 from debug_server import LaresState, start_debug_server, set_command_handler
@@ -27,7 +33,8 @@ def _load_addon_options():
     if not options_path.exists():
         return {}
     try:
-        return json.loads(options_path.read_text(encoding="utf-8"))
+        raw = options_path.read_bytes()
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
     except Exception as exc:
         try:
             logging.getLogger("ksenia_lares_addon").warning(
@@ -38,33 +45,187 @@ def _load_addon_options():
         return {}
 
 
-def _get_config_value(options, option_key, env_key, default):
-    if env_key in os.environ and os.environ[env_key] != "":
-        return os.environ[env_key]
-    if option_key in options and options[option_key] not in (None, ""):
-        return options[option_key]
-    return default
+_JSON_ENCODE = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
 
 
-def _get_config_int(options, option_key, env_key, default):
-    value = _get_config_value(options, option_key, env_key, default)
+def _json_payload(data) -> bytes:
+    # Compact UTF-8 JSON for MQTT publishes (orjson when installed); paho sends bytes as-is.
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        except Exception:
+            pass
+    return _JSON_ENCODE(data).encode("utf-8")
+
+
+def _config_int(value, default):
     try:
         return int(value)
     except Exception:
         return int(default)
 
-def _get_config_bool(options, option_key, env_key, default=False):
-    value = _get_config_value(options, option_key, env_key, default)
+
+_CONFIG_TRUE_TOKENS = frozenset(("1", "true", "t", "yes", "y", "on"))
+_CONFIG_FALSE_TOKENS = frozenset(("0", "false", "f", "no", "n", "off", ""))
+
+
+def _config_bool(value, default):
     if isinstance(value, bool):
         return value
+    if isinstance(value, str):
+        # Common case: option/env values are already lowercase and unpadded.
+        if value in _CONFIG_TRUE_TOKENS:
+            return True
+        if value in _CONFIG_FALSE_TOKENS:
+            return False
     s = str(value).strip().lower()
-    if s in ("1", "true", "t", "yes", "y", "on"):
+    if s in _CONFIG_TRUE_TOKENS:
         return True
-    if s in ("0", "false", "f", "no", "n", "off", ""):
+    if s in _CONFIG_FALSE_TOKENS:
         return False
     return bool(default)
 
 
+# (option key == AddonConfig field, env override, coercion or None for the raw value, default)
+_CONFIG_FIELDS = (
+    ("ksenia_host", "KSENIA_HOST", None, ""),
+    ("ksenia_port", "KSENIA_PORT", _config_int, 0),
+    ("ksenia_pin", "KSENIA_PIN", None, ""),
+    ("installer_pin", "KSENIA_INSTALLER_PIN", None, ""),
+    ("mqtt_host", "MQTT_HOST", None, "core-mosquitto"),
+    ("mqtt_port", "MQTT_PORT", _config_int, 1883),
+    ("mqtt_user", "MQTT_USER", None, ""),
+    ("mqtt_password", "MQTT_PASSWORD", None, ""),
+    ("mqtt_prefix", "MQTT_PREFIX", None, "ksenia"),
+    ("mqtt_debug_verbose", "MQTT_DEBUG_VERBOSE", _config_bool, False),
+    ("output_debug_verbose", "OUTPUT_DEBUG_VERBOSE", _config_bool, False),
+    ("debug_thermostats", "KS_DEBUG_THERMOSTATS", _config_bool, False),
+    ("debug_ui_port", "DEBUG_UI_PORT", _config_int, 8080),
+    ("security_ui_port", "SECURITY_UI_PORT", _config_int, 8081),
+    ("web_pin_session_required", "WEB_PIN_SESSION_REQUIRED", _config_bool, False),
+    ("web_pin_session_minutes_default", "WEB_PIN_SESSION_MINUTES_DEFAULT", _config_int, 5),
+    ("icon_http_enabled", "ICON_HTTP_ENABLED", _config_bool, False),
+    ("icon_http_base_url", "ICON_HTTP_BASE_URL", None, ""),
+    ("icon_http_token", "ICON_HTTP_TOKEN", None, ""),
+    ("icon_http_timeout", "ICON_HTTP_TIMEOUT", _config_int, 3),
+    ("security_cmd_ws_idle_timeout_sec", "SECURITY_CMD_WS_IDLE_TIMEOUT_SEC", _config_int, 20),
+    ("ws_reconnect_cooldown_sec", "WS_RECONNECT_COOLDOWN_SEC", _config_int, 8),
+    ("sia_ip_enabled", "SIA_IP_ENABLED", _config_bool, False),
+    ("sia_ip_port", "SIA_IP_PORT", _config_int, 10002),
+    ("sia_ip_account_filter", "SIA_IP_ACCOUNT_FILTER", None, ""),
+    ("sia_ip_store_events", "SIA_IP_STORE_EVENTS", _config_int, 200),
+    ("sia_ip_debug", "SIA_IP_DEBUG", _config_bool, False),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class AddonConfig:
+    ksenia_host: str
+    ksenia_port: int
+    ksenia_pin: str
+    installer_pin: str
+    mqtt_host: str
+    mqtt_port: int
+    mqtt_user: str
+    mqtt_password: str
+    mqtt_prefix: str
+    mqtt_debug_verbose: bool
+    output_debug_verbose: bool
+    debug_thermostats: bool
+    debug_ui_port: int
+    security_ui_port: int
+    web_pin_session_required: bool
+    web_pin_session_minutes_default: int
+    icon_http_enabled: bool
+    icon_http_base_url: str
+    icon_http_token: str
+    icon_http_timeout: int
+    security_cmd_ws_idle_timeout_sec: int
+    ws_reconnect_cooldown_sec: int
+    sia_ip_enabled: bool
+    sia_ip_port: int
+    sia_ip_account_filter: str
+    sia_ip_store_events: int
+    sia_ip_debug: bool
+
+
+def load_config() -> AddonConfig:
+    # options.json is parsed once; a non-empty environment variable overrides the option.
+    options = _load_addon_options()
+    if not isinstance(options, dict):
+        options = {}
+    env = os.environ
+    values = {}
+    for key, env_key, cast, default in _CONFIG_FIELDS:
+        value = env.get(env_key, "")
+        if value == "":
+            value = options.get(key)
+            if value is None or value == "":
+                value = default
+        values[key] = cast(value, default) if cast is not None else value
+    return AddonConfig(**values)
+
+
+# Command topics handled by _handle_mqtt_cmd_output: <prefix>/cmd/<domain>/<id>[/<sub_action>].
+_MQTT_CMD_DOMAINS = (
+    "output",
+    "cover",
+    "scenario",
+    "partition",
+    "zone_bypass",
+    "thermostat",
+    "scheduler",
+    "panel",
+    "account",
+)
+_MQTT_CMD_DOMAIN_SET = frozenset(_MQTT_CMD_DOMAINS)
+# State topics that all mirror the same output entity.
+_OUTPUT_FANOUT = ("lights", "switches", "covers", "outputs")
+
+# Command payload tokens (output payloads are lower-cased, the others upper-cased).
+_OUTPUT_ON_TOKENS = frozenset(("on", "1", "true", "t", "yes", "y"))
+_OUTPUT_OFF_TOKENS = frozenset(("off", "0", "false", "f", "no", "n"))
+_PARTITION_DISARM_TOKENS = frozenset(("DISARM", "DISARMED", "OFF", "0"))
+_PARTITION_ARM_INSTANT_TOKENS = frozenset(("ARM_HOME", "ARM_NIGHT", "ARM_INSTANT", "ARM_NOW", "INSTANT"))
+_PARTITION_ARM_AWAY_TOKENS = frozenset(("ARM_AWAY", "ARM", "ARM_DELAY", "ARMED_AWAY", "ON", "1"))
+_BYPASS_AUTO_TOKENS = frozenset(("1", "ON", "AUTO", "TRUE", "YES"))
+_BYPASS_NO_TOKENS = frozenset(("0", "OFF", "NO", "FALSE"))
+_TOGGLE_TOKENS = frozenset(("-1", "TGL", "TOGGLE"))
+_ENABLE_TOKENS = frozenset(("1", "ON", "TRUE", "T", "ENABLE", "ENABLED"))
+_DISABLE_TOKENS = frozenset(("0", "OFF", "FALSE", "F", "DISABLE", "DISABLED"))
+# HA preset_mode -> Lares ACT_MODE
+_THERM_PRESET_MODES = {
+    "OFF": "OFF",
+    "MANUAL": "MAN",
+    "MAN": "MAN",
+    "SCHEDULE": "WEEKLY",
+    "WEEKLY": "WEEKLY",
+    "AUTO": "WEEKLY",
+    "MANUAL_TIMER": "MAN_TMR",
+    "MAN_TMR": "MAN_TMR",
+    "SD1": "SD1",
+    "SD2": "SD2",
+}
+
+
+_SLUG_RE = re.compile(r"[^a-z0-9_]+")
+
+
+def _slugify_prefix(val: str) -> str:
+    slug = _SLUG_RE.sub("_", str(val or "").lower()).strip("_")
+    return slug or "ksenia"
+
+
+# Realtime patches carry IDs and brightness levels as strings; entity IDs form a small
+# bounded set and LEV is clamped to 0..100, so both are served from caches.
+@functools.lru_cache(maxsize=512)
+def _sid(i: int) -> str:
+    return str(i)
+
+
+_LEV = tuple(str(i) for i in range(101))
+
+
 def _create_mqtt_client():
     try:
         return mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
@@ -82,60 +243,40 @@ def main():
     logger = logging.getLogger("ksenia_lares_addon")
     logger.info("Avvio add-on Ksenia Lares")
 
-    options = _load_addon_options()
+    config = load_config()
 
-    ksenia_host = _get_config_value(options, "ksenia_host", "KSENIA_HOST", "")
-    ksenia_port = _get_config_int(options, "ksenia_port", "KSENIA_PORT", 0)
-    ksenia_pin = _get_config_value(options, "ksenia_pin", "KSENIA_PIN", "")
-    installer_pin = _get_config_value(options, "installer_pin", "KSENIA_INSTALLER_PIN", "")
-
-    mqtt_host = _get_config_value(options, "mqtt_host", "MQTT_HOST", "core-mosquitto")
-    mqtt_port = _get_config_int(options, "mqtt_port", "MQTT_PORT", 1883)
-    mqtt_user = _get_config_value(options, "mqtt_user", "MQTT_USER", "")
-    mqtt_password = _get_config_value(options, "mqtt_password", "MQTT_PASSWORD", "")
-    mqtt_prefix = _get_config_value(options, "mqtt_prefix", "MQTT_PREFIX", "ksenia")
-    mqtt_debug_verbose = _get_config_bool(options, "mqtt_debug_verbose", "MQTT_DEBUG_VERBOSE", False)
-    output_debug_verbose = _get_config_bool(options, "output_debug_verbose", "OUTPUT_DEBUG_VERBOSE", False)
-    def _slugify_prefix(val: str) -> str:
-        slug = re.sub(r"[^a-z0-9_]+", "_", str(val or "").lower()).strip("_")
-        return slug or "ksenia"
+    ksenia_host = config.ksenia_host
+    ksenia_port = config.ksenia_port
+    ksenia_pin = config.ksenia_pin
+    installer_pin = config.installer_pin
+
+    mqtt_host = config.mqtt_host
+    mqtt_port = config.mqtt_port
+    mqtt_user = config.mqtt_user
+    mqtt_password = config.mqtt_password
+    mqtt_prefix = config.mqtt_prefix
+    mqtt_debug_verbose = config.mqtt_debug_verbose
+    output_debug_verbose = config.output_debug_verbose
     mqtt_prefix_slug = _slugify_prefix(mqtt_prefix)
-    debug_thermostats = _get_config_bool(options, "debug_thermostats", "KS_DEBUG_THERMOSTATS", False)
-    debug_ui_port = _get_config_int(options, "debug_ui_port", "DEBUG_UI_PORT", 8080)
-    security_ui_port = _get_config_int(options, "security_ui_port", "SECURITY_UI_PORT", 8081)
-    web_pin_session_required = _get_config_bool(
-        options,
-        "web_pin_session_required",
-        "WEB_PIN_SESSION_REQUIRED",
-        False,
-    )
-    web_pin_session_minutes_default = _get_config_int(
-        options,
-        "web_pin_session_minutes_default",
-        "WEB_PIN_SESSION_MINUTES_DEFAULT",
-        5,
-    )
-    icon_http_enabled = _get_config_bool(options, "icon_http_enabled", "ICON_HTTP_ENABLED", False)
-    icon_http_base_url = _get_config_value(options, "icon_http_base_url", "ICON_HTTP_BASE_URL", "")
-    icon_http_token = _get_config_value(options, "icon_http_token", "ICON_HTTP_TOKEN", "")
-    icon_http_timeout = _get_config_int(options, "icon_http_timeout", "ICON_HTTP_TIMEOUT", 3)
-    security_cmd_ws_idle_timeout_sec = _get_config_int(
-        options,
-        "security_cmd_ws_idle_timeout_sec",
-        "SECURITY_CMD_WS_IDLE_TIMEOUT_SEC",
-        20,
-    )
-    ws_reconnect_cooldown_sec = _get_config_int(
-        options,
-        "ws_reconnect_cooldown_sec",
-        "WS_RECONNECT_COOLDOWN_SEC",
-        8,
-    )
-    sia_ip_enabled = _get_config_bool(options, "sia_ip_enabled", "SIA_IP_ENABLED", False)
-    sia_ip_port = _get_config_int(options, "sia_ip_port", "SIA_IP_PORT", 10002)
-    sia_ip_account_filter = _get_config_value(options, "sia_ip_account_filter", "SIA_IP_ACCOUNT_FILTER", "")
-    sia_ip_store_events = _get_config_int(options, "sia_ip_store_events", "SIA_IP_STORE_EVENTS", 200)
-    sia_ip_debug = _get_config_bool(options, "sia_ip_debug", "SIA_IP_DEBUG", False)
+    cmd_prefix = f"{mqtt_prefix}/cmd/"
+    # All command domains go out in a single SUBSCRIBE packet, built once and reused on every (re)connect.
+    cmd_subscriptions = [(f"{cmd_prefix}{domain}/#", 0) for domain in _MQTT_CMD_DOMAINS]
+    debug_thermostats = config.debug_thermostats
+    debug_ui_port = config.debug_ui_port
+    security_ui_port = config.security_ui_port
+    web_pin_session_required = config.web_pin_session_required
+    web_pin_session_minutes_default = config.web_pin_session_minutes_default
+    icon_http_enabled = config.icon_http_enabled
+    icon_http_base_url = config.icon_http_base_url
+    icon_http_token = config.icon_http_token
+    icon_http_timeout = config.icon_http_timeout
+    security_cmd_ws_idle_timeout_sec = config.security_cmd_ws_idle_timeout_sec
+    ws_reconnect_cooldown_sec = config.ws_reconnect_cooldown_sec
+    sia_ip_enabled = config.sia_ip_enabled
+    sia_ip_port = config.sia_ip_port
+    sia_ip_account_filter = config.sia_ip_account_filter
+    sia_ip_store_events = config.sia_ip_store_events
+    sia_ip_debug = config.sia_ip_debug
 
     if not ksenia_host or not ksenia_port or not ksenia_pin:
         logger.critical(
@@ -156,48 +297,45 @@ def main():
         port=sia_ip_port,
         listening=False,
     )
-    start_debug_server(state, port=debug_ui_port)
-    start_debug_server(state, port=security_ui_port)
+    start_debug_server(state, port=debug_ui_port, extra_ports=(security_ui_port,))
     logger.info("Debug UI attiva (usa 'Apri interfaccia web' dell'add-on / Ingress).")
 
     def _fmt_payload_for_log(payload):
-        if payload is None:
+        if payload is None or not mqtt_debug_verbose:
             return ""
         try:
             if isinstance(payload, (dict, list)):
-                payload = json.dumps(payload, ensure_ascii=False)
-            payload_str = str(payload)
+                # Same compact encoder as the publish itself; only the first 400 bytes are decoded.
+                payload = _json_payload(payload)
+            if isinstance(payload, (bytes, bytearray)):
+                if len(payload) > 400:
+                    return payload[:400].decode("utf-8", "ignore") + f"...(len={len(payload)})"
+                return payload.decode("utf-8", "replace")
+            payload_str = payload if isinstance(payload, str) else str(payload)
             if len(payload_str) > 400:
                 return payload_str[:400] + f"...(len={len(payload_str)})"
             return payload_str
         except Exception:
             return "<unserializable>"
 
+    # MQTT callbacks and publishes only test the bound mqtt_debug_verbose flag and log with %-style
+    # args, so nothing is formatted when verbose logging is off.
     def _log_mqtt(action: str, topic: str, payload=None, retain: bool = False):
         if not mqtt_debug_verbose:
             return
         try:
-            payload_str = _fmt_payload_for_log(payload)
-            logger.info(f"[MQTT] {action}: topic={topic} retain={retain} payload={payload_str}")
+            logger.info("[MQTT] %s: topic=%s retain=%s payload=%s", action, topic, retain, _fmt_payload_for_log(payload))
         except Exception:
             pass
 
     mqttc = _create_mqtt_client()
     def _on_connect(client, userdata, flags, reason_code, properties=None):
         if mqtt_debug_verbose:
-            logger.info(f"[MQTT] connesso rc={reason_code} flags={flags}")
+            logger.info("[MQTT] connesso rc=%s flags=%s", reason_code, flags)
         try:
-            client.subscribe(f"{mqtt_prefix}/cmd/output/#")
-            client.subscribe(f"{mqtt_prefix}/cmd/cover/#")
-            client.subscribe(f"{mqtt_prefix}/cmd/scenario/#")
-            client.subscribe(f"{mqtt_prefix}/cmd/partition/#")
-            client.subscribe(f"{mqtt_prefix}/cmd/zone_bypass/#")
-            client.subscribe(f"{mqtt_prefix}/cmd/thermostat/#")
-            client.subscribe(f"{mqtt_prefix}/cmd/scheduler/#")
-            client.subscribe(f"{mqtt_prefix}/cmd/panel/#")
-            client.subscribe(f"{mqtt_prefix}/cmd/account/#")
+            client.subscribe(cmd_subscriptions)
         except Exception as exc:
-            logger.error(f"[MQTT] subscribe cmd/output failed: {exc}")
+            logger.error("[MQTT] subscribe cmd/output failed: %s", exc)
         try:
             # Segnala disponibilità per discovery (usato anche dagli script/scenari).
             mqttc.publish(f"{mqtt_prefix}/status", "online", retain=True)
@@ -218,26 +356,200 @@ def main():
             except Exception:
                 reason_code = None
         if mqtt_debug_verbose:
-            logger.info(f"[MQTT] disconnesso rc={reason_code}")
+            logger.info("[MQTT] disconnesso rc=%s", reason_code)
 
     def _on_publish(client, userdata, mid, reason_code=None, properties=None):
         if mqtt_debug_verbose:
-            logger.info(f"[MQTT] publish mid={mid} rc={reason_code}")
+            logger.info("[MQTT] publish mid=%s rc=%s", mid, reason_code)
 
     manager_ref = {"manager": None, "loop": None}
 
+    # MQTT commands are fire-and-forget: the callback thread only hands the coroutine to the loop,
+    # without the concurrent Future that run_coroutine_threadsafe() creates and chains per call.
+    mqtt_cmd_tasks = set()
+
+    def _mqtt_cmd_done(task):
+        mqtt_cmd_tasks.discard(task)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None and mqtt_debug_verbose:
+            logger.error("MQTT cmd task error: %r", exc)
+
+    def _mqtt_cmd_start(coro):
+        task = asyncio.ensure_future(coro)
+        mqtt_cmd_tasks.add(task)
+        task.add_done_callback(_mqtt_cmd_done)
+
+    def _submit_mqtt_cmd(coro, loop):
+        loop.call_soon_threadsafe(_mqtt_cmd_start, coro)
+
+    def _apply_output_cmd_patch(target_id, patch):
+        # Repeated commands (e.g. a burst of ON from HA) often find the output already in the
+        # requested state, usually because the panel realtime already reported it: skip the
+        # state write and the lights/switches/covers/outputs fan-out when nothing would change.
+        try:
+            ent = state.get_entity("outputs", target_id)
+            rt = (ent or {}).get("realtime") or {}
+            if all(rt.get(k) == v for k, v in patch.items() if k != "ID"):
+                return
+            state.apply_realtime_update("lights", [patch])
+            publish_output(patch)
+        except Exception:
+            pass
+
+    # Coroutines for the high-rate command domains are defined once here and take the parsed
+    # arguments explicitly, so a message does not build a fresh closure per call.
+    async def _mqtt_cmd_output(mgr, target_id, action, brightness):
+        if action == "on":
+            ok = await mgr.turnOnOutput(target_id)
+            if output_debug_verbose:
+                logger.info("MQTT cmd/output %s -> ON ok=%s", target_id, ok)
+            if ok:
+                patch = {"ID": _sid(target_id), "STA": "ON"}
+                _apply_output_cmd_patch(target_id, patch)
+            return ok
+        if action == "off":
+            ok = await mgr.turnOffOutput(target_id)
+            if output_debug_verbose:
+                logger.info("MQTT cmd/output %s -> OFF ok=%s", target_id, ok)
+            if ok:
+                patch = {"ID": _sid(target_id), "STA": "OFF", "LEV": "0"}
+                _apply_output_cmd_patch(target_id, patch)
+            return ok
+        if action == "toggle":
+            sta_now = ""
+            try:
+                ent = state.get_entity("outputs", target_id)
+                rt = (ent or {}).get("realtime") or {}
+                sta_now = str(rt.get("STA") or "").upper()
+            except Exception:
+                sta_now = ""
+            action_inner = "off" if sta_now == "ON" else "on"
+            if action_inner == "off":
+                ok = await mgr.turnOffOutput(target_id)
+                if output_debug_verbose:
+                    logger.info("MQTT cmd/output %s -> OFF(ok toggle) ok=%s", target_id, ok)
+                if ok:
+                    patch = {"ID": _sid(target_id), "STA": "OFF", "LEV": "0"}
+                    _apply_output_cmd_patch(target_id, patch)
+                return ok
+            ok = await mgr.turnOnOutput(target_id)
+            if output_debug_verbose:
+                logger.info("MQTT cmd/output %s -> ON(ok toggle) ok=%s", target_id, ok)
+            if ok:
+                patch = {"ID": _sid(target_id), "STA": "ON"}
+                _apply_output_cmd_patch(target_id, patch)
+            return ok
+        if action == "brightness":
+            try:
+                bval = max(0, min(100, int(brightness)))
+            except Exception:
+                return False
+            ok = await mgr.turnOnOutput(target_id, brightness=bval)
+            if output_debug_verbose:
+                logger.info("MQTT cmd/output %s -> brightness=%s ok=%s", target_id, bval, ok)
+            if ok:
+                patch = {"ID": _sid(target_id), "STA": "ON", "LEV": _LEV[bval]}
+                _apply_output_cmd_patch(target_id, patch)
+            return ok
+
+    async def _mqtt_cmd_scenario(mgr, target_id):
+        try:
+            return await mgr.executeScenario(target_id)
+        except Exception:
+            return False
+
+    async def _mqtt_cmd_partition(mgr, target_id, action):
+        if action == "disarm":
+            ok = await mgr.disarmPartition(target_id)
+            if ok:
+                patch = {"ID": _sid(target_id), "ARM": "D", "T": "0"}
+                try:
+                    state.apply_realtime_update("partitions", [patch])
+                    publish("partitions", patch)
+                except Exception:
+                    pass
+            return ok
+        if action == "arm_instant":
+            ok = await mgr.armPartitionInstant(target_id)
+            if ok:
+                patch = {"ID": _sid(target_id), "ARM": "IA", "T": "0"}
+                try:
+                    state.apply_realtime_update("partitions", [patch])
+                    publish("partitions", patch)
+                except Exception:
+                    pass
+            return ok
+        ok = await mgr.armPartition(target_id)
+        if ok:
+            patch = {"ID": _sid(target_id), "ARM": "DA", "T": "0"}
+            try:
+                state.apply_realtime_update("partitions", [patch])
+                publish("partitions", patch)
+            except Exception:
+                pass
+        return ok
+
+    async def _mqtt_cmd_zone_bypass(mgr, target_id, action, p):
+        ack_topic = f"{mqtt_prefix}/ack/zone_bypass/{target_id}"
+        if action == "on":
+            ok = await mgr.bypassZoneOn(target_id)
+            publish_ack(ack_topic, {"ok": bool(ok), "action": "on", "payload": p})
+            if ok:
+                patch = {"ID": _sid(target_id), "BYP": "AUTO"}
+                try:
+                    state.apply_realtime_update("zones", [patch])
+                    publish("zones", patch)
+                except Exception:
+                    pass
+            return ok
+        if action == "off":
+            ok = await mgr.bypassZoneOff(target_id)
+            publish_ack(ack_topic, {"ok": bool(ok), "action": "off", "payload": p})
+            if ok:
+                patch = {"ID": _sid(target_id), "BYP": "NO"}
+                try:
+                    state.apply_realtime_update("zones", [patch])
+                    publish("zones", patch)
+                except Exception:
+                    pass
+            return ok
+        ok = await mgr.bypassZoneToggle(target_id)
+        publish_ack(ack_topic, {"ok": bool(ok), "action": "toggle", "payload": p})
+        if ok:
+            byp_now = ""
+            try:
+                ent = state.get_entity("zones", target_id)
+                rt = (ent or {}).get("realtime") or {}
+                byp_now = str(rt.get("BYP") or "").upper()
+            except Exception:
+                byp_now = ""
+            patch = {"ID": _sid(target_id), "BYP": ("NO" if byp_now in ("AUTO", "ON", "1") else "AUTO")}
+            try:
+                state.apply_realtime_update("zones", [patch])
+                publish("zones", patch)
+            except Exception:
+                pass
+        return ok
+
     def _handle_mqtt_cmd_output(client, userdata, msg):
         try:
             topic = msg.topic or ""
-            parts = topic.split("/")
-            if len(parts) < 4 or parts[0] != mqtt_prefix or parts[1] != "cmd":
+            if not topic.startswith(cmd_prefix):
+                return
+            # <prefix>/cmd/<domain>/<id>[/<sub_action>[/...]]
+            parts = topic[len(cmd_prefix):].split("/", 3)
+            if len(parts) < 2:
+                return
+            domain = parts[0]
+            if domain not in _MQTT_CMD_DOMAIN_SET:
                 return
-            domain = parts[2]
             try:
-                target_id = int(parts[3])
+                target_id = int(parts[1])
             except Exception:
                 return
-            sub_action = parts[4] if len(parts) >= 5 else ""
+            sub_action = parts[2] if len(parts) >= 3 else ""
             try:
                 payload_raw = msg.payload.decode("utf-8", errors="ignore") if msg.payload else ""
             except Exception:
@@ -257,9 +569,9 @@ def main():
                 p = payload_raw.strip().lower()
                 action = None
                 brightness = None
-                if p in ("on", "1", "true", "t", "yes", "y"):
+                if p in _OUTPUT_ON_TOKENS:
                     action = "on"
-                elif p in ("off", "0", "false", "f", "no", "n"):
+                elif p in _OUTPUT_OFF_TOKENS:
                     action = "off"
                 elif p.startswith("b:") or p.startswith("b="):
                     try:
@@ -278,97 +590,7 @@ def main():
                 if not action:
                     return
 
-                async def _coro_out():
-                    if action == "on":
-                        ok = await mgr.turnOnOutput(target_id)
-                        if output_debug_verbose:
-                            logger.info("MQTT cmd/output %s -> ON ok=%s", target_id, ok)
-                        if ok:
-                            patch = {"ID": str(target_id), "STA": "ON"}
-                            try:
-                                state.apply_realtime_update("lights", [patch])
-                                publish("lights", patch)
-                                publish("switches", patch)
-                                publish("covers", patch)
-                                publish("outputs", patch)
-                            except Exception:
-                                pass
-                        return ok
-                    if action == "off":
-                        ok = await mgr.turnOffOutput(target_id)
-                        if output_debug_verbose:
-                            logger.info("MQTT cmd/output %s -> OFF ok=%s", target_id, ok)
-                        if ok:
-                            patch = {"ID": str(target_id), "STA": "OFF", "LEV": "0"}
-                            try:
-                                state.apply_realtime_update("lights", [patch])
-                                publish("lights", patch)
-                                publish("switches", patch)
-                                publish("covers", patch)
-                                publish("outputs", patch)
-                            except Exception:
-                                pass
-                        return ok
-                    if action == "toggle":
-                        sta_now = ""
-                        try:
-                            snap = state.snapshot()
-                            ent = next((x for x in (snap.get("entities") or []) if x.get("type") == "outputs" and int(x.get("id") or -1) == target_id), None)
-                            rt = (ent or {}).get("realtime") or {}
-                            sta_now = str(rt.get("STA") or "").upper()
-                        except Exception:
-                            sta_now = ""
-                        action_inner = "off" if sta_now == "ON" else "on"
-                        if action_inner == "off":
-                            ok = await mgr.turnOffOutput(target_id)
-                            if output_debug_verbose:
-                                logger.info("MQTT cmd/output %s -> OFF(ok toggle) ok=%s", target_id, ok)
-                            if ok:
-                                patch = {"ID": str(target_id), "STA": "OFF", "LEV": "0"}
-                                try:
-                                    state.apply_realtime_update("lights", [patch])
-                                    publish("lights", patch)
-                                    publish("switches", patch)
-                                    publish("covers", patch)
-                                    publish("outputs", patch)
-                                except Exception:
-                                    pass
-                            return ok
-                        ok = await mgr.turnOnOutput(target_id)
-                        if output_debug_verbose:
-                            logger.info("MQTT cmd/output %s -> ON(ok toggle) ok=%s", target_id, ok)
-                        if ok:
-                            patch = {"ID": str(target_id), "STA": "ON"}
-                            try:
-                                state.apply_realtime_update("lights", [patch])
-                                publish("lights", patch)
-                                publish("switches", patch)
-                                publish("covers", patch)
-                                publish("outputs", patch)
-                            except Exception:
-                                pass
-                        return ok
-                    if action == "brightness":
-                        try:
-                            bval = max(0, min(100, int(brightness)))
-                        except Exception:
-                            return False
-                        ok = await mgr.turnOnOutput(target_id, brightness=bval)
-                        if output_debug_verbose:
-                            logger.info("MQTT cmd/output %s -> brightness=%s ok=%s", target_id, bval, ok)
-                        if ok:
-                            patch = {"ID": str(target_id), "STA": "ON", "LEV": str(bval)}
-                            try:
-                                state.apply_realtime_update("lights", [patch])
-                                publish("lights", patch)
-                                publish("switches", patch)
-                                publish("covers", patch)
-                                publish("outputs", patch)
-                            except Exception:
-                                pass
-                        return ok
-
-                asyncio.run_coroutine_threadsafe(_coro_out(), loop)
+                _submit_mqtt_cmd(_mqtt_cmd_output(mgr, target_id, action, brightness), loop)
                 return
 
             if domain == "cover":
@@ -388,11 +610,10 @@ def main():
                             pos = max(0, min(100, pos))
                             ok = await mgr.setCoverPosition(target_id, pos)
                             if ok:
-                                patch = {"ID": str(target_id), "POS": str(pos)}
+                                patch = {"ID": _sid(target_id), "POS": str(pos)}
                                 try:
                                     state.apply_realtime_update("covers", [patch])
-                                    publish("covers", patch)
-                                    publish("outputs", patch)
+                                    publish_output(patch, ("covers", "outputs"))
                                 except Exception:
                                     pass
                             return ok
@@ -405,11 +626,10 @@ def main():
                             pos = max(0, min(100, pos))
                             ok = await mgr.setCoverPosition(target_id, pos)
                             if ok:
-                                patch = {"ID": str(target_id), "POS": str(pos)}
+                                patch = {"ID": _sid(target_id), "POS": str(pos)}
                                 try:
                                     state.apply_realtime_update("covers", [patch])
-                                    publish("covers", patch)
-                                    publish("outputs", patch)
+                                    publish_output(patch, ("covers", "outputs"))
                                 except Exception:
                                     pass
                             return ok
@@ -417,33 +637,30 @@ def main():
                         if p in ("OPEN", "UP"):
                             ok = await mgr.raiseCover(target_id)
                             if ok:
-                                patch = {"ID": str(target_id), "STA": "UP"}
+                                patch = {"ID": _sid(target_id), "STA": "UP"}
                                 try:
                                     state.apply_realtime_update("covers", [patch])
-                                    publish("covers", patch)
-                                    publish("outputs", patch)
+                                    publish_output(patch, ("covers", "outputs"))
                                 except Exception:
                                     pass
                             return ok
                         if p in ("CLOSE", "DOWN"):
                             ok = await mgr.lowerCover(target_id)
                             if ok:
-                                patch = {"ID": str(target_id), "STA": "DOWN"}
+                                patch = {"ID": _sid(target_id), "STA": "DOWN"}
                                 try:
                                     state.apply_realtime_update("covers", [patch])
-                                    publish("covers", patch)
-                                    publish("outputs", patch)
+                                    publish_output(patch, ("covers", "outputs"))
                                 except Exception:
                                     pass
                             return ok
                         if p in ("STOP", "HALT"):
                             ok = await mgr.stopCover(target_id)
                             if ok:
-                                patch = {"ID": str(target_id), "STA": "STOP"}
+                                patch = {"ID": _sid(target_id), "STA": "STOP"}
                                 try:
                                     state.apply_realtime_update("covers", [patch])
-                                    publish("covers", patch)
-                                    publish("outputs", patch)
+                                    publish_output(patch, ("covers", "outputs"))
                                 except Exception:
                                     pass
                             return ok
@@ -451,18 +668,13 @@ def main():
                         return False
                     return False
 
-                asyncio.run_coroutine_threadsafe(_coro_cover(), loop)
+                _submit_mqtt_cmd(_coro_cover(), loop)
                 return
 
             if domain == "scenario":
                 if not payload_raw.strip():
                     return
-                async def _coro_scen():
-                    try:
-                        return await mgr.executeScenario(target_id)
-                    except Exception:
-                        return False
-                asyncio.run_coroutine_threadsafe(_coro_scen(), loop)
+                _submit_mqtt_cmd(_mqtt_cmd_scenario(mgr, target_id), loop)
                 return
 
             if domain == "partition":
@@ -471,134 +683,32 @@ def main():
                     return
 
                 # HA alarm_control_panel standard payloads
-                if p in ("DISARM", "DISARMED", "OFF", "0"):
+                if p in _PARTITION_DISARM_TOKENS:
                     action = "disarm"
-                elif p in ("ARM_HOME", "ARM_NIGHT", "ARM_INSTANT", "ARM_NOW", "INSTANT"):
+                elif p in _PARTITION_ARM_INSTANT_TOKENS:
                     action = "arm_instant"
-                elif p in ("ARM_AWAY", "ARM", "ARM_DELAY", "ARMED_AWAY", "ON", "1"):
+                elif p in _PARTITION_ARM_AWAY_TOKENS:
                     action = "arm"
                 else:
                     return
 
-                async def _coro_part():
-                    if action == "disarm":
-                        ok = await mgr.disarmPartition(target_id)
-                        if ok:
-                            patch = {"ID": str(target_id), "ARM": "D", "T": "0"}
-                            try:
-                                state.apply_realtime_update("partitions", [patch])
-                                publish("partitions", patch)
-                            except Exception:
-                                pass
-                        return ok
-                    if action == "arm_instant":
-                        ok = await mgr.armPartitionInstant(target_id)
-                        if ok:
-                            patch = {"ID": str(target_id), "ARM": "IA", "T": "0"}
-                            try:
-                                state.apply_realtime_update("partitions", [patch])
-                                publish("partitions", patch)
-                            except Exception:
-                                pass
-                        return ok
-                    ok = await mgr.armPartition(target_id)
-                    if ok:
-                        patch = {"ID": str(target_id), "ARM": "DA", "T": "0"}
-                        try:
-                            state.apply_realtime_update("partitions", [patch])
-                            publish("partitions", patch)
-                        except Exception:
-                            pass
-                    return ok
-
-                asyncio.run_coroutine_threadsafe(_coro_part(), loop)
+                _submit_mqtt_cmd(_mqtt_cmd_partition(mgr, target_id, action), loop)
                 return
 
             if domain == "zone_bypass":
                 p = payload_raw.strip().upper()
                 if not p:
                     return
-                if p in ("1", "ON", "AUTO", "TRUE", "YES"):
+                if p in _BYPASS_AUTO_TOKENS:
                     action = "on"
-                elif p in ("0", "OFF", "NO", "FALSE"):
+                elif p in _BYPASS_NO_TOKENS:
                     action = "off"
-                elif p in ("-1", "TGL", "TOGGLE"):
+                elif p in _TOGGLE_TOKENS:
                     action = "toggle"
                 else:
                     return
 
-                async def _coro_byp():
-                    ack_topic = f"{mqtt_prefix}/ack/zone_bypass/{target_id}"
-                    if action == "on":
-                        ok = await mgr.bypassZoneOn(target_id)
-                        try:
-                            mqttc.publish(
-                                ack_topic,
-                                json.dumps({"ok": bool(ok), "action": "on", "payload": p}, ensure_ascii=False),
-                                retain=False,
-                            )
-                        except Exception:
-                            pass
-                        if ok:
-                            patch = {"ID": str(target_id), "BYP": "AUTO"}
-                            try:
-                                state.apply_realtime_update("zones", [patch])
-                                publish("zones", patch)
-                            except Exception:
-                                pass
-                        return ok
-                    if action == "off":
-                        ok = await mgr.bypassZoneOff(target_id)
-                        try:
-                            mqttc.publish(
-                                ack_topic,
-                                json.dumps({"ok": bool(ok), "action": "off", "payload": p}, ensure_ascii=False),
-                                retain=False,
-                            )
-                        except Exception:
-                            pass
-                        if ok:
-                            patch = {"ID": str(target_id), "BYP": "NO"}
-                            try:
-                                state.apply_realtime_update("zones", [patch])
-                                publish("zones", patch)
-                            except Exception:
-                                pass
-                        return ok
-                    ok = await mgr.bypassZoneToggle(target_id)
-                    try:
-                        mqttc.publish(
-                            ack_topic,
-                            json.dumps({"ok": bool(ok), "action": "toggle", "payload": p}, ensure_ascii=False),
-                            retain=False,
-                        )
-                    except Exception:
-                        pass
-                    if ok:
-                        byp_now = ""
-                        try:
-                            snap = state.snapshot()
-                            ent = next(
-                                (
-                                    x
-                                    for x in (snap.get("entities") or [])
-                                    if x.get("type") == "zones" and int(x.get("id") or -1) == target_id
-                                ),
-                                None,
-                            )
-                            rt = (ent or {}).get("realtime") or {}
-                            byp_now = str(rt.get("BYP") or "").upper()
-                        except Exception:
-                            byp_now = ""
-                        patch = {"ID": str(target_id), "BYP": ("NO" if byp_now in ("AUTO", "ON", "1") else "AUTO")}
-                        try:
-                            state.apply_realtime_update("zones", [patch])
-                            publish("zones", patch)
-                        except Exception:
-                            pass
-                    return ok
-
-                asyncio.run_coroutine_threadsafe(_coro_byp(), loop)
+                _submit_mqtt_cmd(_mqtt_cmd_zone_bypass(mgr, target_id, action, p), loop)
                 return
 
             if domain == "thermostat":
@@ -610,17 +720,11 @@ def main():
                 if not p:
                     return
 
-                def _get_season_from_state(default="WIN"):
+                # Both helpers take an already fetched entity so one command reads the state once.
+                def _get_season_from_state(default="WIN", ent=None):
                     try:
-                        snap = state.snapshot()
-                        ent = next(
-                            (
-                                x
-                                for x in (snap.get("entities") or [])
-                                if x.get("type") == "thermostats" and int(x.get("id") or -1) == target_id
-                            ),
-                            None,
-                        )
+                        if ent is None:
+                            ent = state.get_entity("thermostats", target_id)
                         rt = (ent or {}).get("realtime") or {}
                         st = (ent or {}).get("static") or {}
                         therm = rt.get("THERM") if isinstance(rt, dict) else None
@@ -636,17 +740,10 @@ def main():
                     except Exception:
                         return str(default)
 
-                def _get_target_tm_from_state(season: str) -> str | None:
+                def _get_target_tm_from_state(season: str, ent=None) -> str | None:
                     try:
-                        snap = state.snapshot()
-                        ent = next(
-                            (
-                                x
-                                for x in (snap.get("entities") or [])
-                                if x.get("type") == "thermostats" and int(x.get("id") or -1) == target_id
-                            ),
-                            None,
-                        )
+                        if ent is None:
+                            ent = state.get_entity("thermostats", target_id)
                         st = (ent or {}).get("static") or {}
                         rt = (ent or {}).get("realtime") or {}
                         season = str(season or "").strip().upper()
@@ -667,15 +764,12 @@ def main():
 
                 async def _coro_therm():
                     ack_topic = f"{mqtt_prefix}/ack/thermostat/{target_id}"
-                    patch = {"ID": str(target_id)}
+                    patch = {"ID": _sid(target_id)}
                     if action in ("temperature", "temp", "set_temp", "set_temperature"):
                         try:
                             t = float(p.replace(",", "."))
                         except Exception:
-                            try:
-                                mqttc.publish(ack_topic, json.dumps({"ok": False, "action": action, "payload": p, "error": "invalid_temperature"}, ensure_ascii=False), retain=False)
-                            except Exception:
-                                pass
+                            publish_ack(ack_topic, {"ok": False, "action": action, "payload": p, "error": "invalid_temperature"})
                             return False
                         t = max(5.0, min(35.0, t))
                         season = _get_season_from_state("WIN")
@@ -683,17 +777,7 @@ def main():
                         patch["ACT_SEA"] = season
                         patch[season] = {"TM": f"{t:.1f}"}
                         ok = await mgr.updateThermostat(target_id, patch)
-                        try:
-                            mqttc.publish(
-                                ack_topic,
-                                json.dumps(
-                                    {"ok": bool(ok), "action": action, "payload": p, "patch": patch, "ts": int(time.time())},
-                                    ensure_ascii=False,
-                                ),
-                                retain=True,
-                            )
-                        except Exception:
-                            pass
+                        publish_ack(ack_topic, {"ok": bool(ok), "action": action, "payload": p, "patch": patch, "ts": int(time.time())}, retain=True)
                         if ok:
                             try:
                                 state.apply_static_update("thermostats", [patch])
@@ -719,23 +803,10 @@ def main():
                             if tm is not None:
                                 patch["SUM"] = {"TM": tm}
                         else:
-                            try:
-                                mqttc.publish(ack_topic, json.dumps({"ok": False, "action": action, "payload": p, "error": "invalid_hvac_mode"}, ensure_ascii=False), retain=False)
-                            except Exception:
-                                pass
+                            publish_ack(ack_topic, {"ok": False, "action": action, "payload": p, "error": "invalid_hvac_mode"})
                             return False
                         ok = await mgr.updateThermostat(target_id, patch)
-                        try:
-                            mqttc.publish(
-                                ack_topic,
-                                json.dumps(
-                                    {"ok": bool(ok), "action": action, "payload": p, "patch": patch, "ts": int(time.time())},
-                                    ensure_ascii=False,
-                                ),
-                                retain=True,
-                            )
-                        except Exception:
-                            pass
+                        publish_ack(ack_topic, {"ok": bool(ok), "action": action, "payload": p, "patch": patch, "ts": int(time.time())}, retain=True)
                         if ok:
                             try:
                                 state.apply_static_update("thermostats", [patch])
@@ -746,39 +817,18 @@ def main():
 
                     if action in ("preset_mode", "preset"):
                         pm = p.strip().upper()
-                        pm_map = {
-                            "OFF": "OFF",
-                            "MANUAL": "MAN",
-                            "MAN": "MAN",
-                            "SCHEDULE": "WEEKLY",
-                            "WEEKLY": "WEEKLY",
-                            "AUTO": "WEEKLY",
-                            "MANUAL_TIMER": "MAN_TMR",
-                            "MAN_TMR": "MAN_TMR",
-                            "SD1": "SD1",
-                            "SD2": "SD2",
-                        }
-                        act = pm_map.get(pm, pm)
+                        act = _THERM_PRESET_MODES.get(pm, pm)
                         patch["ACT_MODE"] = act
                         # Some panels ignore preset-only updates unless the active season target is present.
                         if act in ("MAN", "MAN_TMR"):
-                            season = _get_season_from_state("WIN")
+                            ent = state.get_entity("thermostats", target_id)
+                            season = _get_season_from_state("WIN", ent=ent)
                             patch["ACT_SEA"] = season
-                            tm = _get_target_tm_from_state(season)
+                            tm = _get_target_tm_from_state(season, ent=ent)
                             if tm is not None:
                                 patch[season] = {"TM": tm}
                         ok = await mgr.updateThermostat(target_id, patch)
-                        try:
-                            mqttc.publish(
-                                ack_topic,
-                                json.dumps(
-                                    {"ok": bool(ok), "action": action, "payload": p, "patch": patch, "ts": int(time.time())},
-                                    ensure_ascii=False,
-                                ),
-                                retain=True,
-                            )
-                        except Exception:
-                            pass
+                        publish_ack(ack_topic, {"ok": bool(ok), "action": action, "payload": p, "patch": patch, "ts": int(time.time())}, retain=True)
                         if ok:
                             try:
                                 state.apply_static_update("thermostats", [patch])
@@ -790,24 +840,11 @@ def main():
                     if action in ("season", "act_sea"):
                         sea = p.strip().upper()
                         if sea not in ("WIN", "SUM"):
-                            try:
-                                mqttc.publish(ack_topic, json.dumps({"ok": False, "action": action, "payload": p, "error": "invalid_season"}, ensure_ascii=False), retain=False)
-                            except Exception:
-                                pass
+                            publish_ack(ack_topic, {"ok": False, "action": action, "payload": p, "error": "invalid_season"})
                             return False
                         patch["ACT_SEA"] = sea
                         ok = await mgr.updateThermostat(target_id, patch)
-                        try:
-                            mqttc.publish(
-                                ack_topic,
-                                json.dumps(
-                                    {"ok": bool(ok), "action": action, "payload": p, "patch": patch, "ts": int(time.time())},
-                                    ensure_ascii=False,
-                                ),
-                                retain=True,
-                            )
-                        except Exception:
-                            pass
+                        publish_ack(ack_topic, {"ok": bool(ok), "action": action, "payload": p, "patch": patch, "ts": int(time.time())}, retain=True)
                         if ok:
                             try:
                                 state.apply_static_update("thermostats", [patch])
@@ -816,31 +853,21 @@ def main():
                                 pass
                         return ok
 
-                    try:
-                        mqttc.publish(
-                            ack_topic,
-                            json.dumps(
-                                {"ok": False, "action": action, "payload": p, "error": "unsupported_action", "ts": int(time.time())},
-                                ensure_ascii=False,
-                            ),
-                            retain=True,
-                        )
-                    except Exception:
-                        pass
+                    publish_ack(ack_topic, {"ok": False, "action": action, "payload": p, "error": "unsupported_action", "ts": int(time.time())}, retain=True)
                     return False
 
-                asyncio.run_coroutine_threadsafe(_coro_therm(), loop)
+                _submit_mqtt_cmd(_coro_therm(), loop)
                 return
 
             if domain == "scheduler":
                 p = payload_raw.strip().upper()
                 if not p:
                     return
-                if p in ("1", "ON", "TRUE", "T", "ENABLE", "ENABLED"):
+                if p in _ENABLE_TOKENS:
                     action = "enable"
-                elif p in ("0", "OFF", "FALSE", "F", "DISABLE", "DISABLED"):
+                elif p in _DISABLE_TOKENS:
                     action = "disable"
-                elif p in ("-1", "TGL", "TOGGLE"):
+                elif p in _TOGGLE_TOKENS:
                     action = "toggle"
                 else:
                     return
@@ -850,15 +877,7 @@ def main():
                     desired = None
                     if action == "toggle":
                         try:
-                            snap = state.snapshot()
-                            ent = next(
-                                (
-                                    x
-                                    for x in (snap.get("entities") or [])
-                                    if x.get("type") == "schedulers" and int(x.get("id") or -1) == target_id
-                                ),
-                                None,
-                            )
+                            ent = state.get_entity("schedulers", target_id)
                             st = (ent or {}).get("static") or {}
                             en_now = str(st.get("EN") or "").strip().upper()
                             desired = "F" if en_now in ("T", "1", "ON", "TRUE") else "T"
@@ -867,20 +886,10 @@ def main():
                     else:
                         desired = "T" if action == "enable" else "F"
 
-                    ok = await mgr.updateScheduler(target_id, {"ID": str(target_id), "EN": desired})
-                    try:
-                        mqttc.publish(
-                            ack_topic,
-                            json.dumps(
-                                {"ok": bool(ok), "action": action, "en": desired, "ts": int(time.time())},
-                                ensure_ascii=False,
-                            ),
-                            retain=True,
-                        )
-                    except Exception:
-                        pass
+                    ok = await mgr.updateScheduler(target_id, {"ID": _sid(target_id), "EN": desired})
+                    publish_ack(ack_topic, {"ok": bool(ok), "action": action, "en": desired, "ts": int(time.time())}, retain=True)
                     if ok:
-                        patch = {"ID": str(target_id), "EN": desired}
+                        patch = {"ID": _sid(target_id), "EN": desired}
                         try:
                             state.apply_static_update("schedulers", [patch])
                             publish("schedulers", patch)
@@ -888,7 +897,7 @@ def main():
                             pass
                     return ok
 
-                asyncio.run_coroutine_threadsafe(_coro_sched(), loop)
+                _submit_mqtt_cmd(_coro_sched(), loop)
                 return
 
             if domain == "panel":
@@ -906,61 +915,31 @@ def main():
                     }
                     payload_type = mapping.get(action)
                     if not payload_type:
-                        try:
-                            mqttc.publish(
-                                ack_topic,
-                                json.dumps(
-                                    {"ok": False, "action": action, "error": "unknown_action", "ts": int(time.time())},
-                                    ensure_ascii=False,
-                                ),
-                                retain=True,
-                            )
-                        except Exception:
-                            pass
+                        publish_ack(ack_topic, {"ok": False, "action": action, "error": "unknown_action", "ts": int(time.time())}, retain=True)
                         return False
                     ok = await mgr.clearPanel(payload_type)
-                    try:
-                        mqttc.publish(
-                            ack_topic,
-                            json.dumps(
-                                {"ok": bool(ok), "action": action, "payload_type": payload_type, "ts": int(time.time())},
-                                ensure_ascii=False,
-                            ),
-                            retain=True,
-                        )
-                    except Exception:
-                        pass
+                    publish_ack(ack_topic, {"ok": bool(ok), "action": action, "payload_type": payload_type, "ts": int(time.time())}, retain=True)
                     return ok
 
-                asyncio.run_coroutine_threadsafe(_coro_panel(), loop)
+                _submit_mqtt_cmd(_coro_panel(), loop)
                 return
 
             if domain == "account":
                 p = payload_raw.strip().upper()
                 if not p:
                     return
-                if p in ("1", "ON", "TRUE", "T", "ENABLE", "ENABLED"):
+                if p in _ENABLE_TOKENS:
                     desired = "F"  # DACC=F means enabled
-                elif p in ("0", "OFF", "FALSE", "F", "DISABLE", "DISABLED"):
+                elif p in _DISABLE_TOKENS:
                     desired = "T"
                 else:
                     return
 
                 async def _coro_acc():
                     ack_topic = f"{mqtt_prefix}/ack/account/{target_id}"
-                    patch = {"ID": str(target_id), "DACC": desired}
+                    patch = {"ID": _sid(target_id), "DACC": desired}
                     ok = await mgr.setAccountEnabled(target_id, desired)
-                    try:
-                        mqttc.publish(
-                            ack_topic,
-                            json.dumps(
-                                {"ok": bool(ok), "id": int(target_id), "dacc": desired, "ts": int(time.time())},
-                                ensure_ascii=False,
-                            ),
-                            retain=True,
-                        )
-                    except Exception:
-                        pass
+                    publish_ack(ack_topic, {"ok": bool(ok), "id": int(target_id), "dacc": desired, "ts": int(time.time())}, retain=True)
                     if ok:
                         try:
                             state.apply_static_update("accounts", [patch])
@@ -969,7 +948,7 @@ def main():
                             pass
                     return ok
 
-                asyncio.run_coroutine_threadsafe(_coro_acc(), loop)
+                _submit_mqtt_cmd(_coro_acc(), loop)
                 return
         except Exception:
             if mqtt_debug_verbose:
@@ -999,20 +978,19 @@ def main():
             time.sleep(wait_s)
     mqttc.loop_start()
 
-    def publish(entity_type: str, item: dict):
+    def _publish_payload(entity_type: str, item: dict):
+        # -> (normalized entity id, payload to publish), or (None, None) when the item has no usable ID.
         entity_id_raw = item.get("ID")
         if entity_id_raw is None:
-            return
+            return None, None
         # Normalize IDs so MQTT topics stay stable (e.g. avoid "033" vs "33").
         try:
             entity_id = str(int(str(entity_id_raw).strip()))
         except Exception:
             entity_id = str(entity_id_raw).strip()
         if not entity_id:
-            return
+            return None, None
 
-        topic = f"{mqtt_prefix}/{entity_type}/{entity_id}"
-        retain = entity_type not in ("logs",)
         payload = item
         try:
             # Always publish the same data you see in the Debug UI (index_debug),
@@ -1043,9 +1021,35 @@ def main():
                     pass
         except Exception:
             payload = item
+        return entity_id, payload
 
+    def publish_output(item: dict, entity_types=_OUTPUT_FANOUT):
+        # lights/switches/covers/outputs all carry the same merged "outputs" entity: merge and encode once.
+        entity_id, payload = _publish_payload("outputs", item)
+        if entity_id is None:
+            return
+        raw = _json_payload(payload)
+        for et in entity_types:
+            topic = f"{mqtt_prefix}/{et}/{entity_id}"
+            _log_mqtt("publish", topic, payload, True)
+            mqttc.publish(topic, raw, retain=True)
+
+    def publish_ack(topic: str, data: dict, retain: bool = False):
+        # Command acks: compact JSON at QoS 0; paho only queues it for the network thread.
+        try:
+            mqttc.publish(topic, _json_payload(data), qos=0, retain=retain)
+        except Exception:
+            pass
+
+    def publish(entity_type: str, item: dict):
+        entity_id, payload = _publish_payload(entity_type, item)
+        if entity_id is None:
+            return
+
+        topic = f"{mqtt_prefix}/{entity_type}/{entity_id}"
+        retain = entity_type not in ("logs",)
         _log_mqtt("publish", topic, payload, retain)
-        mqttc.publish(topic, json.dumps(payload, ensure_ascii=False), retain=retain)
+        mqttc.publish(topic, _json_payload(payload), retain=retain)
         # Mirror state to discovery state_topic (homeassistant/...) so HA picks up changes.
         try:
             et = str(entity_type).lower()
@@ -1577,7 +1581,7 @@ def main():
             host_slug = re.sub(r"[^a-z0-9]+", "_", str(ksenia_host or "").lower()).strip("_") or "panel"
         except Exception:
             host_slug = "panel"
-        group_key = re.sub(r"[^a-z0-9_]+", "_", str(group_key or "").lower()).strip("_") or "main"
+        group_key = _SLUG_RE.sub("_", str(group_key or "").lower()).strip("_") or "main"
         identifier = f"{mqtt_prefix_slug}_lares_{host_slug}_{group_key}"
         device = {
             "identifiers": [identifier],
@@ -1601,7 +1605,7 @@ def main():
         try:
             topic = f"{DISC_PREFIX}/{domain}/{object_id}/config"
             _log_mqtt("discovery", topic, payload, True)
-            mqttc.publish(topic, json.dumps(payload, ensure_ascii=False), retain=True)
+            mqttc.publish(topic, _json_payload(payload), retain=True)
             return True
         except Exception as exc:
             logger.error(f"Discovery publish failed for {domain} {object_id}: {exc}")
@@ -2580,7 +2584,7 @@ def main():
             }
             topic = f"{mqtt_prefix}/sia_ip/state"
             _log_mqtt("publish", topic, payload, True)
-            mqttc.publish(topic, json.dumps(payload, ensure_ascii=False), retain=True)
+            mqttc.publish(topic, _json_payload(payload), retain=True)
             mqttc.publish(f"{mqtt_prefix}/sia_ip/alarm", "ON" if alarms else "OFF", retain=True)
             mqttc.publish(f"{mqtt_prefix}/sia_ip/trouble", "ON" if troubles else "OFF", retain=True)
         except Exception as exc:
@@ -3543,14 +3547,11 @@ def main():
         # Republish full state to MQTT so HA sees configuration changes without add-on restart.
         try:
             for item in await manager.getLights():
-                publish("lights", item)
-                publish("outputs", item)
+                publish_output(item, ("lights", "outputs"))
             for item in await manager.getRolls():
-                publish("covers", item)
-                publish("outputs", item)
+                publish_output(item, ("covers", "outputs"))
             for item in await manager.getSwitches():
-                publish("switches", item)
-                publish("outputs", item)
+                publish_output(item, ("switches", "outputs"))
             scens = await manager.getScenarios()
             if isinstance(scens, list):
                 try:
@@ -4470,11 +4471,9 @@ def main():
                         ok = await manager.turnOnOutput(entity_id_int)
                         if ok:
                             try:
-                                patch = {"ID": str(entity_id_int), "STA": "ON"}
+                                patch = {"ID": _sid(entity_id_int), "STA": "ON"}
                                 state.apply_realtime_update("lights", [patch])
-                                publish("lights", patch)
-                                publish("switches", patch)
-                                publish("covers", patch)
+                                publish_output(patch, ("lights", "switches", "covers"))
                             except Exception:
                                 pass
                         return ok
@@ -4482,25 +4481,15 @@ def main():
                         ok = await manager.turnOffOutput(entity_id_int)
                         if ok:
                             try:
-                                patch = {"ID": str(entity_id_int), "STA": "OFF", "LEV": "0"}
+                                patch = {"ID": _sid(entity_id_int), "STA": "OFF", "LEV": "0"}
                                 state.apply_realtime_update("lights", [patch])
-                                publish("lights", patch)
-                                publish("switches", patch)
-                                publish("covers", patch)
+                                publish_output(patch, ("lights", "switches", "covers"))
                             except Exception:
                                 pass
                         return ok
                     if action == "toggle":
                         try:
-                            snap = state.snapshot()
-                            ent = next(
-                                (
-                                    x
-                                    for x in (snap.get("entities") or [])
-                                    if x.get("type") == "outputs" and int(x.get("id") or -1) == entity_id_int
-                                ),
-                                None,
-                            )
+                            ent = state.get_entity("outputs", entity_id_int)
                             rt = (ent or {}).get("realtime") or {}
                             sta_now = str(rt.get("STA") or "").upper()
                         except Exception:
@@ -4510,22 +4499,18 @@ def main():
                             ok = await manager.turnOffOutput(entity_id_int)
                             if ok:
                                 try:
-                                    patch = {"ID": str(entity_id_int), "STA": "OFF", "LEV": "0"}
+                                    patch = {"ID": _sid(entity_id_int), "STA": "OFF", "LEV": "0"}
                                     state.apply_realtime_update("lights", [patch])
-                                    publish("lights", patch)
-                                    publish("switches", patch)
-                                    publish("covers", patch)
+                                    publish_output(patch, ("lights", "switches", "covers"))
                                 except Exception:
                                     pass
                             return ok
                         ok = await manager.turnOnOutput(entity_id_int)
                         if ok:
                             try:
-                                patch = {"ID": str(entity_id_int), "STA": "ON"}
+                                patch = {"ID": _sid(entity_id_int), "STA": "ON"}
                                 state.apply_realtime_update("lights", [patch])
-                                publish("lights", patch)
-                                publish("switches", patch)
-                                publish("covers", patch)
+                                publish_output(patch, ("lights", "switches", "covers"))
                             except Exception:
                                 pass
                         return ok
@@ -4538,11 +4523,9 @@ def main():
                         ok = await manager.turnOnOutput(entity_id_int, brightness=brightness)
                         if ok:
                             try:
-                                patch = {"ID": str(entity_id_int), "STA": "ON", "LEV": str(brightness)}
+                                patch = {"ID": _sid(entity_id_int), "STA": "ON", "LEV": _LEV[brightness]}
                                 state.apply_realtime_update("lights", [patch])
-                                publish("lights", patch)
-                                publish("switches", patch)
-                                publish("covers", patch)
+                                publish_output(patch, ("lights", "switches", "covers"))
                             except Exception:
                                 pass
                         return ok
@@ -4574,7 +4557,7 @@ def main():
                             ok = await sess.set_partition(entity_id_int, "A")
                             if ok:
                                 try:
-                                    patch = _augment_partition_delay_fields({"ID": str(entity_id_int), "ARM": "DA", "T": "0"})
+                                    patch = _augment_partition_delay_fields({"ID": _sid(entity_id_int), "ARM": "DA", "T": "0"})
                                     state.apply_realtime_update("partitions", [patch])
                                     publish("partitions", patch)
                                 except Exception:
@@ -4586,7 +4569,7 @@ def main():
                             ok = await sess.set_partition(entity_id_int, "I")
                             if ok:
                                 try:
-                                    patch = _augment_partition_delay_fields({"ID": str(entity_id_int), "ARM": "IA", "T": "0"})
+                                    patch = _augment_partition_delay_fields({"ID": _sid(entity_id_int), "ARM": "IA", "T": "0"})
                                     state.apply_realtime_update("partitions", [patch])
                                     publish("partitions", patch)
                                 except Exception:
@@ -4598,7 +4581,7 @@ def main():
                             ok = await sess.set_partition(entity_id_int, "A")
                             if ok:
                                 try:
-                                    patch = _augment_partition_delay_fields({"ID": str(entity_id_int), "ARM": "DA", "T": "0"})
+                                    patch = _augment_partition_delay_fields({"ID": _sid(entity_id_int), "ARM": "DA", "T": "0"})
                                     state.apply_realtime_update("partitions", [patch])
                                     publish("partitions", patch)
                                 except Exception:
@@ -4610,7 +4593,7 @@ def main():
                             ok = await sess.set_partition(entity_id_int, "D")
                             if ok:
                                 try:
-                                    patch = _augment_partition_delay_fields({"ID": str(entity_id_int), "ARM": "D", "T": "0"})
+                                    patch = _augment_partition_delay_fields({"ID": _sid(entity_id_int), "ARM": "D", "T": "0"})
                                     state.apply_realtime_update("partitions", [patch])
                                     publish("partitions", patch)
                                 except Exception:
@@ -4625,7 +4608,7 @@ def main():
                         ok = await (sess.set_zone_bypass(entity_id_int, "ON") if sess else manager.bypassZoneOn(entity_id_int))
                         if ok:
                             try:
-                                patch = {"ID": str(entity_id_int), "BYP": "AUTO"}
+                                patch = {"ID": _sid(entity_id_int), "BYP": "AUTO"}
                                 state.apply_realtime_update("zones", [patch])
                                 publish("zones", patch)
                             except Exception:
@@ -4635,7 +4618,7 @@ def main():
                         ok = await (sess.set_zone_bypass(entity_id_int, "OFF") if sess else manager.bypassZoneOff(entity_id_int))
                         if ok:
                             try:
-                                patch = {"ID": str(entity_id_int), "BYP": "NO"}
+                                patch = {"ID": _sid(entity_id_int), "BYP": "NO"}
                                 state.apply_realtime_update("zones", [patch])
                                 publish("zones", patch)
                             except Exception:
@@ -4646,18 +4629,10 @@ def main():
                         if ok:
                             try:
                                 byp_now = ""
-                                snap = state.snapshot()
-                                ent = next(
-                                    (
-                                        x
-                                        for x in (snap.get("entities") or [])
-                                        if x.get("type") == "zones" and int(x.get("id") or -1) == entity_id_int
-                                    ),
-                                    None,
-                                )
+                                ent = state.get_entity("zones", entity_id_int)
                                 rt = (ent or {}).get("realtime") or {}
                                 byp_now = str(rt.get("BYP") or "").upper()
-                                patch = {"ID": str(entity_id_int), "BYP": ("NO" if byp_now in ("AUTO", "ON", "1") else "AUTO")}
+                                patch = {"ID": _sid(entity_id_int), "BYP": ("NO" if byp_now in ("AUTO", "ON", "1") else "AUTO")}
                                 state.apply_realtime_update("zones", [patch])
                                 publish("zones", patch)
                             except Exception:
@@ -4669,7 +4644,7 @@ def main():
                             ok = await (sess.set_zone_bypass(entity_id_int, "ON") if sess else manager.bypassZoneOn(entity_id_int))
                             if ok:
                                 try:
-                                    patch = {"ID": str(entity_id_int), "BYP": "AUTO"}
+                                    patch = {"ID": _sid(entity_id_int), "BYP": "AUTO"}
                                     state.apply_realtime_update("zones", [patch])
                                     publish("zones", patch)
                                 except Exception:
@@ -4679,7 +4654,7 @@ def main():
                             ok = await (sess.set_zone_bypass(entity_id_int, "OFF") if sess else manager.bypassZoneOff(entity_id_int))
                             if ok:
                                 try:
-                                    patch = {"ID": str(entity_id_int), "BYP": "NO"}
+                                    patch = {"ID": _sid(entity_id_int), "BYP": "NO"}
                                     state.apply_realtime_update("zones", [patch])
                                     publish("zones", patch)
                                 except Exception:
@@ -4690,18 +4665,10 @@ def main():
                             if ok:
                                 try:
                                     byp_now = ""
-                                    snap = state.snapshot()
-                                    ent = next(
-                                        (
-                                            x
-                                            for x in (snap.get("entities") or [])
-                                            if x.get("type") == "zones" and int(x.get("id") or -1) == entity_id_int
-                                        ),
-                                        None,
-                                    )
+                                    ent = state.get_entity("zones", entity_id_int)
                                     rt = (ent or {}).get("realtime") or {}
                                     byp_now = str(rt.get("BYP") or "").upper()
-                                    patch = {"ID": str(entity_id_int), "BYP": ("NO" if byp_now in ("AUTO", "ON", "1") else "AUTO")}
+                                    patch = {"ID": _sid(entity_id_int), "BYP": ("NO" if byp_now in ("AUTO", "ON", "1") else "AUTO")}
                                     state.apply_realtime_update("zones", [patch])
                                     publish("zones", patch)
                                 except Exception:
@@ -4713,7 +4680,7 @@ def main():
                 if entity_type == "accounts":
                     if action in ("enable", "disable"):
                         patch = {
-                            "ID": str(entity_id_int),
+                            "ID": _sid(entity_id_int),
                             "DACC": "F" if action == "enable" else "T",
                         }
                         ok = await sess.set_account_enabled(patch)
@@ -4726,9 +4693,9 @@ def main():
                     if action == "set_enabled":
                         v = str(value or "").strip().upper()
                         if v in ("1", "ON", "TRUE", "T", "ENABLE", "ENABLED"):
-                            patch = {"ID": str(entity_id_int), "DACC": "F"}
+                            patch = {"ID": _sid(entity_id_int), "DACC": "F"}
                         elif v in ("0", "OFF", "FALSE", "F", "DISABLE", "DISABLED"):
-                            patch = {"ID": str(entity_id_int), "DACC": "T"}
+                            patch = {"ID": _sid(entity_id_int), "DACC": "T"}
                         else:
                             raise ValueError("value must be ON/OFF (or 1/0)")
                         ok = await sess.set_account_enabled(patch)
@@ -4836,7 +4803,7 @@ def main():
                             pass
                         # Update in-memory snapshot immediately.
                         try:
-                            state.apply_static_update("thermostats", [{"ID": str(entity_id_int), "DES": des}])
+                            state.apply_static_update("thermostats", [{"ID": _sid(entity_id_int), "DES": des}])
                         except Exception:
                             pass
                         return {"ok": True}
@@ -4852,14 +4819,14 @@ def main():
                         if (not mode) or (re.fullmatch(r"[A-Z0-9_]{1,16}", mode) is None):
                             raise ValueError("invalid mode")
                         return await manager.updateThermostat(
-                            entity_id_int, {"ID": str(entity_id_int), "ACT_MODE": mode}
+                            entity_id_int, {"ID": _sid(entity_id_int), "ACT_MODE": mode}
                         )
 
                     if action == "set_manual_timer":
                         # Manual timed mode uses ACT_MODE=MAN_TMR and duration in MAN_HRS (hours).
                         raw = value
                         if raw in (None, "", "NA"):
-                            patch = {"ID": str(entity_id_int), "MAN_HRS": "NA"}
+                            patch = {"ID": _sid(entity_id_int), "MAN_HRS": "NA"}
                             return await manager.updateThermostat(entity_id_int, patch)
                         try:
                             hrs = float(str(raw).strip().replace(",", "."))
@@ -4869,14 +4836,14 @@ def main():
                             raise ValueError("MAN_HRS must be >= 0")
                         # The panel expects strings (same style as other numeric fields)
                         hrs_s = f"{hrs:.1f}".rstrip("0").rstrip(".")
-                        patch = {"ID": str(entity_id_int), "ACT_MODE": "MAN_TMR", "MAN_HRS": hrs_s}
+                        patch = {"ID": _sid(entity_id_int), "ACT_MODE": "MAN_TMR", "MAN_HRS": hrs_s}
                         return await manager.updateThermostat(entity_id_int, patch)
 
                     if action == "set_season":
                         season = str(value or "").strip().upper()
                         if season not in ("WIN", "SUM"):
                             raise ValueError("season must be WIN/SUM")
-                        return await manager.updateThermostat(entity_id_int, {"ID": str(entity_id_int), "ACT_SEA": season})
+                        return await manager.updateThermostat(entity_id_int, {"ID": _sid(entity_id_int), "ACT_SEA": season})
 
                     if action == "set_profile":
                         if not isinstance(value, dict):
@@ -4888,15 +4855,7 @@ def main():
                             # default to current season if not provided
                             season = "WIN"
                             try:
-                                snap = state.snapshot()
-                                ent = next(
-                                    (
-                                        x
-                                        for x in (snap.get("entities") or [])
-                                        if x.get("type") == "thermostats" and int(x.get("id") or -1) == entity_id_int
-                                    ),
-                                    None,
-                                )
+                                ent = state.get_entity("thermostats", entity_id_int)
                                 rt = (ent or {}).get("realtime") or {}
                                 therm = rt.get("THERM") if isinstance(rt, dict) else None
                                 if isinstance(therm, dict) and therm.get("ACT_SEA"):
@@ -4914,7 +4873,7 @@ def main():
                         v = max(5.0, min(35.0, v))
                         # Profile thresholds are used in "WEEKLY" mode.
                         patch = {
-                            "ID": str(entity_id_int),
+                            "ID": _sid(entity_id_int),
                             "ACT_MODE": "WEEKLY",
                             season: {key: f"{v:.1f}"},
                         }
@@ -4930,15 +4889,7 @@ def main():
 
                         season = "WIN"
                         try:
-                            snap = state.snapshot()
-                            ent = next(
-                                (
-                                    x
-                                    for x in (snap.get("entities") or [])
-                                    if x.get("type") == "thermostats" and int(x.get("id") or -1) == entity_id_int
-                                ),
-                                None,
-                            )
+                            ent = state.get_entity("thermostats", entity_id_int)
                             rt = (ent or {}).get("realtime") or {}
                             st = (ent or {}).get("static") or {}
                             therm = rt.get("THERM") if isinstance(rt, dict) else None
@@ -4952,7 +4903,7 @@ def main():
                             season = "WIN"
 
                         patch = {
-                            "ID": str(entity_id_int),
+                            "ID": _sid(entity_id_int),
                             "ACT_MODE": "MAN",
                             "ACT_SEA": season,
                             season: {"TM": target_str},
@@ -4980,15 +4931,7 @@ def main():
                             raise ValueError("t must be 1/2/3")
 
                         # Read current schedule from debug state snapshot (static cfg).
-                        snap = state.snapshot()
-                        ent = next(
-                            (
-                                x
-                                for x in (snap.get("entities") or [])
-                                if x.get("type") == "thermostats" and int(x.get("id") or -1) == entity_id_int
-                            ),
-                            None,
-                        )
+                        ent = state.get_entity("thermostats", entity_id_int)
                         st = (ent or {}).get("static") or {}
                         sea_cfg = st.get(season) if isinstance(st, dict) else None
                         cur_day = sea_cfg.get(day) if isinstance(sea_cfg, dict) else None
@@ -5005,7 +4948,7 @@ def main():
                             else:
                                 new_day.append(dict(item))
 
-                        patch = {"ID": str(entity_id_int), season: {day: new_day}}
+                        patch = {"ID": _sid(entity_id_int), season: {day: new_day}}
                         return await manager.updateThermostat(entity_id_int, patch)
 
                     if action == "write_patch":